@@ -1,11 +1,61 @@
+"""skellylogs: the logging module for freemocap (and skellycam).
+
+The public names below are imported on first access (PEP 562 module
+__getattr__), so a worker process only imports the parts of the package it
+actually uses. configure_logging is the exception: it shares its name with
+its submodule, and importing that submodule anywhere would bind the module
+over a lazy attribute, so it is imported here.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
 from skellylogs.configure_logging import configure_logging
-from skellylogs.log_levels import LogLevels
-from skellylogs.handlers.websocket_log_queue_handler import LogRecordModel, get_websocket_log_queue, create_websocket_log_queue
-
-__all__ = [
-    "configure_logging",
-    "LogLevels",
-    "LogRecordModel",
-    "get_websocket_log_queue",
-    "create_websocket_log_queue",
-]
+
+# public name -> module that defines it
+_LAZY_ATTRIBUTES = {
+    "LogLevels": "skellylogs.log_levels",
+    "LogRecordModel": "skellylogs.handlers.websocket_log_queue_handler",
+    "get_websocket_log_queue": "skellylogs.handlers.websocket_log_queue_handler",
+    "create_websocket_log_queue": "skellylogs.handlers.websocket_log_queue_handler",
+    "get_background_log_listener": "skellylogs.handlers.background_listener",
+    "get_log_aggregation_queue": "skellylogs.handlers.process_log_aggregator",
+    "DEFAULT_CALLSITE_RATE_LIMITS": "skellylogs.filters.callsite_rate_limit",
+    "LogRetentionPolicy": "skellylogs.log_retention",
+    "LoadSheddingPolicy": "skellylogs.load_shedding",
+    "get_logging_stats": "skellylogs.handlers.handler_stats",
+    "LazyMessage": "skellylogs.lazy_message",
+}
+
+__all__ = ["configure_logging", *_LAZY_ATTRIBUTES]
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from skellylogs.filters.callsite_rate_limit import DEFAULT_CALLSITE_RATE_LIMITS
+    from skellylogs.handlers.background_listener import get_background_log_listener
+    from skellylogs.handlers.handler_stats import get_logging_stats
+    from skellylogs.handlers.process_log_aggregator import get_log_aggregation_queue
+    from skellylogs.handlers.websocket_log_queue_handler import (
+        LogRecordModel,
+        create_websocket_log_queue,
+        get_websocket_log_queue,
+    )
+    from skellylogs.lazy_message import LazyMessage
+    from skellylogs.load_shedding import LoadSheddingPolicy
+    from skellylogs.log_levels import LogLevels
+    from skellylogs.log_retention import LogRetentionPolicy
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,357 @@
+"""Throughput, latency and allocation benchmarks for every handler path.
+
+    python -m skellylogs.benchmark --output bench.json
+    python -m skellylogs.benchmark --output bench_new.json --baseline bench.json
+
+Each case logs through a dedicated logger with one handler set attached
+(nothing goes to the real console or log folder). A case reports, from
+the caller's side:
+
+    ns_per_record:   mean wall time of one logging call
+    records_per_sec: aggregate throughput (all threads/processes together)
+    p50_ns, p99_ns:  per-call latency, timed call by call
+    allocated_blocks_per_record: net memory blocks still allocated per record
+        afterwards (buffers, queues; CPython has no cumulative allocation counter)
+    peak_traced_kib: tracemalloc peak while logging, i.e. the transient allocations
+
+Cases cover every handler, the text and JSON Lines formatters, enabled and
+disabled levels, and runs across several threads or processes.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, Iterable
+
+from skellylogs.configure_logging import _register_custom_levels
+from skellylogs.formatters.custom_formatter import CustomFormatter
+from skellylogs.formatters.json_lines_formatter import JsonLinesFormatter
+from skellylogs.handlers.buffered_file_handler import BufferedFileHandler
+from skellylogs.handlers.colored_console import ColoredConsoleHandler
+from skellylogs.handlers.websocket_log_queue_handler import WebSocketQueueHandler
+from skellylogs.log_format_string import LOG_FORMAT_STRING
+from skellylogs.log_levels import LogLevels
+
+BENCHMARK_RESULTS_VERSION = 1
+DEFAULT_BENCHMARK_RECORDS = 20_000
+DEFAULT_REGRESSION_THRESHOLD = 0.10  # fraction slower than the baseline that counts as a regression
+BENCHMARK_LEVELS = {"trace": LogLevels.TRACE.value, "info": LogLevels.INFO.value}
+_LATENCY_SAMPLE_SIZE = 2_000  # calls timed one by one for the percentiles
+
+
+def _console_handlers(folder: str) -> list[logging.Handler]:
+    return [ColoredConsoleHandler(stream=open(os.devnull, "w", encoding="utf-8"))]
+
+
+def _file_handler(folder: str, buffer_size: int | None = None, jsonl: bool = False) -> logging.Handler:
+    path = os.path.join(folder, f"bench_{os.getpid()}_{threading.get_ident()}.{'jsonl' if jsonl else 'log'}")
+    options = {} if buffer_size is None else {"buffer_size": buffer_size}
+    handler = BufferedFileHandler(path, encoding="utf-8", **options)
+    handler.setFormatter(JsonLinesFormatter() if jsonl else CustomFormatter(LOG_FORMAT_STRING))
+    return handler
+
+
+def _websocket_handler(folder: str) -> logging.Handler:
+    # An unbounded in-process queue: measures the handler, not the transport
+    return WebSocketQueueHandler(queue.Queue())
+
+
+# name -> factory(folder) building the handler set a case logs through
+BENCHMARK_HANDLERS: dict[str, Callable[[str], list[logging.Handler]]] = {
+    "null": lambda folder: [logging.NullHandler()],
+    "console": _console_handlers,
+    "file": lambda folder: [_file_handler(folder)],
+    "file_unbuffered": lambda folder: [_file_handler(folder, buffer_size=0)],
+    "jsonl": lambda folder: [_file_handler(folder, jsonl=True)],
+    "websocket": lambda folder: [_websocket_handler(folder)],
+    # What configure_logging attaches: file, websocket and console together
+    "all": lambda folder: [_file_handler(folder), _websocket_handler(folder), *_console_handlers(folder)],
+}
+
+
+class BenchmarkCase:
+    """One handler set, record level and concurrency setting to measure."""
+
+    def __init__(self, handler: str, level: str, enabled: bool = True, threads: int = 1, processes: int = 1):
+        if handler not in BENCHMARK_HANDLERS:
+            raise ValueError(f"Unknown benchmark handler: {handler!r} (expected one of {tuple(BENCHMARK_HANDLERS)})")
+        if level not in BENCHMARK_LEVELS:
+            raise ValueError(f"Unknown benchmark level: {level!r} (expected one of {tuple(BENCHMARK_LEVELS)})")
+        self.handler = handler
+        self.level = level
+        self.enabled = enabled
+        self.threads = threads
+        self.processes = processes
+
+    @property
+    def name(self) -> str:
+        name = f"{self.handler}/{self.level}/{'enabled' if self.enabled else 'disabled'}"
+        if self.threads > 1:
+            name += f"/threads={self.threads}"
+        if self.processes > 1:
+            name += f"/processes={self.processes}"
+        return name
+
+
+def default_benchmark_cases(threads: int = 4, processes: int = 2) -> list[BenchmarkCase]:
+    cases = []
+    for handler in BENCHMARK_HANDLERS:
+        for level in BENCHMARK_LEVELS:
+            cases.append(BenchmarkCase(handler, level, enabled=True))
+        cases.append(BenchmarkCase(handler, "trace", enabled=False))
+    if threads > 1:
+        cases += [BenchmarkCase(handler, "trace", threads=threads) for handler in ("file", "websocket", "all")]
+    if processes > 1:
+        cases += [BenchmarkCase(handler, "trace", processes=processes) for handler in ("file", "websocket")]
+    return cases
+
+
+def _build_logger(case: BenchmarkCase, folder: str) -> tuple[logging.Logger, list[logging.Handler]]:
+    # Records go through logger.trace() like application code, which also
+    # needs the method in spawned pool workers
+    _register_custom_levels()
+    logger = logging.getLogger(f"skellylogs.benchmark.{case.handler}.{os.getpid()}.{threading.get_ident()}")
+    logger.propagate = False
+    levelno = BENCHMARK_LEVELS[case.level]
+    # Disabled: the logger sits one step above the record level, as a TRACE call does under an INFO config
+    logger.setLevel(levelno if case.enabled else levelno + 1)
+    handlers = BENCHMARK_HANDLERS[case.handler](folder)
+    for handler in handlers:
+        handler.setLevel(logging.NOTSET)
+        logger.addHandler(handler)
+    return logger, handlers
+
+
+def _close_logger(logger: logging.Logger, handlers: list[logging.Handler]) -> None:
+    for handler in handlers:
+        logger.removeHandler(handler)
+        handler.close()
+        stream = getattr(handler, "stream", None)
+        if isinstance(handler, ColoredConsoleHandler) and stream is not None:
+            stream.close()
+
+
+def _log_records(logger: logging.Logger, level_name: str, records: int) -> int:
+    """Log `records` records through `logger.<level_name>()`; return the elapsed nanoseconds."""
+    log = getattr(logger, level_name.lower())
+    started = time.perf_counter_ns()
+    for i in range(records):
+        log("frame %d grabbed", i)
+    return time.perf_counter_ns() - started
+
+
+def _sample_latencies(logger: logging.Logger, level_name: str, records: int) -> list[int]:
+    log = getattr(logger, level_name.lower())
+    clock = time.perf_counter_ns
+    latencies = []
+    for i in range(records):
+        started = clock()
+        log("frame %d grabbed", i)
+        latencies.append(clock() - started)
+    latencies.sort()
+    return latencies
+
+
+def _percentile(sorted_values: list[int], fraction: float) -> int:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _measure_allocations(logger: logging.Logger, level_name: str, records: int) -> tuple[float, float]:
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        _log_records(logger, level_name, records)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    gc.collect()
+    return (sys.getallocatedblocks() - blocks_before) / records, peak / 1024
+
+
+def _run_in_thread(case: BenchmarkCase, folder: str, records: int, barrier: threading.Barrier, elapsed: list[int]) -> None:
+    logger, handlers = _build_logger(case, folder)
+    try:
+        barrier.wait()
+        elapsed.append(_log_records(logger, case.level, records))
+    finally:
+        _close_logger(logger, handlers)
+
+
+def _run_threads(case: BenchmarkCase, folder: str, records: int) -> list[int]:
+    """Log from `case.threads` threads at once, each with its own logger and handlers."""
+    elapsed: list[int] = []
+    barrier = threading.Barrier(case.threads)
+    threads = [
+        threading.Thread(target=_run_in_thread, args=(case, folder, records, barrier, elapsed))
+        for _ in range(case.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return elapsed
+
+
+def _run_in_process(arguments: tuple[BenchmarkCase, str, int]) -> list[int]:
+    case, folder, records = arguments
+    return _run_threads(case, folder, records)
+
+
+def run_benchmark_case(case: BenchmarkCase, records: int = DEFAULT_BENCHMARK_RECORDS) -> dict:
+    """Measure one case; `records` is per thread (and per process)."""
+    folder = tempfile.mkdtemp(prefix="skellylogs_benchmark_")
+    try:
+        if case.processes > 1:
+            with multiprocessing.Pool(case.processes) as pool:
+                per_process = pool.map(_run_in_process, [(case, folder, records)] * case.processes)
+            elapsed = [ns for process_elapsed in per_process for ns in process_elapsed]
+        else:
+            elapsed = _run_threads(case, folder, records)
+
+        result = {
+            "case": case.name,
+            "handler": case.handler,
+            "level": case.level,
+            "enabled": case.enabled,
+            "threads": case.threads,
+            "processes": case.processes,
+            "records": records * len(elapsed),
+            "ns_per_record": sum(elapsed) / (records * len(elapsed)),
+            # The workers ran side by side, so the slowest one bounds the wall time
+            "records_per_sec": records * len(elapsed) / (max(elapsed) / 1e9),
+        }
+
+        # Latency percentiles and allocations: single thread, in this process
+        logger, handlers = _build_logger(case, folder)
+        try:
+            latencies = _sample_latencies(logger, case.level, min(records, _LATENCY_SAMPLE_SIZE))
+            blocks_per_record, peak_kib = _measure_allocations(logger, case.level, min(records, _LATENCY_SAMPLE_SIZE))
+        finally:
+            _close_logger(logger, handlers)
+        result.update(
+            p50_ns=_percentile(latencies, 0.50),
+            p99_ns=_percentile(latencies, 0.99),
+            allocated_blocks_per_record=blocks_per_record,
+            peak_traced_kib=peak_kib,
+        )
+        return result
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def run_benchmarks(
+    cases: Iterable[BenchmarkCase] | None = None,
+    records: int = DEFAULT_BENCHMARK_RECORDS,
+    progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """Run the cases (default: default_benchmark_cases()) and return the JSON-ready results."""
+    results = []
+    for case in cases if cases is not None else default_benchmark_cases():
+        result = run_benchmark_case(case, records=records)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    return {
+        "version": BENCHMARK_RESULTS_VERSION,
+        "created": time.time(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "records": records,
+        "results": results,
+    }
+
+
+def compare_benchmark_results(
+    baseline: dict,
+    current: dict,
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+) -> list[dict]:
+    """Per-case ns_per_record change against the baseline, for the cases in both.
+
+    Each entry has `case`, `baseline_ns`, `current_ns`, `change` (fractional,
+    +0.25 = 25% slower) and `regression` (change > threshold).
+    """
+    baseline_results = {result["case"]: result for result in baseline["results"]}
+    comparisons = []
+    for result in current["results"]:
+        previous = baseline_results.get(result["case"])
+        if previous is None:
+            continue
+        change = result["ns_per_record"] / previous["ns_per_record"] - 1
+        comparisons.append({
+            "case": result["case"],
+            "baseline_ns": previous["ns_per_record"],
+            "current_ns": result["ns_per_record"],
+            "change": change,
+            "regression": change > threshold,
+        })
+    return comparisons
+
+
+def _format_result(result: dict) -> str:
+    return (
+        f"{result['case']:<42} {result['ns_per_record']:>10.0f} ns {result['records_per_sec']:>12,.0f}/s "
+        f"p50 {result['p50_ns']:>7} p99 {result['p99_ns']:>8} ns "
+        f"{result['allocated_blocks_per_record']:>6.2f} blk {result['peak_traced_kib']:>8.1f} KiB"
+    )
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m skellylogs.benchmark",
+        description="Benchmark skellylogs handlers, formatters and levels; compare against a saved baseline.",
+    )
+    parser.add_argument("--records", type=int, default=DEFAULT_BENCHMARK_RECORDS, help="records per thread and case")
+    parser.add_argument("--handler", action="append", choices=tuple(BENCHMARK_HANDLERS), help="only these handlers (repeatable)")
+    parser.add_argument("--threads", type=int, default=4, help="threads for the multi-thread cases (1 to skip them)")
+    parser.add_argument("--processes", type=int, default=2, help="processes for the multi-process cases (1 to skip them)")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+        help="fraction slower than the baseline that counts as a regression (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    cases = default_benchmark_cases(threads=args.threads, processes=args.processes)
+    if args.handler:
+        cases = [case for case in cases if case.handler in args.handler]
+    results = run_benchmarks(cases, records=args.records, progress=lambda result: print(_format_result(result)))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        comparisons = compare_benchmark_results(baseline, results, threshold=args.threshold)
+        print()
+        for comparison in comparisons:
+            flag = "  REGRESSION" if comparison["regression"] else ""
+            print(
+                f"{comparison['case']:<42} {comparison['baseline_ns']:>10.0f} -> {comparison['current_ns']:>10.0f} ns "
+                f"({comparison['change']:+.1%}){flag}"
+            )
+        if any(comparison["regression"] for comparison in comparisons):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
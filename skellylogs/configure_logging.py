@@ -1,19 +1,50 @@
 from __future__ import annotations
 import logging
 import multiprocessing
+import os
+import sys
+from typing import TYPE_CHECKING, Mapping
 
-from skellylogs.default_paths import get_log_file_path
-from skellylogs.handlers.websocket_log_queue_handler import create_websocket_log_queue
+from skellylogs.filters.delta_time import DELTA_TIME_MODE_GLOBAL
+from skellylogs.handlers.background_listener import MAX_BACKGROUND_LOG_QUEUE_SIZE
+from skellylogs.handlers.buffered_file_handler import DEFAULT_FILE_BUFFER_SIZE
+from skellylogs.handlers.handler_stats import start_logging_stats_reporter, stop_logging_stats_reporter
+from skellylogs.handlers.websocket_log_queue_options import (
+    DEFAULT_WEBSOCKET_BATCH_INTERVAL,
+    DEFAULT_WEBSOCKET_BATCH_SIZE,
+    OVERFLOW_POLICY_DROP_NEWEST,
+    PAYLOAD_FORMAT_DICT,
+    WEBSOCKET_LOG_TRANSPORT_QUEUE,
+)
 from skellylogs.log_levels import LogLevels
 from skellylogs.logger_builder import LoggerBuilder
 from skellylogs.package_log_quieters import DEFAULT_NOISY_PACKAGES, suppress_noisy_package_logs
 
+if TYPE_CHECKING:
+    from skellylogs.load_shedding import LoadSheddingPolicy
+    from skellylogs.log_retention import LogRetentionPolicy
+
+
+# Python 3.11 made findCaller count this method's own frame (it isn't in the
+# logging package); before that, stacklevel=1 already meant its caller
+_CALLER_STACKLEVEL = 2 if sys.version_info >= (3, 11) else 1
+
 
 def _add_log_method(level: LogLevels, name: str) -> None:
+    levelno = level.value
+
     def log_method(self: logging.Logger, message: str, *args: object, **kws: object) -> None:
-        if self.isEnabledFor(level.value):
-            self._log(level.value, message, args, **kws, stacklevel=2)
+        # Logger._cache is the stdlib's per-logger {levelno: enabled} cache,
+        # cleared on every setLevel()/logging.disable(). A hit costs one dict
+        # lookup, which is all a disabled LOOP/TRACE call in a hot loop pays.
+        try:
+            enabled = self._cache[levelno]
+        except KeyError:
+            enabled = self.isEnabledFor(levelno)
+        if enabled:
+            self._log(levelno, message, args, **kws, stacklevel=_CALLER_STACKLEVEL)
 
+    log_method.__name__ = log_method.__qualname__ = name
     setattr(logging.Logger, name, log_method)
 
 
@@ -35,6 +66,28 @@ def configure_logging(
     ws_queue: multiprocessing.Queue | None = None,
     log_file_path: str | None = None,
     suppress_packages: dict[str, int] | None = None,
+    background_listener: bool = False,
+    background_queue_size: int = MAX_BACKGROUND_LOG_QUEUE_SIZE,
+    aggregate_child_processes: bool = False,
+    aggregation_queue: multiprocessing.Queue | None = None,
+    ws_batch_size: int = DEFAULT_WEBSOCKET_BATCH_SIZE,
+    ws_batch_interval: float = DEFAULT_WEBSOCKET_BATCH_INTERVAL,
+    ws_transport: str = WEBSOCKET_LOG_TRANSPORT_QUEUE,
+    ws_overflow_policy: str = OVERFLOW_POLICY_DROP_NEWEST,
+    ws_payload_format: str = PAYLOAD_FORMAT_DICT,
+    rate_limits: Mapping[LogLevels | int, float] | None = None,
+    file_buffer_size: int = DEFAULT_FILE_BUFFER_SIZE,
+    file_max_bytes: int | None = None,
+    file_rotate_interval: float | None = None,
+    log_retention: LogRetentionPolicy | None = None,
+    jsonl_log: bool = False,
+    collect_stats: bool = False,
+    stats_interval: float | None = None,
+    delta_t_mode: str = DELTA_TIME_MODE_GLOBAL,
+    flight_recorder_size: int | None = None,
+    flight_recorder_seconds: float | None = None,
+    flight_recorder_level: LogLevels = LogLevels.TRACE,
+    load_shedding: LoadSheddingPolicy | None = None,
 ) -> None:
     """Configure the root logger with colored console, file, and websocket handlers.
 
@@ -49,21 +102,162 @@ def configure_logging(
         suppress_packages: Map of {logger_name: level} for noisy third-party
             loggers. Defaults to DEFAULT_NOISY_PACKAGES. Pass an empty dict
             to suppress nothing.
+        background_listener: If True, the root logger only gets a lightweight
+            enqueue handler and the file, websocket and console handlers run
+            on a dedicated listener thread. Logging calls on hot threads then
+            cost one bounded, non-blocking put. See
+            get_background_log_listener() for backlog and drop counts.
+        background_queue_size: Capacity of the background listener queue.
+            Records are dropped (and counted) when it is full.
+        aggregate_child_processes: If True (main process only), start a
+            LogAggregator that replays records shipped by child processes
+            into this process's handlers. Pass get_log_aggregation_queue()
+            to each child as `aggregation_queue`.
+        aggregation_queue: Set in child processes to ship every record to
+            the parent's LogAggregator instead of building local file,
+            console and websocket handlers. Takes precedence over ws_queue.
+        ws_batch_size: Coalesce up to this many records into one websocket
+            queue item. 1 (the default) sends one item per record. Batches
+            are also sent after ws_batch_interval seconds or on ERROR.
+            Consumers should read the queue with get_log_records().
+        ws_batch_interval: Maximum age, in seconds, of a pending batch.
+        ws_transport: Transport for an auto-created websocket queue:
+            "queue" (multiprocessing.Queue), "shared_memory"
+            (SharedMemoryLogRing) or "priority" (PriorityLogQueue, with
+            separate capacity for WARNING+). Ignored when ws_queue is passed.
+        ws_overflow_policy: What the websocket handler does when the queue
+            is full: "drop_newest", "drop_oldest" or "sample". Drops are
+            counted per level and reported to the frontend periodically.
+        ws_payload_format: "dict" (LogRecordModel.model_dump(), the default)
+            or "compact" (LogRecordModel.to_bytes()). Consumers decode both
+            with get_log_records()/unpack_log_payload().
+        rate_limits: Per-callsite budgets, {level: records_per_second}, e.g.
+            DEFAULT_CALLSITE_RATE_LIMITS ({LOOP: 10, TRACE: 50}). Records at
+            those levels beyond the budget, or repeating the callsite's last
+            message within a second, are collapsed into a repeat count on the
+            next record from that line. None (the default) disables it.
+        file_buffer_size: Characters the log file handler buffers before
+            writing. The buffer is also written every second, right away on
+            WARNING/ERROR, and at exit. 0 writes every record immediately.
+        file_max_bytes: Roll the log file over to a new segment once it
+            reaches this size. Finished segments are gzipped on a background
+            thread and listed in <log name>.manifest.json. None = no size limit.
+        file_rotate_interval: Roll the log file over after this many
+            seconds. Can be combined with file_max_bytes. None = no time limit.
+        log_retention: Limits (total bytes, age, file count) for the folder
+            the log file is in. Enforced on a background thread after
+            logging is configured: the oldest sessions are compressed, then
+            deleted, first. The current session is never touched. None (the
+            default) never removes anything.
+        jsonl_log: If True, also write every record (TRACE and up) as one
+            compact JSON object per line to <log file stem>.jsonl, with the
+            same fields as LogRecordModel. Buffered, rotated and retained
+            like the text log.
+        collect_stats: If True, time every emit of the installed handlers
+            and count their records, bytes, queue-full drops and errors per
+            level. Read them with get_logging_stats(). Costs about a
+            microsecond per record per handler.
+        stats_interval: Log a one-line summary of the handler stats (as an
+            INFO record from the "skellylogs.stats" logger) every this many
+            seconds. Implies collect_stats. None (the default) never does.
+        delta_t_mode: What each record's Δt is measured from: "global" (the
+            previous record anywhere in the process, the default), "thread"
+            (the previous record from the same thread) or "logger" (the
+            previous record from the same logger).
+        flight_recorder_size: Keep up to this many records below `level`
+            (down to flight_recorder_level) in memory, unformatted, and write
+            them to the log file, JSON Lines log and websocket when an ERROR
+            is logged. The console never gets them. None (the default) turns
+            the recorder off unless flight_recorder_seconds is set.
+        flight_recorder_seconds: Only dump the records from this many
+            seconds before the ERROR. Turns the recorder on by itself, with
+            a capacity of 10,000 records.
+        flight_recorder_level: Lowest level the flight recorder keeps,
+            TRACE by default. With LOOP it also keeps LOOP records, but the
+            websocket never shows those.
+        load_shedding: While the handler queues fill up, drop records or
+            emits slow down, thin out and then stop records below
+            LoadSheddingPolicy.shed_below (LOOP and TRACE by default),
+            restoring them once the pressure clears. Every change is logged
+            by the "skellylogs.load_shedding" logger. Implies collect_stats.
+            None (the default) never sheds.
     """
     if suppress_packages is None:
         suppress_packages = DEFAULT_NOISY_PACKAGES
     suppress_noisy_package_logs(packages=suppress_packages)
 
     _register_custom_levels()
+    stop_logging_stats_reporter()
+    collect_stats = collect_stats or stats_interval is not None
+
+    if aggregation_queue is not None:
+        LoggerBuilder(
+            level=level,
+            queue=None,
+            log_file_path=None,
+            background_listener=background_listener,
+            background_queue_size=background_queue_size,
+            aggregation_queue=aggregation_queue,
+            rate_limits=rate_limits,
+            collect_stats=collect_stats,
+            delta_t_mode=delta_t_mode,
+            load_shedding=load_shedding,
+        ).configure()
+        if stats_interval is not None:
+            start_logging_stats_reporter(stats_interval)
+        return
+
+    # Imported here, not at module level: a child process that only ships
+    # records to its parent (above) never needs the main-process sinks
+    from skellylogs.default_paths import get_jsonl_file_path, get_log_file_path
+    from skellylogs.handlers.websocket_log_queue_handler import create_websocket_log_queue
 
     if ws_queue is None:
         # Do not create a new queue if not in the main process
         if not multiprocessing.current_process().name.lower() == "mainprocess":
             return
-        ws_queue = create_websocket_log_queue()
+        ws_queue = create_websocket_log_queue(transport=ws_transport)
 
     if log_file_path is None:
         log_file_path = get_log_file_path()
 
-    builder = LoggerBuilder(level=level, queue=ws_queue, log_file_path=log_file_path)
+    builder = LoggerBuilder(
+        level=level,
+        queue=ws_queue,
+        log_file_path=log_file_path,
+        background_listener=background_listener,
+        background_queue_size=background_queue_size,
+        ws_batch_size=ws_batch_size,
+        ws_batch_interval=ws_batch_interval,
+        ws_overflow_policy=ws_overflow_policy,
+        ws_payload_format=ws_payload_format,
+        rate_limits=rate_limits,
+        file_buffer_size=file_buffer_size,
+        file_max_bytes=file_max_bytes,
+        file_rotate_interval=file_rotate_interval,
+        jsonl_file_path=get_jsonl_file_path(log_file_path) if jsonl_log else None,
+        collect_stats=collect_stats,
+        delta_t_mode=delta_t_mode,
+        flight_recorder_size=flight_recorder_size,
+        flight_recorder_seconds=flight_recorder_seconds,
+        flight_recorder_level=flight_recorder_level,
+        load_shedding=load_shedding,
+    )
     builder.configure()
+
+    if stats_interval is not None:
+        start_logging_stats_reporter(stats_interval)
+
+    if log_retention is not None:
+        from skellylogs.log_retention import start_log_retention
+
+        start_log_retention(
+            log_folder=os.path.dirname(os.path.abspath(log_file_path)),
+            policy=log_retention,
+            active_log_file=log_file_path,
+        )
+
+    if aggregate_child_processes:
+        from skellylogs.handlers.process_log_aggregator import start_log_aggregator
+
+        start_log_aggregator()
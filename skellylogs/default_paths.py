@@ -4,6 +4,11 @@ from pathlib import Path
 
 DEFAULT_SKELLYLOGS_BASE_FOLDER_NAME = "skellylogs_data"
 LOGS_FOLDER_NAME = "logs"
+JSONL_LOG_FILE_EXTENSION = ".jsonl"
+LOG_INDEX_SUFFIX = ".idx.json"  # python -m skellylogs.query's sidecar index: <log file>.idx.json
+LOG_FILE_NAME_PREFIX = "log_"
+# The stem _create_log_file_name() gives every session: log_2025-01-01T00_00_00ms000_gmt+0
+LOG_SESSION_NAME_PATTERN = r"log_\d{4}-\d{2}-\d{2}T\d{2}_\d{2}_\d{2}(?:ms\d+)?_gmt[+-]\d+"
 
 
 def _get_base_folder_path() -> Path:
@@ -28,7 +33,7 @@ def _get_iso8601_time_string(
 
 
 def _create_log_file_name() -> str:
-    return f"log_{_get_iso8601_time_string()}.log"
+    return f"{LOG_FILE_NAME_PREFIX}{_get_iso8601_time_string()}.log"
 
 
 def get_log_file_path() -> str:
@@ -39,3 +44,8 @@ def get_log_file_path() -> str:
     log_folder = _get_base_folder_path() / LOGS_FOLDER_NAME
     log_folder.mkdir(exist_ok=True, parents=True)
     return str(log_folder / _create_log_file_name())
+
+
+def get_jsonl_file_path(log_file_path: str) -> str:
+    """Return the JSON Lines path that sits next to a text log: <stem>.log -> <stem>.jsonl"""
+    return str(Path(log_file_path).with_suffix(JSONL_LOG_FILE_EXTENSION))
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Mapping
+
+from ..log_levels import LogLevels
+
+# Per-callsite budgets, in records/second, for the levels meant for hot loops.
+# Levels without a budget are never rate limited.
+DEFAULT_CALLSITE_RATE_LIMITS: dict[LogLevels, float] = {
+    LogLevels.LOOP: 10.0,
+    LogLevels.TRACE: 50.0,
+}
+DEFAULT_DEDUP_WINDOW = 1.0  # seconds an identical message from the same callsite is collapsed for
+
+# Set on each rate-limited record, so the verdict is made once per record
+# even when the filter is attached to several handlers
+RATE_LIMIT_VERDICT_ATTRIBUTE = "rate_limit_passed"
+
+
+class _CallsiteState:
+    __slots__ = ("tokens", "updated", "last_message", "last_passed", "suppressed", "first_suppressed", "last_suppressed")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.last_message: str | None = None
+        self.last_passed = 0.0
+        self.suppressed = 0
+        self.first_suppressed = 0.0
+        self.last_suppressed = 0.0
+
+
+class CallsiteRateLimitFilter(logging.Filter):
+    """Rate limits and deduplicates LOOP/TRACE records per callsite.
+
+    Each (pathname, lineno) gets a token bucket refilled at its level's
+    budget (records/second, bursting up to one second's worth). A record is
+    suppressed when its callsite is out of budget, or when it repeats the
+    callsite's last message within `dedup_window` seconds. The next record
+    that passes from that callsite carries a summary of what was suppressed:
+
+        frame 1042 grabbed (+118 suppressed over 0.991s)
+
+    along with `repeat_count` and `repeat_span` attributes. Records at levels
+    without a budget pass untouched, at the cost of one dict lookup.
+
+    Suppressed records are summarized only when their callsite logs again, so
+    a loop that stops mid-burst leaves its last suppressed records unreported.
+    """
+
+    def __init__(
+        self,
+        rate_limits: Mapping[LogLevels | int, float] | None = None,
+        dedup_window: float = DEFAULT_DEDUP_WINDOW,
+    ):
+        super().__init__()
+        if rate_limits is None:
+            rate_limits = DEFAULT_CALLSITE_RATE_LIMITS
+        self.rate_limits = {
+            (level.value if isinstance(level, LogLevels) else int(level)): float(rate)
+            for level, rate in rate_limits.items()
+        }
+        self.dedup_window = dedup_window
+        self.suppressed_count = 0
+        self._callsites: dict[tuple[str, int], _CallsiteState] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rate_limits.get(record.levelno)
+        if rate is None:
+            return True
+        verdict = record.__dict__.get(RATE_LIMIT_VERDICT_ATTRIBUTE)
+        if verdict is None:
+            with self._lock:
+                verdict = self._check(record, rate)
+            setattr(record, RATE_LIMIT_VERDICT_ATTRIBUTE, verdict)
+        return verdict
+
+    def _check(self, record: logging.LogRecord, rate: float) -> bool:
+        now = record.created
+        key = (record.pathname, record.lineno)
+        state = self._callsites.get(key)
+        if state is None:
+            state = self._callsites[key] = _CallsiteState(tokens=rate, now=now)
+        else:
+            state.tokens = min(rate, state.tokens + (now - state.updated) * rate)
+            state.updated = now
+
+        message = record.getMessage()
+        is_duplicate = message == state.last_message and now - state.last_passed < self.dedup_window
+        if is_duplicate or state.tokens < 1:
+            if not state.suppressed:
+                state.first_suppressed = now
+            state.suppressed += 1
+            state.last_suppressed = now
+            self.suppressed_count += 1
+            return False
+
+        state.tokens -= 1
+        state.last_message = message
+        state.last_passed = now
+        if state.suppressed:
+            span = state.last_suppressed - state.first_suppressed
+            record.repeat_count = state.suppressed
+            record.repeat_span = span
+            # Bake the summary into the message so every sink shows it
+            record.msg = f"{message} (+{state.suppressed} suppressed over {span:.3f}s)"
+            record.args = None
+            state.suppressed = 0
+        return True
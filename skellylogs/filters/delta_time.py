@@ -1,16 +1,45 @@
+from __future__ import annotations
+
 import logging
-from datetime import datetime
+import time
+
+# What a record's Δt is measured from
+DELTA_TIME_MODE_GLOBAL = "global"  # the previous record from anywhere in the process
+DELTA_TIME_MODE_THREAD = "thread"  # the previous record from the same thread
+DELTA_TIME_MODE_LOGGER = "logger"  # the previous record from the same logger
+DELTA_TIME_MODES = (DELTA_TIME_MODE_GLOBAL, DELTA_TIME_MODE_THREAD, DELTA_TIME_MODE_LOGGER)
+
+# Set by handlers that hand records to another thread (the background
+# EnqueueHandler), so Δt reflects when the call was made, not when it was formatted
+PERF_COUNTER_NS_ATTRIBUTE = "perf_counter_ns"
 
 
 class DeltaTimeFilter(logging.Filter):
-    """Adds Δt since last log to records"""
+    """Adds Δt since the previous log to records
+
+    Measured on the monotonic time.perf_counter_ns clock, so Δt doesn't jump
+    with wall-clock adjustments. In the "thread" and "logger" modes each
+    thread (or logger) has its own previous time, so interleaved camera
+    threads each get a meaningful Δt; the first record of each reports
+    0.000ms.
+    """
 
-    def __init__(self):
-        self.prev_time = datetime.now().timestamp()
+    def __init__(self, mode: str = DELTA_TIME_MODE_GLOBAL):
+        if mode not in DELTA_TIME_MODES:
+            raise ValueError(f"Unknown delta time mode: {mode!r} (expected one of {DELTA_TIME_MODES})")
+        self.mode = mode
+        self.prev_time_ns = time.perf_counter_ns()
+        self._prev_time_ns_by_key: dict = {}
         super().__init__()
 
     def filter(self, record: logging.LogRecord) -> bool:
-        current_time = datetime.now().timestamp()
-        record.delta_t = f"{(current_time - self.prev_time) * 1000:.3f}ms"
-        self.prev_time = current_time
+        current_time_ns = record.__dict__.get(PERF_COUNTER_NS_ATTRIBUTE) or time.perf_counter_ns()
+        if self.mode == DELTA_TIME_MODE_GLOBAL:
+            delta_ns = current_time_ns - self.prev_time_ns
+            self.prev_time_ns = current_time_ns
+        else:
+            key = record.thread if self.mode == DELTA_TIME_MODE_THREAD else record.name
+            delta_ns = current_time_ns - self._prev_time_ns_by_key.get(key, current_time_ns)
+            self._prev_time_ns_by_key[key] = current_time_ns
+        record.delta_t = f"{delta_ns / 1_000_000:.3f}ms"
         return True
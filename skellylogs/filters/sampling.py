@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+# Set on each sampled record, so the verdict is made once per record even
+# when the filter is attached to several handlers
+SAMPLING_VERDICT_ATTRIBUTE = "sampling_passed"
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in `sample_every` records below `below_level`; records at or above it always pass.
+
+    Installed by the load shedding controller while the logging pipeline is
+    under pressure, so a LOOP/TRACE flood is thinned out before any handler
+    formats it. With `drop_all` set, every record below `below_level` is
+    dropped. Like the rate limiter, attach one shared instance to every
+    handler (root logger filters don't see propagated records).
+    """
+
+    def __init__(self, below_level: int, sample_every: int):
+        if sample_every < 1:
+            raise ValueError(f"sample_every must be at least 1, got {sample_every}")
+        super().__init__()
+        self.below_level = below_level
+        self.sample_every = sample_every
+        self.drop_all = False
+        self.dropped_count = 0
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.below_level:
+            return True
+        verdict = record.__dict__.get(SAMPLING_VERDICT_ATTRIBUTE)
+        if verdict is None:
+            with self._lock:
+                # The first of every sample_every records passes
+                verdict = not self.drop_all and self._counter % self.sample_every == 0
+                self._counter += 1
+                if not verdict:
+                    self.dropped_count += 1
+            setattr(record, SAMPLING_VERDICT_ATTRIBUTE, verdict)
+        return verdict
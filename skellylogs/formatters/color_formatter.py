@@ -1,8 +1,11 @@
+from __future__ import annotations
+
 import copy
 import logging
 
 from .custom_formatter import CustomFormatter
-from ..log_format_string import LOG_POINTER_STRING
+from .record_renderer import render_record
+from ..log_format_string import COLOR_LOG_FORMAT_STRING, LOG_POINTER_STRING
 from ..logging_color_helpers import get_hashed_color
 
 LOG_COLOR_CODES = {
@@ -16,11 +19,50 @@ LOG_COLOR_CODES = {
     "ERROR": "\033[41m",  # Red background
 }
 
+RESET_COLOR = "\033[0m"
+
+# Everything before the message, per level: colored pointer + message color
+LEVEL_PREFIX_TEMPLATES = {
+    levelname: f"{color}{color}{LOG_POINTER_STRING}{RESET_COLOR} {color}"
+    for levelname, color in LOG_COLOR_CODES.items()
+}
+_UNCOLORED_PREFIX_TEMPLATE = f"{LOG_POINTER_STRING}{RESET_COLOR} "
+
+# PIDs/TIDs repeat on nearly every record, so their colored fragments are
+# memoized. Bounded, because thread ids churn in long-running apps.
+MAX_MEMOIZED_ID_FRAGMENTS = 1024
+_id_fragments: dict[str, str] = {}
+
+
+def _colored_id_fragment(value: int, rendered: str) -> str:
+    """`rendered` (e.g. 'PID:123:MainProcess') wrapped in the hashed color for `value`."""
+    fragment = _id_fragments.get(rendered)
+    if fragment is None:
+        if len(_id_fragments) >= MAX_MEMOIZED_ID_FRAGMENTS:
+            _id_fragments.clear()
+        fragment = _id_fragments[rendered] = f"{get_hashed_color(value)}{rendered}{RESET_COLOR}"
+    return fragment
+
 
 class ColorFormatter(CustomFormatter):
     """Adds ANSI colors to PID, TID, and log messages"""
 
     def format(self, record: logging.LogRecord) -> str:
+        if self.format_string != COLOR_LOG_FORMAT_STRING:
+            return self._format_custom_string(record)
+
+        # Reuse the pieces rendered once for all handlers; color is just
+        # precompiled per-level strings and memoized PID/TID fragments
+        render_record(record)
+        return (
+            f"{LEVEL_PREFIX_TEMPLATES.get(record.levelname, _UNCOLORED_PREFIX_TEMPLATE)}"
+            f"{record.message}{RESET_COLOR} | {record.formatted_details}"
+            f" {_colored_id_fragment(record.process, record.formatted_pid)}"
+            f" |  {_colored_id_fragment(record.thread, record.formatted_tid)}"
+            f"{record.formatted_exception}{RESET_COLOR}"
+        )
+
+    def _format_custom_string(self, record: logging.LogRecord) -> str:
         # Pre-format exception text so the traceback object doesn't need to survive the copy
         if record.exc_info and not record.exc_text:
             record.exc_text = self.formatException(record.exc_info)
@@ -34,10 +76,10 @@ class ColorFormatter(CustomFormatter):
 
         # Apply level color to message
         level_color = LOG_COLOR_CODES.get(record.levelname, "")
-        record.msg = f"{level_color}{record.msg}\033[0m"
+        record.msg = f"{level_color}{record.msg}{RESET_COLOR}"
 
         # Format with parent class
-        formatted = super().format(record)
-        formatted = f"{level_color}{formatted}\033[0m"
+        formatted = logging.Formatter.format(self, record)
+        formatted = f"{level_color}{formatted}{RESET_COLOR}"
         # Add color to structural elements
-        return formatted.replace(LOG_POINTER_STRING, f"{level_color}{LOG_POINTER_STRING}\033[0m")
\ No newline at end of file
+        return formatted.replace(LOG_POINTER_STRING, f"{level_color}{LOG_POINTER_STRING}{RESET_COLOR}")
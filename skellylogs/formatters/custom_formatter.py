@@ -1,5 +1,7 @@
 import logging
-from datetime import datetime
+
+from .record_renderer import format_asctime, render_record
+from ..log_format_string import LOG_FORMAT_STRING
 
 
 class CustomFormatter(logging.Formatter):
@@ -9,5 +11,11 @@ class CustomFormatter(logging.Formatter):
         super().__init__(fmt=format_string, datefmt="%Y-%m-%dT%H:%M:%S")
         self.format_string = format_string
 
+    def format(self, record: logging.LogRecord) -> str:
+        if self.format_string == LOG_FORMAT_STRING:
+            # Shared with every other handler that sees this record
+            return render_record(record)
+        return super().format(record)
+
     def formatTime(self, record: logging.LogRecord, datefmt: str = None) -> str:
-        return datetime.fromtimestamp(record.created).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+        return format_asctime(record.created)
@@ -0,0 +1,18 @@
+import logging
+
+from .record_renderer import render_record
+from ..handlers.websocket_log_queue_handler import log_record_to_model
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as one compact JSON object: the LogRecordModel fields.
+
+    Pair with a (buffered or rotating) file handler to get a JSON Lines file
+    that analysis code can stream-parse with json.loads, instead of
+    regex-parsing the pipe-delimited text lines. Newlines in messages and
+    tracebacks are escaped by JSON, so every record is exactly one line.
+    The text rendering is shared with the other handlers via render_record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        return log_record_to_model(record, formatted_message=render_record(record)).model_dump_json()
@@ -0,0 +1,87 @@
+import logging
+import time
+
+from ..filters.delta_time import DELTA_TIME_MODE_GLOBAL, DeltaTimeFilter
+from ..log_format_string import (
+    LOG_DETAILS_FORMAT_STRING,
+    LOG_PID_FORMAT_STRING,
+    LOG_POINTER_STRING,
+    LOG_TID_FORMAT_STRING,
+)
+
+# One Δt clock for every handler, so each record gets a single, consistent delta
+_SHARED_DELTA_TIME = DeltaTimeFilter()
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+# (second, "YYYY-MM-DDTHH:MM:SS") for the most recent second formatted. Records
+# arrive in bursts within the same second, so strftime rarely needs to run.
+_cached_second: tuple = (None, "")
+
+
+def set_delta_time_mode(mode: str = DELTA_TIME_MODE_GLOBAL) -> None:
+    """Choose what every handler's Δt is measured from: "global", "thread" or "logger"."""
+    global _SHARED_DELTA_TIME
+    _SHARED_DELTA_TIME = DeltaTimeFilter(mode=mode)
+
+
+def format_asctime(created: float) -> str:
+    """ISO-8601 timestamp with millisecond precision, e.g. 2025-02-20T14:30:01.123"""
+    global _cached_second
+    # Same rounding as datetime.fromtimestamp: round the fractional part to microseconds
+    second = int(created)
+    microsecond = round((created - second) * 1_000_000)
+    if microsecond >= 1_000_000:
+        second += 1
+        microsecond -= 1_000_000
+    cached_second, second_string = _cached_second
+    if second != cached_second:
+        second_string = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+        _cached_second = (second, second_string)
+    return f"{second_string}.{microsecond // 1000:03d}"
+
+
+def render_record(record: logging.LogRecord) -> str:
+    """Render the plain LOG_FORMAT_STRING line for a record, once.
+
+    The first handler to format a record pays for getMessage(), formatTime,
+    Δt and the %-formatting; the results are cached on the record so every
+    other handler (file, websocket, console) reuses them. Besides the
+    standard `message`, `asctime` and `delta_t`, this sets:
+
+        formatted_details:   levelname | delta_t | location | asctime part
+        formatted_pid:       PID:<process>:<processName>
+        formatted_tid:       TID:<thread>:<threadName>
+        formatted_exception: newline-prefixed traceback/stack text, or ""
+        formatted_message:   the full plain line, including the exception
+
+    The color layer (ColorFormatter) wraps these pieces in ANSI codes
+    without formatting anything again.
+    """
+    rendered = record.__dict__.get("formatted_message")
+    if rendered is not None:
+        return rendered
+
+    record.message = record.getMessage()
+    record.asctime = format_asctime(record.created)
+    if "delta_t" not in record.__dict__:
+        _SHARED_DELTA_TIME.filter(record)
+
+    values = record.__dict__
+    record.formatted_details = LOG_DETAILS_FORMAT_STRING % values
+    record.formatted_pid = LOG_PID_FORMAT_STRING % values
+    record.formatted_tid = LOG_TID_FORMAT_STRING % values
+
+    if record.exc_info and not record.exc_text:
+        record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+    exception = ""
+    if record.exc_text:
+        exception = "\n" + record.exc_text
+    if record.stack_info:
+        exception += "\n" + _EXCEPTION_FORMATTER.formatStack(record.stack_info)
+    record.formatted_exception = exception
+
+    record.formatted_message = (
+        f"{LOG_POINTER_STRING} {record.message} | {record.formatted_details}"
+        f" {record.formatted_pid} |  {record.formatted_tid}{exception}"
+    )
+    return record.formatted_message
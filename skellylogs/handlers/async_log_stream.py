@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from typing import TYPE_CHECKING, AsyncIterator
+
+from .priority_log_queue import PriorityLogQueue
+from .websocket_log_queue_handler import LogRecordModel, drain_log_records
+
+if TYPE_CHECKING:
+    from .log_history import LogHistoryStore
+
+# How often to look for records when the queue has no pipe the event loop can
+# watch: a SharedMemoryLogRing, a thread queue.Queue, or a ProactorEventLoop
+DEFAULT_ASYNC_POLL_INTERVAL = 0.02  # seconds
+
+
+def _pipe_file_descriptors(queue) -> list[int]:
+    """File descriptors that become readable when a record is put on `queue`, or []."""
+    lanes = [queue.priority_lane, queue.bulk_lane] if isinstance(queue, PriorityLogQueue) else [queue]
+    descriptors = []
+    for lane in lanes:
+        # multiprocessing.Queue's feeder thread writes every item to this pipe
+        reader = getattr(lane, "_reader", None)
+        if reader is None:
+            return []
+        try:
+            descriptors.append(reader.fileno())
+        except (OSError, ValueError):
+            return []
+    return descriptors
+
+
+async def stream_log_records(
+    queue: multiprocessing.Queue,
+    history: LogHistoryStore | None = None,
+    poll_interval: float = DEFAULT_ASYNC_POLL_INTERVAL,
+) -> AsyncIterator[list[LogRecordModel]]:
+    """Yield batches of records from the websocket log queue, without a thread.
+
+        async for records in stream_log_records(get_websocket_log_queue()):
+            await broadcast([record.model_dump() for record in records])
+
+    For a multiprocessing.Queue (and both lanes of a PriorityLogQueue) the
+    event loop watches the queue's pipe, so the iterator wakes as soon as a
+    record is written instead of on a timer. Each wakeup drains everything
+    already queued and yields it as one list, oldest first, so a burst
+    costs one wakeup and one send. Queues without a pipe, and event loops
+    that can't watch one (the Windows ProactorEventLoop), are checked every
+    `poll_interval` seconds instead.
+
+    With `history`, every batch is added to the LogHistoryStore (and so
+    carries sequence ids) before it is yielded.
+
+    Reading a record off a multiprocessing.Queue is a short blocking call
+    once its pipe is readable. Only iterate over a queue from one place.
+    """
+    loop = asyncio.get_running_loop()
+    readable = asyncio.Event()
+    watched: list[int] = []
+    for descriptor in _pipe_file_descriptors(queue):
+        try:
+            loop.add_reader(descriptor, readable.set)
+        except (NotImplementedError, OSError, ValueError):
+            # This loop can't watch pipes; poll every lane instead
+            for watched_descriptor in watched:
+                loop.remove_reader(watched_descriptor)
+            watched = []
+            break
+        watched.append(descriptor)
+
+    try:
+        while True:
+            records = drain_log_records(queue)
+            if records:
+                if history is not None:
+                    history.add(records)
+                yield records
+                continue
+            if not watched:
+                await asyncio.sleep(poll_interval)
+                continue
+            # add_reader is level-triggered: if data lands between the drain
+            # above and this clear, the callback fires again on the next
+            # loop iteration, so no wakeup is lost
+            readable.clear()
+            await readable.wait()
+    finally:
+        for descriptor in watched:
+            loop.remove_reader(descriptor)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import queue as queue_module
+import time
+from logging.handlers import QueueListener
+from typing import Optional, Sequence
+
+from ..filters.delta_time import PERF_COUNTER_NS_ATTRIBUTE
+
+MAX_BACKGROUND_LOG_QUEUE_SIZE = 10_000
+
+
+class EnqueueHandler(logging.Handler):
+    """Root-side handler that only hands records to the background listener.
+
+    This is the only handler the calling thread runs in background mode, so
+    it does as little as possible: no formatting, no handler lock, one
+    non-blocking put. If the listener has fallen behind and the queue is full,
+    the record is dropped and counted — a camera frame-grab loop must never
+    block waiting on stdout or disk.
+
+    Message args are rendered later on the listener thread, so callers should
+    not mutate objects they pass as log args after the call.
+    """
+
+    def __init__(self, queue: queue_module.Queue):
+        super().__init__()
+        self.queue = queue
+        self.dropped_count = 0
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # Skip the handler lock taken by logging.Handler.handle — queue.Queue
+        # is already thread-safe and emit touches nothing else.
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            # Δt is computed on the listener thread; measure it from the call, not
+            # the dequeue (records replayed from a child process already carry it)
+            if PERF_COUNTER_NS_ATTRIBUTE not in record.__dict__:
+                record.perf_counter_ns = time.perf_counter_ns()
+            self.queue.put_nowait(record)
+        except queue_module.Full:
+            self.dropped_count += 1
+        except Exception:
+            self.handleError(record)
+
+
+class BackgroundLogListener(QueueListener):
+    """Runs the real handlers on a dedicated thread, fed by an EnqueueHandler.
+
+    Records are dispatched in the order they were enqueued and each handler's
+    own level is respected. `stop()` drains everything still queued and
+    flushes the handlers; it is registered with atexit so nothing is lost at
+    interpreter shutdown.
+    """
+
+    def __init__(
+        self,
+        handlers: Sequence[logging.Handler],
+        max_queue_size: int = MAX_BACKGROUND_LOG_QUEUE_SIZE,
+    ):
+        super().__init__(queue_module.Queue(maxsize=max_queue_size), *handlers, respect_handler_level=True)
+        self.enqueue_handler = EnqueueHandler(self.queue)
+
+    @property
+    def backlog(self) -> int:
+        """Number of records enqueued but not yet dispatched to the handlers."""
+        return self.queue.qsize()
+
+    @property
+    def dropped_count(self) -> int:
+        """Number of records dropped because the queue was full."""
+        return self.enqueue_handler.dropped_count
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        super().start()
+        self._thread.name = "skellylogs-background-listener"
+        atexit.register(self.stop)
+
+    def enqueue_sentinel(self) -> None:
+        # Block rather than put_nowait: the sentinel must get in even when
+        # the queue is full, or stop() would raise instead of draining.
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        """Drain the queue, flush all handlers and join the listener thread."""
+        if not self.is_running:
+            return
+        atexit.unregister(self.stop)
+        super().stop()
+        for handler in self.handlers:
+            handler.flush()
+
+
+BACKGROUND_LOG_LISTENER: Optional[BackgroundLogListener] = None
+
+
+def start_background_log_listener(
+    handlers: Sequence[logging.Handler],
+    max_queue_size: int = MAX_BACKGROUND_LOG_QUEUE_SIZE,
+) -> BackgroundLogListener:
+    """Start a new listener for `handlers`, stopping any previous one first."""
+    global BACKGROUND_LOG_LISTENER
+    stop_background_log_listener()
+    BACKGROUND_LOG_LISTENER = BackgroundLogListener(handlers=handlers, max_queue_size=max_queue_size)
+    BACKGROUND_LOG_LISTENER.start()
+    return BACKGROUND_LOG_LISTENER
+
+
+def stop_background_log_listener() -> None:
+    """Flush and stop the running listener, if any."""
+    global BACKGROUND_LOG_LISTENER
+    if BACKGROUND_LOG_LISTENER is not None:
+        BACKGROUND_LOG_LISTENER.stop()
+        BACKGROUND_LOG_LISTENER = None
+
+
+def get_background_log_listener() -> BackgroundLogListener:
+    global BACKGROUND_LOG_LISTENER
+    if BACKGROUND_LOG_LISTENER is None:
+        raise ValueError("Background log listener not started yet")
+    return BACKGROUND_LOG_LISTENER
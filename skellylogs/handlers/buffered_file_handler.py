@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import os
+import weakref
+
+from ..log_levels import LogLevels
+from .periodic_flusher import PeriodicFlusher
+
+DEFAULT_FILE_BUFFER_SIZE = 64 * 1024  # characters buffered before a write
+DEFAULT_FILE_FLUSH_INTERVAL = 1.0  # seconds
+FILE_FLUSH_LEVEL = LogLevels.WARNING.value  # records at or above this level are written right away
+# Run before multiprocessing's own exit finalizers (queue feeder threads etc.)
+CHILD_PROCESS_FLUSH_EXIT_PRIORITY = 10
+
+_LIVE_HANDLERS: weakref.WeakSet = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for handler in list(_LIVE_HANDLERS):
+        handler._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """A FileHandler that writes in batches instead of once per record.
+
+    logging.FileHandler writes and flushes every record, so a TRACE-heavy
+    loop costs one write syscall per line. This handler appends formatted
+    lines to an in-memory buffer and writes it out in one call when:
+
+        - the buffer reaches `buffer_size` characters,
+        - `flush_interval` seconds have passed (on a PeriodicFlusher thread),
+        - a record at or above `flush_level` (WARNING) arrives, so the lines
+          leading up to a problem are on disk before anything else happens,
+        - the handler is flushed or closed, or the interpreter exits.
+
+    The disk write rate is then bounded by the flush cadence rather than the
+    log rate. `buffer_size=0` writes every record, like logging.FileHandler.
+
+    multiprocessing children end with os._exit, which skips atexit, so a
+    handler created in a child process also flushes from a
+    multiprocessing.util.Finalize. A handler inherited through fork writes
+    every record straight through in the child, which has no flusher thread.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        mode: str = "a",
+        encoding: str | None = "utf-8",
+        buffer_size: int = DEFAULT_FILE_BUFFER_SIZE,
+        flush_interval: float = DEFAULT_FILE_FLUSH_INTERVAL,
+        flush_level: int = FILE_FLUSH_LEVEL,
+    ):
+        super().__init__(filename, mode=mode, encoding=encoding)
+        self.buffer_size = buffer_size
+        self.flush_level = flush_level
+        self._buffer: list[str] = []
+        self._buffered_size = 0
+        # Set once the stream is reopened after close(): nothing flushes the buffer then
+        self._write_through = False
+
+        self._flusher: PeriodicFlusher | None = None
+        if buffer_size > 0 and flush_interval > 0:
+            self._flusher = PeriodicFlusher(
+                interval=flush_interval,
+                callback=self.flush,
+                name="skellylogs-file-flusher",
+            )
+            self._flusher.start()
+        atexit.register(self.flush)
+        self._child_process_finalizer = None
+        if multiprocessing.parent_process() is not None:
+            # Already imported in any multiprocessing child
+            from multiprocessing.util import Finalize
+
+            self._child_process_finalizer = Finalize(
+                self, self.flush, exitpriority=CHILD_PROCESS_FLUSH_EXIT_PRIORITY
+            )
+        _LIVE_HANDLERS.add(self)
+
+    @property
+    def buffered_size(self) -> int:
+        """Characters formatted but not yet written to the file."""
+        return self._buffered_size
+
+    def _after_fork_in_child(self) -> None:
+        # The buffered lines are the parent's to write
+        self._buffer.clear()
+        self._buffered_size = 0
+        self._flusher = None
+        self._write_through = True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Called with the handler lock held (see logging.Handler.handle)
+        try:
+            line = self.format(record) + self.terminator
+            self._buffer.append(line)
+            self._buffered_size += len(line)
+            if (
+                self._buffered_size >= self.buffer_size
+                or record.levelno >= self.flush_level
+                or self._write_through
+                or self.stream is None
+            ):
+                self._write_buffer()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _write_buffer(self) -> None:
+        if not self._buffer:
+            return
+        if self.stream is None:
+            # Records arriving after close() (e.g. from a listener still draining
+            # during a reconfigure): reopen, as logging.FileHandler.emit does
+            if self.mode == "w" and getattr(self, "_closed", False):
+                self._buffer.clear()
+                self._buffered_size = 0
+                return
+            self.stream = self._open()
+            self._write_through = True
+        self.stream.write("".join(self._buffer))
+        self.stream.flush()
+        self._buffer.clear()
+        self._buffered_size = 0
+
+    def flush(self) -> None:
+        with self.lock:
+            self._write_buffer()
+
+    def close(self) -> None:
+        if self._flusher is not None:
+            # Don't join: logging.shutdown() closes handlers with the lock
+            # held, and the flusher thread may be waiting on that lock
+            self._flusher.stop(wait=False)
+            self._flusher = None
+        atexit.unregister(self.flush)
+        if self._child_process_finalizer is not None:
+            self._child_process_finalizer.cancel()
+            self._child_process_finalizer = None
+        super().close()  # flushes, then closes the stream
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Optional, Sequence
+
+from ..filters.delta_time import PERF_COUNTER_NS_ATTRIBUTE
+from ..log_levels import LogLevels
+
+DEFAULT_FLIGHT_RECORDER_CAPACITY = 10_000
+FLIGHT_RECORDER_TRIGGER_LEVEL = LogLevels.ERROR.value
+FLIGHT_RECORDER_LOGGER_NAME = "skellylogs.flight_recorder"
+
+
+class FlightRecorderHandler(logging.Handler):
+    """Keeps the last `capacity` low-level records and replays them on ERROR.
+
+    The console and websocket usually run at INFO. The recorder sits on the
+    root logger at TRACE (or LOOP) and keeps every record its `targets` (the
+    file sinks and the websocket) rejected by level. It stores references to
+    the raw LogRecords in a preallocated ring and never formats anything, so
+    recording one costs a slot write and a clock read.
+
+    When a record at or above `trigger_level` arrives, the recorder sends
+    each target the buffered records it missed, oldest first, behind an INFO
+    header line from the "skellylogs.flight_recorder" logger, and then
+    empties the ring. Only then do the targets format these records. The
+    recorder is installed ahead of the other handlers, so the dump lands
+    right before the ERROR that caused it. The dumped records are older
+    than the INFO records already written, so the file is not strictly in
+    time order around a dump.
+
+    `max_age` (seconds) also drops records older than that relative to the
+    trigger. As with the background listener, message args are only
+    rendered at dump time, so don't mutate objects passed as log args.
+    """
+
+    def __init__(
+        self,
+        targets: Sequence[logging.Handler],
+        capacity: int = DEFAULT_FLIGHT_RECORDER_CAPACITY,
+        max_age: Optional[float] = None,
+        trigger_level: int = FLIGHT_RECORDER_TRIGGER_LEVEL,
+    ):
+        if capacity < 1:
+            raise ValueError(f"Flight recorder capacity must be at least 1, got {capacity}")
+        super().__init__()
+        self.targets = list(targets)
+        self.capacity = capacity
+        self.max_age = max_age
+        self.trigger_level = trigger_level
+        self.dump_count = 0
+        self._ring: list[Optional[logging.LogRecord]] = [None] * capacity
+        self._next_slot = 0
+        # Records at or above every target's level were already delivered; don't hold them
+        self._record_below = max((target.level for target in self.targets), default=0)
+
+    @property
+    def buffered_count(self) -> int:
+        """Records currently held for the next dump."""
+        return sum(record is not None for record in self._ring)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Called with the handler lock held (see logging.Handler.handle)
+        levelno = record.levelno
+        if levelno >= self.trigger_level:
+            self.dump(record)
+            return
+        if levelno >= self._record_below:
+            return
+        if PERF_COUNTER_NS_ATTRIBUTE not in record.__dict__:
+            # Δt is rendered at dump time; measure it from the call
+            record.perf_counter_ns = time.perf_counter_ns()
+        slot = self._next_slot
+        self._ring[slot] = record
+        self._next_slot = slot + 1 if slot + 1 < self.capacity else 0
+
+    def drain(self, now: Optional[float] = None) -> list[logging.LogRecord]:
+        """Remove and return the buffered records, oldest first."""
+        with self.lock:
+            slot = self._next_slot
+            ring = self._ring
+            self._ring = [None] * self.capacity
+            self._next_slot = 0
+        records = [record for record in ring[slot:] + ring[:slot] if record is not None]
+        if self.max_age is not None:
+            oldest = (time.time() if now is None else now) - self.max_age
+            records = [record for record in records if record.created >= oldest]
+        return records
+
+    def dump(self, trigger: logging.LogRecord) -> None:
+        """Send the buffered records to the targets that missed them."""
+        try:
+            records = self.drain(now=trigger.created)
+            if not records:
+                return
+            self.dump_count += 1
+            _set_dump_delta_times(records)
+            header = self._make_header(records, trigger)
+            for target in self.targets:
+                missed = [record for record in records if record.levelno < target.level]
+                if not missed:
+                    continue
+                # Straight to emit: handle() would re-run the target's filters
+                # (the rate limiter already judged these records) and its level
+                with target.lock:
+                    target.emit(header)
+                    for record in missed:
+                        target.emit(record)
+        except Exception:
+            self.handleError(trigger)
+
+    def _make_header(self, records: list[logging.LogRecord], trigger: logging.LogRecord) -> logging.LogRecord:
+        span = trigger.created - records[0].created
+        header = logging.LogRecord(
+            name=FLIGHT_RECORDER_LOGGER_NAME,
+            level=logging.INFO,
+            pathname=__file__,
+            lineno=0,
+            msg="Flight recorder: %d records from the %.3fs before the %s below",
+            args=(len(records), span, trigger.levelname),
+            exc_info=None,
+            func="dump",
+        )
+        header.delta_t = "0.000ms"
+        return header
+
+
+def _set_dump_delta_times(records: list[logging.LogRecord]) -> None:
+    # The shared Δt clock has moved past these records, so measure each
+    # from the previous dumped record instead
+    previous_ns = None
+    for record in records:
+        current_ns = record.__dict__[PERF_COUNTER_NS_ATTRIBUTE]
+        if "delta_t" not in record.__dict__:
+            delta_ns = 0 if previous_ns is None else current_ns - previous_ns
+            record.delta_t = f"{delta_ns / 1_000_000:.3f}ms"
+        previous_ns = current_ns
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from .periodic_flusher import PeriodicFlusher
+
+# Emit durations are counted in power-of-two buckets: bucket i holds durations
+# in [2**(i-1), 2**i) ns, so bucket 40 (~0.5-1.1 s) is the last that matters
+EMIT_HISTOGRAM_BUCKETS = 48
+STATS_LOGGER_NAME = "skellylogs.stats"
+
+
+class HandlerStats:
+    """Counters for one instrumented handler.
+
+    Updated inline by the handler's emit; the cost is two perf_counter_ns
+    calls and a few integer increments per record. Handlers normally emit
+    under their own lock, so the counts are exact; for lock-free handlers
+    (the background EnqueueHandler) concurrent updates can very rarely
+    lose an increment.
+    """
+
+    def __init__(self, handler: logging.Handler):
+        self.handler = handler
+        self.emit_histogram = [0] * EMIT_HISTOGRAM_BUCKETS
+        self.emit_ns_total = 0
+        self.emit_ns_max = 0
+        self.records_by_level: dict[str, int] = {}
+        self.bytes_by_level: dict[str, int] = {}
+        self.error_count = 0
+
+    def record_emit(self, record: logging.LogRecord, elapsed_ns: int) -> None:
+        bucket = elapsed_ns.bit_length()
+        self.emit_histogram[bucket if bucket < EMIT_HISTOGRAM_BUCKETS else EMIT_HISTOGRAM_BUCKETS - 1] += 1
+        self.emit_ns_total += elapsed_ns
+        if elapsed_ns > self.emit_ns_max:
+            self.emit_ns_max = elapsed_ns
+        levelname = record.levelname
+        records_by_level = self.records_by_level
+        records_by_level[levelname] = records_by_level.get(levelname, 0) + 1
+        # The shared rendering (render_record), if this or an earlier handler produced it
+        rendered = record.__dict__.get("formatted_message")
+        if rendered is not None:
+            bytes_by_level = self.bytes_by_level
+            bytes_by_level[levelname] = bytes_by_level.get(levelname, 0) + len(rendered) + 1
+
+    @property
+    def queue_full_count(self) -> int:
+        """Records the handler dropped because its queue was full."""
+        dropped_counts = getattr(self.handler, "dropped_counts", None)
+        if isinstance(dropped_counts, dict):
+            return sum(dropped_counts.values())
+        return getattr(self.handler, "dropped_count", 0)
+
+    def snapshot(self) -> dict:
+        histogram = list(self.emit_histogram)
+        records = sum(histogram)
+        return {
+            "records": records,
+            "emit_ns_total": self.emit_ns_total,
+            "emit_ns_mean": self.emit_ns_total / records if records else 0.0,
+            "emit_ns_p50": estimate_histogram_percentile(histogram, 0.50),
+            "emit_ns_p99": estimate_histogram_percentile(histogram, 0.99),
+            "emit_ns_max": self.emit_ns_max,
+            # {bucket upper bound in ns: count}, non-empty buckets only
+            "emit_histogram": {2 ** i: count for i, count in enumerate(histogram) if count},
+            "records_by_level": dict(self.records_by_level),
+            "bytes_by_level": dict(self.bytes_by_level),
+            "queue_full": self.queue_full_count,
+            "errors": self.error_count,
+        }
+
+
+def estimate_histogram_percentile(histogram: list[int], fraction: float) -> int:
+    """Upper bound (ns) of the bucket holding the given fraction of the counts."""
+    total = sum(histogram)
+    if total == 0:
+        return 0
+    threshold = total * fraction
+    cumulative = 0
+    for i, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= threshold:
+            return 2 ** i
+    return 2 ** (len(histogram) - 1)
+
+
+# name -> stats, for the handlers installed by the latest configure_logging
+_HANDLER_STATS: dict[str, HandlerStats] = {}
+
+
+def instrument_handler(handler: logging.Handler, name: str) -> HandlerStats:
+    """Time every emit of `handler` and count its records, bytes and errors.
+
+    Wraps the instance's emit and handleError in place, so the handler keeps
+    its type and works unchanged with Handler.handle, the background listener
+    and the log aggregator. The stats are listed by get_logging_stats() under
+    `name`.
+    """
+    stats = HandlerStats(handler)
+    emit = handler.emit
+    handle_error = handler.handleError
+    clock = time.perf_counter_ns
+    record_emit = stats.record_emit
+
+    def timed_emit(record: logging.LogRecord) -> None:
+        started = clock()
+        emit(record)
+        record_emit(record, clock() - started)
+
+    def counted_handle_error(record: logging.LogRecord) -> None:
+        stats.error_count += 1
+        handle_error(record)
+
+    handler.emit = timed_emit
+    handler.handleError = counted_handle_error
+    _HANDLER_STATS[name] = stats
+    return stats
+
+
+def reset_logging_stats() -> None:
+    """Forget the instrumented handlers (their stats stop being listed)."""
+    _HANDLER_STATS.clear()
+
+
+def get_logging_stats() -> dict[str, dict]:
+    """Per-handler emit latency and throughput counters, since logging was configured.
+
+    Empty unless configure_logging(collect_stats=True). Keys are handler
+    names ("file", "jsonl", "websocket", "console", "enqueue" for the
+    background listener's caller-side handler, "child_process"); each
+    value is a HandlerStats.snapshot():
+
+        records, emit_ns_total, emit_ns_mean, emit_ns_p50, emit_ns_p99,
+        emit_ns_max, emit_histogram, records_by_level, bytes_by_level
+        (size of the rendered text line), queue_full, errors
+
+    Percentiles are bucket upper bounds, i.e. accurate to a factor of two.
+    """
+    return {name: stats.snapshot() for name, stats in list(_HANDLER_STATS.items())}
+
+
+def format_logging_stats_summary(current: dict[str, dict], previous: dict[str, dict], elapsed: float) -> str:
+    """One line per handler describing what happened between two get_logging_stats() snapshots."""
+    parts = []
+    for name, stats in current.items():
+        before = previous.get(name, {})
+        records = stats["records"] - before.get("records", 0)
+        emit_ns = stats["emit_ns_total"] - before.get("emit_ns_total", 0)
+        histogram = [0] * EMIT_HISTOGRAM_BUCKETS
+        for upper_bound, count in stats["emit_histogram"].items():
+            histogram[upper_bound.bit_length() - 1] += count
+        for upper_bound, count in before.get("emit_histogram", {}).items():
+            histogram[upper_bound.bit_length() - 1] -= count
+        size = sum(stats["bytes_by_level"].values()) - sum(before.get("bytes_by_level", {}).values())
+        part = (
+            f"{name}: {records} records, {size / 1024:.1f} KiB, "
+            f"emit mean {emit_ns / records / 1000 if records else 0.0:.1f}us "
+            f"p99 <{estimate_histogram_percentile(histogram, 0.99) / 1000:.1f}us"
+        )
+        queue_full = stats["queue_full"] - before.get("queue_full", 0)
+        errors = stats["errors"] - before.get("errors", 0)
+        if queue_full:
+            part += f", {queue_full} queue full"
+        if errors:
+            part += f", {errors} errors"
+        parts.append(part)
+    return f"Logging stats for the last {elapsed:.1f}s: " + "; ".join(parts)
+
+
+class LoggingStatsReporter:
+    """Logs a summary of get_logging_stats() every `interval` seconds.
+
+    The summary is an INFO record from the "skellylogs.stats" logger, so it
+    lands in the file, console and websocket like any other record.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._previous = get_logging_stats()
+        self._previous_time = time.monotonic()
+        self._lock = threading.Lock()
+        self._flusher = PeriodicFlusher(interval=interval, callback=self.report, name="skellylogs-stats-reporter")
+
+    def start(self) -> None:
+        self._flusher.start()
+
+    def stop(self) -> None:
+        self._flusher.stop(wait=False)
+
+    def report(self) -> None:
+        with self._lock:
+            current = get_logging_stats()
+            now = time.monotonic()
+            if current:
+                logging.getLogger(STATS_LOGGER_NAME).info(
+                    format_logging_stats_summary(current, self._previous, now - self._previous_time)
+                )
+            # Snapshot after logging, so the summary record isn't counted in the next one
+            self._previous = get_logging_stats()
+            self._previous_time = now
+
+
+LOGGING_STATS_REPORTER: Optional[LoggingStatsReporter] = None
+
+
+def start_logging_stats_reporter(interval: float) -> LoggingStatsReporter:
+    """Start logging a stats summary every `interval` seconds, replacing any previous reporter."""
+    global LOGGING_STATS_REPORTER
+    stop_logging_stats_reporter()
+    LOGGING_STATS_REPORTER = LoggingStatsReporter(interval=interval)
+    LOGGING_STATS_REPORTER.start()
+    return LOGGING_STATS_REPORTER
+
+
+def stop_logging_stats_reporter() -> None:
+    global LOGGING_STATS_REPORTER
+    if LOGGING_STATS_REPORTER is not None:
+        LOGGING_STATS_REPORTER.stop()
+        LOGGING_STATS_REPORTER = None
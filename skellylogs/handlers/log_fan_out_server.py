@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import json
+import socket
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Iterator, Optional
+
+from .async_log_stream import stream_log_records
+from .log_history import DEFAULT_LOG_HISTORY_CAPACITY, LogHistoryStore
+from .websocket_log_queue_handler import LogRecordModel
+from ..log_levels import LogLevels
+
+DEFAULT_LOG_FAN_OUT_HOST = "127.0.0.1"
+DEFAULT_LOG_FAN_OUT_PORT = 7510
+# Encoded lines waiting for one subscriber; beyond this its oldest are dropped
+DEFAULT_SUBSCRIBER_BUFFER_SIZE = 1000
+SUBSCRIPTION_TIMEOUT = 5.0  # seconds a new connection has to send its subscription line
+LOG_RECORDS_DROPPED_MESSAGE_TYPE = "log_records_dropped"
+
+
+@dataclass(frozen=True)
+class LogSubscription:
+    """What one fan-out client wants, sent as the first line of the connection.
+
+    min_level: lowest levelno sent (or a level name, e.g. "TRACE").
+    logger_prefixes: logger names to send, each with its children
+        ("freemocap.cameras" also matches "freemocap.cameras.grab"); empty
+        sends every logger.
+    process_ids: only records from these PIDs; empty sends every process.
+    last / since_sequence: on connect, first replay the newest `last`
+        records, or every record after `since_sequence`, from the server's
+        history (matching records only).
+    """
+
+    min_level: int = 0
+    logger_prefixes: tuple[str, ...] = ()
+    process_ids: tuple[int, ...] = ()
+    last: Optional[int] = None
+    since_sequence: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        # Accept lists (from JSON) and level names, store hashable tuples and ints
+        if isinstance(self.min_level, str):
+            object.__setattr__(self, "min_level", LogLevels[self.min_level.upper()].value)
+        object.__setattr__(self, "logger_prefixes", tuple(self.logger_prefixes))
+        object.__setattr__(self, "process_ids", tuple(int(pid) for pid in self.process_ids))
+
+    def matches(self, record: LogRecordModel) -> bool:
+        if record.levelno < self.min_level:
+            return False
+        if self.process_ids and record.process not in self.process_ids:
+            return False
+        if self.logger_prefixes:
+            name = record.name
+            return any(name == prefix or name.startswith(prefix + ".") for prefix in self.logger_prefixes)
+        return True
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line: str | bytes) -> LogSubscription:
+        """Parse a subscription line; an empty line or {} subscribes to everything.
+
+        Raises ValueError on malformed JSON, unknown keys or unknown level names.
+        """
+        data = json.loads(line or "{}")
+        if not isinstance(data, dict):
+            raise ValueError(f"Log subscription must be a JSON object, got {data!r}")
+        try:
+            return cls(**data)
+        except (TypeError, KeyError) as error:
+            raise ValueError(f"Invalid log subscription {data!r}: {error}") from error
+
+
+def _encode_record(record: LogRecordModel) -> bytes:
+    return (record.model_dump_json() + "\n").encode("utf-8")
+
+
+class _Subscriber:
+    """One connected client: its filter and the lines waiting to be written to it."""
+
+    def __init__(self, subscription: LogSubscription, writer: asyncio.StreamWriter, buffer_size: int):
+        self.subscription = subscription
+        self.writer = writer
+        self.buffer_size = buffer_size
+        self.pending: deque[bytes] = deque()
+        self.dropped_count = 0
+        self._unreported_drops = 0
+        self._ready = asyncio.Event()
+
+    def offer(self, line: bytes) -> None:
+        # Never waits: a slow client loses its own oldest lines, nobody else's
+        if len(self.pending) >= self.buffer_size:
+            self.pending.popleft()
+            self.dropped_count += 1
+            self._unreported_drops += 1
+        self.pending.append(line)
+        self._ready.set()
+
+    async def write_pending(self) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            chunks = []
+            if self._unreported_drops:
+                notice = {"message_type": LOG_RECORDS_DROPPED_MESSAGE_TYPE, "count": self._unreported_drops}
+                chunks.append((json.dumps(notice) + "\n").encode("utf-8"))
+                self._unreported_drops = 0
+            chunks.extend(self.pending)
+            self.pending.clear()
+            try:
+                self.writer.write(b"".join(chunks))
+                # Only this client's task waits for its socket to drain
+                await self.writer.drain()
+            except ConnectionError:
+                return
+
+
+class LogFanOutServer:
+    """Reads the websocket log queue once and streams it to many local subscribers.
+
+    Stdlib only: a TCP (or, with `path`, Unix domain socket) server on its
+    own asyncio event loop thread. Framing is JSON Lines. A client sends
+    one LogSubscription line, then receives one LogRecordModel JSON object
+    per line for the records that match it, plus a
+    {"message_type": "log_records_dropped", "count": N} line after any gap.
+    Filtering happens here, before encoding, and each record is encoded at
+    most once however many subscribers want it.
+
+    Each subscriber has its own bounded buffer and writer task. A client
+    that stops reading loses its oldest lines (counted, and reported to it)
+    but never holds up the queue or the other clients. Records pass
+    through a LogHistoryStore, so they carry sequence ids and new clients
+    can backfill with `last` / `since_sequence`.
+
+    The server consumes the queue; don't also read it elsewhere.
+    """
+
+    def __init__(
+        self,
+        queue,
+        host: str = DEFAULT_LOG_FAN_OUT_HOST,
+        port: int = DEFAULT_LOG_FAN_OUT_PORT,
+        path: str | None = None,
+        history_size: int = DEFAULT_LOG_HISTORY_CAPACITY,
+        subscriber_buffer_size: int = DEFAULT_SUBSCRIBER_BUFFER_SIZE,
+    ):
+        self.queue = queue
+        self.host = host
+        self.port = port
+        self.path = path
+        self.history = LogHistoryStore(capacity=history_size)
+        self.subscriber_buffer_size = subscriber_buffer_size
+        self._subscribers: set[_Subscriber] = set()
+        self._client_tasks: set[asyncio.Task] = set()
+        self._server: asyncio.AbstractServer | None = None
+        self._relay_task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._start_error: BaseException | None = None
+
+    @property
+    def address(self) -> tuple[str, int] | str:
+        """The bound (host, port), e.g. to find the port picked for port=0, or the socket path."""
+        if self.path is not None:
+            return self.path
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return host, port
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    # --- running on its own thread ----------------------------------------
+
+    def start(self) -> None:
+        """Start serving on a dedicated event loop thread; returns once it is listening."""
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run_event_loop, args=(ready,), name="skellylogs-log-fan-out", daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        if self._start_error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._start_error
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Disconnect every subscriber, close the socket and join the thread."""
+        if not self.is_running:
+            return
+        atexit.unregister(self.stop)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    def _run_event_loop(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self.start_serving())
+        except BaseException as error:
+            self._start_error = error
+            loop.close()
+            ready.set()
+            return
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self.close())
+            loop.close()
+
+    # --- running inside an existing event loop ----------------------------
+
+    async def start_serving(self) -> None:
+        """Listen and start relaying the queue, on the running event loop."""
+        if self.path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, host=self.host, port=self.port)
+        self._relay_task = asyncio.ensure_future(self._relay())
+
+    async def close(self) -> None:
+        if self._relay_task is not None:
+            self._relay_task.cancel()
+            await asyncio.gather(self._relay_task, return_exceptions=True)
+            self._relay_task = None
+        if self._server is not None:
+            self._server.close()
+        for task in list(self._client_tasks):
+            task.cancel()
+        await asyncio.gather(*self._client_tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def _relay(self) -> None:
+        async for records in stream_log_records(self.queue, history=self.history):
+            subscribers = self._subscribers
+            for record in records:
+                line = None
+                for subscriber in subscribers:
+                    if subscriber.subscription.matches(record):
+                        if line is None:
+                            line = _encode_record(record)
+                        subscriber.offer(line)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._client_tasks.add(task)
+        subscriber = None
+        write_task = None
+        try:
+            try:
+                line = await asyncio.wait_for(reader.readline(), timeout=SUBSCRIPTION_TIMEOUT)
+                subscription = LogSubscription.from_json(line.strip())
+            except (asyncio.TimeoutError, ValueError) as error:
+                writer.write((json.dumps({"error": str(error) or "no subscription received"}) + "\n").encode())
+                return
+
+            subscriber = _Subscriber(subscription, writer, self.subscriber_buffer_size)
+            # Backfill and register with no await in between: the relay can't
+            # run in the gap, so no record is sent twice or skipped
+            for record in self._backfill(subscription):
+                if subscription.matches(record):
+                    subscriber.offer(_encode_record(record))
+            self._subscribers.add(subscriber)
+
+            write_task = asyncio.ensure_future(subscriber.write_pending())
+            # Clients only send the subscription line; EOF means they left
+            disconnect_task = asyncio.ensure_future(reader.read())
+            await asyncio.wait({write_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+            disconnect_task.cancel()
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # close() is shutting the server down. Finish normally: the
+            # streams callback would log a cancelled handler task as an error
+            pass
+        finally:
+            if subscriber is not None:
+                self._subscribers.discard(subscriber)
+            if write_task is not None:
+                write_task.cancel()
+            writer.close()
+            self._client_tasks.discard(task)
+
+    def _backfill(self, subscription: LogSubscription) -> list[LogRecordModel]:
+        if subscription.since_sequence is not None:
+            return self.history.since_sequence(subscription.since_sequence)
+        if subscription.last is not None:
+            return self.history.last(subscription.last)
+        return []
+
+
+class LogFanOutClient:
+    """Blocking client for a LogFanOutServer: iterate it for LogRecordModels.
+
+        with LogFanOutClient(LogSubscription(min_level="WARNING", logger_prefixes=["freemocap.cameras"])) as client:
+            for record in client:
+                print(record.formatted_message)
+
+    Gaps reported by the server are added up in `dropped_count`.
+    """
+
+    def __init__(
+        self,
+        subscription: LogSubscription | None = None,
+        host: str = DEFAULT_LOG_FAN_OUT_HOST,
+        port: int = DEFAULT_LOG_FAN_OUT_PORT,
+        path: str | None = None,
+        timeout: float | None = None,
+    ):
+        if path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port), timeout=timeout)
+        self.dropped_count = 0
+        self._socket.sendall(((subscription or LogSubscription()).to_json() + "\n").encode("utf-8"))
+        self._lines = self._socket.makefile("rb")
+
+    def __iter__(self) -> Iterator[LogRecordModel]:
+        for line in self._lines:
+            data = json.loads(line)
+            message_type = data.get("message_type")
+            if message_type == LOG_RECORDS_DROPPED_MESSAGE_TYPE:
+                self.dropped_count += data["count"]
+                continue
+            if "error" in data and message_type is None:
+                raise ValueError(f"Log fan-out server rejected the subscription: {data['error']}")
+            yield LogRecordModel.from_payload(data)
+
+    def close(self) -> None:
+        self._lines.close()
+        self._socket.close()
+
+    def __enter__(self) -> LogFanOutClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+LOG_FAN_OUT_SERVER: Optional[LogFanOutServer] = None
+
+
+def start_log_fan_out_server(
+    queue=None,
+    host: str = DEFAULT_LOG_FAN_OUT_HOST,
+    port: int = DEFAULT_LOG_FAN_OUT_PORT,
+    path: str | None = None,
+    history_size: int = DEFAULT_LOG_HISTORY_CAPACITY,
+    subscriber_buffer_size: int = DEFAULT_SUBSCRIBER_BUFFER_SIZE,
+) -> LogFanOutServer:
+    """Serve `queue` (default: the websocket log queue) to fan-out clients, replacing any previous server."""
+    global LOG_FAN_OUT_SERVER
+    if queue is None:
+        from .websocket_log_queue_handler import get_websocket_log_queue
+
+        queue = get_websocket_log_queue()
+    stop_log_fan_out_server()
+    server = LogFanOutServer(
+        queue,
+        host=host,
+        port=port,
+        path=path,
+        history_size=history_size,
+        subscriber_buffer_size=subscriber_buffer_size,
+    )
+    server.start()
+    LOG_FAN_OUT_SERVER = server
+    return server
+
+
+def stop_log_fan_out_server() -> None:
+    global LOG_FAN_OUT_SERVER
+    if LOG_FAN_OUT_SERVER is not None:
+        LOG_FAN_OUT_SERVER.stop()
+        LOG_FAN_OUT_SERVER = None
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+from typing import Iterable, Optional
+
+from .websocket_log_queue_handler import LogRecordModel, get_log_records
+
+DEFAULT_LOG_HISTORY_CAPACITY = 10_000
+
+
+class LogHistoryStore:
+    """The last `capacity` websocket log records, indexed for backfilling new clients.
+
+    Lives on the consumer side of the websocket log queue. The relay that
+    reads the queue feeds every record through the store (see pull()), which
+    stamps it with the next `sequence_id`: 1, 2, 3, ... in the order the
+    relay received it. A frontend that connects late asks for last(n) or
+    since_time(t). One that reconnects sends the last sequence_id it saw and
+    gets since_sequence(id), with no duplicates and nothing missed as long
+    as it was gone for fewer than `capacity` records. If
+    oldest_sequence_id is more than one past its id, the records in between
+    have already been evicted.
+
+    Records sit in a preallocated ring indexed by sequence_id, so a
+    sequence lookup is O(1) and a time lookup is a binary search. Thread
+    safe: the relay thread can add while server threads query.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_LOG_HISTORY_CAPACITY):
+        if capacity < 1:
+            raise ValueError(f"Log history capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self._records: list[Optional[LogRecordModel]] = [None] * capacity
+        # Running maximum of `created` by slot: records from several processes
+        # arrive slightly out of time order, but this never decreases, so
+        # since_time() can bisect it
+        self._max_created: list[float] = [0.0] * capacity
+        self._next_sequence_id = 1
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._next_sequence_id - self.oldest_sequence_id
+
+    @property
+    def oldest_sequence_id(self) -> int:
+        """sequence_id of the oldest record still held (next_sequence_id if empty)."""
+        return max(1, self._next_sequence_id - self.capacity)
+
+    @property
+    def next_sequence_id(self) -> int:
+        """sequence_id the next added record will get."""
+        return self._next_sequence_id
+
+    def add(self, records: Iterable[LogRecordModel]) -> list[LogRecordModel]:
+        """Stamp records with sequence ids and store them, evicting the oldest. Returns them."""
+        records = list(records)
+        with self._lock:
+            sequence_id = self._next_sequence_id
+            capacity = self.capacity
+            max_created = self._max_created[(sequence_id - 1) % capacity] if sequence_id > 1 else 0.0
+            for record in records:
+                record.sequence_id = sequence_id
+                slot = sequence_id % capacity
+                self._records[slot] = record
+                if record.created > max_created:
+                    max_created = record.created
+                self._max_created[slot] = max_created
+                sequence_id += 1
+            self._next_sequence_id = sequence_id
+        return records
+
+    def pull(self, queue, timeout: float | None = None) -> list[LogRecordModel]:
+        """get_log_records(queue, timeout), with the records added to the store.
+
+        Use this in place of get_log_records in the websocket relay loop and
+        broadcast what it returns; the records carry their sequence_id.
+        """
+        return self.add(get_log_records(queue, timeout=timeout))
+
+    def last(self, count: int) -> list[LogRecordModel]:
+        """The newest `count` records, oldest first."""
+        with self._lock:
+            end = self._next_sequence_id
+            return self._slice(max(self.oldest_sequence_id, end - count), end)
+
+    def since_sequence(self, sequence_id: int) -> list[LogRecordModel]:
+        """Records after `sequence_id` (the last one a client saw), oldest first."""
+        with self._lock:
+            return self._slice(max(self.oldest_sequence_id, sequence_id + 1), self._next_sequence_id)
+
+    def since_time(self, created: float) -> list[LogRecordModel]:
+        """Records created at or after `created` (a time.time() timestamp), in sequence order."""
+        with self._lock:
+            start, end = self.oldest_sequence_id, self._next_sequence_id
+            capacity = self.capacity
+            # First sequence id whose running max reaches `created`; everything before it is older
+            low, high = start, end
+            while low < high:
+                middle = (low + high) // 2
+                if self._max_created[middle % capacity] < created:
+                    low = middle + 1
+                else:
+                    high = middle
+            return [record for record in self._slice(low, end) if record.created >= created]
+
+    def _slice(self, start: int, end: int) -> list[LogRecordModel]:
+        # Sequence ids [start, end), which must all still be held
+        capacity = self.capacity
+        start_slot, end_slot = start % capacity, end % capacity
+        if start >= end:
+            return []
+        if start_slot < end_slot:
+            return self._records[start_slot:end_slot]
+        return self._records[start_slot:] + self._records[:end_slot]
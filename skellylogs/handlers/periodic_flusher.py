@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Callable
+
+
+class PeriodicFlusher:
+    """Calls `callback` every `interval` seconds on a daemon thread.
+
+    Handlers that buffer (batched websocket payloads, buffered file writes)
+    flush opportunistically when new records arrive; this bounds the latency
+    of whatever is left in the buffer when the application goes quiet.
+
+    Bound methods are held weakly, so a handler that is dropped without being
+    closed (e.g. replaced by a second configure_logging call) is not kept
+    alive by its flusher; the thread exits once the handler is collected.
+    """
+
+    def __init__(self, interval: float, callback: Callable[[], None], name: str = "skellylogs-periodic-flusher"):
+        self.interval = interval
+        if hasattr(callback, "__self__"):
+            self._callback_ref = weakref.WeakMethod(callback)
+        else:
+            self._callback_ref = lambda: callback
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop the thread; with wait=False, don't wait for a callback in progress."""
+        self._stop_event.set()
+        if wait and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            callback = self._callback_ref()
+            if callback is None:
+                return
+            callback()
+            del callback
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import queue as queue_module
+import time
+from multiprocessing import Queue
+from typing import Any
+
+from ..log_levels import LogLevels
+
+# Records at or above this level go to the priority lane
+PRIORITY_LANE_MIN_LEVEL = LogLevels.WARNING.value
+DEFAULT_PRIORITY_LANE_SIZE = 200
+DEFAULT_BULK_LANE_SIZE = 1000
+PRIORITY_LANE_POLL_INTERVAL = 0.05  # seconds a blocking get() waits on the bulk lane before rechecking priority
+
+
+class PriorityLogQueue:
+    """Two bounded multiprocessing queues: one for WARNING+, one for everything else.
+
+    A burst of LOOP/TRACE records can only fill the bulk lane, so the
+    priority lane always has room for the WARNING/ERROR that explains what
+    went wrong. Consumers see a single queue: get() always drains the
+    priority lane first.
+
+    Producers should put into `lane_for(levelno)`; put_nowait() routes dict
+    payloads by their "levelno" key and anything else to the bulk lane.
+    """
+
+    def __init__(
+        self,
+        priority_lane_size: int = DEFAULT_PRIORITY_LANE_SIZE,
+        bulk_lane_size: int = DEFAULT_BULK_LANE_SIZE,
+    ):
+        self.priority_lane: Queue = Queue(maxsize=priority_lane_size)
+        self.bulk_lane: Queue = Queue(maxsize=bulk_lane_size)
+
+    def lane_for(self, levelno: int) -> Queue:
+        return self.priority_lane if levelno >= PRIORITY_LANE_MIN_LEVEL else self.bulk_lane
+
+    def put_nowait(self, obj: Any) -> None:
+        levelno = obj.get("levelno", 0) if isinstance(obj, dict) else 0
+        self.lane_for(levelno).put_nowait(obj)
+
+    def put(self, obj: Any, block: bool = True, timeout: float | None = None) -> None:
+        levelno = obj.get("levelno", 0) if isinstance(obj, dict) else 0
+        self.lane_for(levelno).put(obj, block, timeout)
+
+    def get_nowait(self) -> Any:
+        try:
+            return self.priority_lane.get_nowait()
+        except queue_module.Empty:
+            return self.bulk_lane.get_nowait()
+
+    def get(self, block: bool = True, timeout: float | None = None) -> Any:
+        if not block:
+            return self.get_nowait()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.priority_lane.get_nowait()
+            except queue_module.Empty:
+                pass
+            wait = PRIORITY_LANE_POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, max(deadline - time.monotonic(), 0))
+            try:
+                return self.bulk_lane.get(timeout=wait)
+            except queue_module.Empty:
+                if deadline is not None and time.monotonic() >= deadline:
+                    # One last look at the priority lane before giving up
+                    return self.priority_lane.get_nowait()
+
+    def qsize(self) -> int:
+        return self.priority_lane.qsize() + self.bulk_lane.qsize()
+
+    def empty(self) -> bool:
+        return self.priority_lane.empty() and self.bulk_lane.empty()
+
+    def full(self) -> bool:
+        return self.priority_lane.full() and self.bulk_lane.full()
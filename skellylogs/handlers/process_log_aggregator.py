@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import queue as queue_module
+import threading
+import time
+from multiprocessing import Queue
+from typing import Optional
+
+from ..filters.delta_time import PERF_COUNTER_NS_ATTRIBUTE
+
+MAX_LOG_AGGREGATION_QUEUE_SIZE = 10_000
+
+# Everything the parent-side sinks need to rebuild the record. Args are baked
+# into msg and tracebacks into exc_text, so the payload is always picklable.
+AGGREGATED_LOG_RECORD_FIELDS = (
+    "name",
+    "levelname",
+    "levelno",
+    "pathname",
+    "filename",
+    "module",
+    "lineno",
+    "funcName",
+    "created",
+    "msecs",
+    "relativeCreated",
+    "thread",
+    "threadName",
+    "processName",
+    "process",
+    "stack_info",
+)
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class ChildProcessLogHandler(logging.Handler):
+    """Ships records from a child process to the parent's LogAggregator.
+
+    This is the only handler a child process installs: the parent owns the
+    single log file, console and websocket sinks. Each record becomes one
+    small dict and one non-blocking put, the same per-record cost as the
+    WebSocketQueueHandler. If the aggregation queue is full, the record is
+    dropped and counted rather than blocking the child's hot loop.
+    """
+
+    def __init__(self, queue: multiprocessing.Queue):
+        super().__init__()
+        self.queue = queue
+        self.dropped_count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            payload = {field: getattr(record, field, None) for field in AGGREGATED_LOG_RECORD_FIELDS}
+            payload["msg"] = record.getMessage()
+            if record.exc_info and not record.exc_text:
+                record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            payload["exc_text"] = record.exc_text
+            # Δt is computed in the parent; measure it from the child's call, not
+            # the replay (perf_counter_ns is a system-wide monotonic clock)
+            payload[PERF_COUNTER_NS_ATTRIBUTE] = record.__dict__.get(PERF_COUNTER_NS_ATTRIBUTE) or time.perf_counter_ns()
+            self.queue.put_nowait(payload)
+        except queue_module.Full:
+            self.dropped_count += 1
+        except Exception:
+            self.handleError(record)
+
+
+class LogAggregator:
+    """Collects records from child processes and replays them into the parent's root logger.
+
+    A single dispatch thread reads the aggregation queue, so records from any
+    one child arrive in the order that child logged them. Replayed records
+    keep their original process/thread fields and go through the parent's
+    root handlers (respecting handler levels), so every process ends up in
+    one file, one console stream and one websocket queue.
+    """
+
+    _sentinel = None
+
+    def __init__(self, max_queue_size: int = MAX_LOG_AGGREGATION_QUEUE_SIZE):
+        self.queue: Queue = Queue(maxsize=max_queue_size)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="skellylogs-log-aggregator", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Dispatch everything still queued, then join the dispatch thread."""
+        if not self.is_running:
+            return
+        atexit.unregister(self.stop)
+        self.queue.put(self._sentinel)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        root = logging.getLogger()
+        while True:
+            payload = self.queue.get()
+            if payload is self._sentinel:
+                break
+            root.handle(logging.makeLogRecord(payload))
+
+
+LOG_AGGREGATOR: Optional[LogAggregator] = None
+
+
+def start_log_aggregator(max_queue_size: int = MAX_LOG_AGGREGATION_QUEUE_SIZE) -> LogAggregator:
+    """Start the parent-side aggregator, if it isn't running already."""
+    global LOG_AGGREGATOR
+    if LOG_AGGREGATOR is None:
+        LOG_AGGREGATOR = LogAggregator(max_queue_size=max_queue_size)
+        LOG_AGGREGATOR.start()
+    return LOG_AGGREGATOR
+
+
+def stop_log_aggregator() -> None:
+    global LOG_AGGREGATOR
+    if LOG_AGGREGATOR is not None:
+        LOG_AGGREGATOR.stop()
+        LOG_AGGREGATOR = None
+
+
+def get_log_aggregation_queue() -> Queue:
+    """Return the queue to pass to child processes as `aggregation_queue`."""
+    global LOG_AGGREGATOR
+    if LOG_AGGREGATOR is None:
+        raise ValueError("Log aggregator not started yet")
+    return LOG_AGGREGATOR.queue
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import queue as queue_module
+import shutil
+import sys
+import threading
+import time
+import traceback
+
+from .buffered_file_handler import DEFAULT_FILE_BUFFER_SIZE, DEFAULT_FILE_FLUSH_INTERVAL, FILE_FLUSH_LEVEL, BufferedFileHandler
+
+MANIFEST_SUFFIX = ".manifest.json"
+COMPRESSED_SEGMENT_SUFFIX = ".gz"
+DEFAULT_COMPRESSION_LEVEL = 6
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def get_manifest_path(log_file_path: str) -> str:
+    """`logs/log_<timestamp>.log` -> `logs/log_<timestamp>.manifest.json`
+
+    Other extensions keep theirs (`log_<timestamp>.jsonl.manifest.json`), so
+    the text log and the JSONL log of one session have separate manifests.
+    """
+    stem, extension = os.path.splitext(log_file_path)
+    if extension != ".log":
+        stem = log_file_path
+    return stem + MANIFEST_SUFFIX
+
+
+def compress_log_segment(segment_path: str, compression_level: int = DEFAULT_COMPRESSION_LEVEL) -> str:
+    """Gzip a finished segment next to itself, remove the original and return the .gz path.
+
+    The archive is written under a temporary name and renamed into place, so
+    an interrupted compression never leaves a truncated .gz behind.
+    """
+    compressed_path = segment_path + COMPRESSED_SEGMENT_SUFFIX
+    temporary_path = compressed_path + ".tmp"
+    with open(segment_path, "rb") as source, gzip.open(temporary_path, "wb", compresslevel=compression_level) as target:
+        shutil.copyfileobj(source, target, _COPY_CHUNK_SIZE)
+    os.replace(temporary_path, compressed_path)
+    os.remove(segment_path)
+    return compressed_path
+
+
+class SegmentCompressor:
+    """Compresses finished log segments, one at a time, on a daemon thread.
+
+    zlib releases the GIL while it deflates, so compressing a multi-GB TRACE
+    segment doesn't stall the threads that are logging.
+    """
+
+    _sentinel = None
+
+    def __init__(self, on_compressed, compression_level: int = DEFAULT_COMPRESSION_LEVEL):
+        self.compression_level = compression_level
+        self._on_compressed = on_compressed
+        self._queue: queue_module.Queue = queue_module.Queue()
+        self._thread = threading.Thread(target=self._run, name="skellylogs-segment-compressor", daemon=True)
+        self._thread.start()
+
+    def submit(self, segment_path: str) -> None:
+        self._queue.put(segment_path)
+
+    def stop(self) -> None:
+        """Finish every queued segment, then join the thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._sentinel)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            segment_path = self._queue.get()
+            if segment_path is self._sentinel:
+                return
+            try:
+                compressed_path = compress_log_segment(segment_path, self.compression_level)
+            except OSError:
+                # Leave the segment uncompressed; logging about it would recurse into us
+                traceback.print_exc(file=sys.stderr)
+                continue
+            self._on_compressed(segment_path, compressed_path)
+
+
+class RotatingLogFileHandler(BufferedFileHandler):
+    """A BufferedFileHandler that rolls to a new segment by size and/or age.
+
+    The active segment is always `filename`, so `tail -f` and the default
+    log path keep working. On rollover, it is renamed to
+    `<stem>.<index>.log` (001, 002, ...; other extensions are kept the same
+    way), a fresh file is opened, and the finished segment is handed to a
+    SegmentCompressor thread, which gzips it to `<stem>.<index>.log.gz`. The logging path only pays for a rename.
+
+    Rollover is checked when the buffer is written, so a segment can exceed
+    `max_bytes` by at most one buffer.
+
+    `<stem>.manifest.json` lists the finished segments in order, with their
+    index, file name, start/end times (epoch seconds), size and compression
+    state, plus the active file. It is rewritten atomically (temp file plus
+    rename) after each rollover and compression, so readers never see a
+    partial manifest. Appending to an existing log file resumes its manifest
+    and segment numbering.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int | None = None,
+        rotate_interval: float | None = None,
+        compress: bool = True,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+        encoding: str | None = "utf-8",
+        buffer_size: int = DEFAULT_FILE_BUFFER_SIZE,
+        flush_interval: float = DEFAULT_FILE_FLUSH_INTERVAL,
+        flush_level: int = FILE_FLUSH_LEVEL,
+    ):
+        if not max_bytes and not rotate_interval:
+            raise ValueError("RotatingLogFileHandler needs max_bytes and/or rotate_interval")
+        # Set before BufferedFileHandler starts its flusher thread, which calls _write_buffer
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.manifest_path = get_manifest_path(os.path.abspath(filename))
+        self._manifest_lock = threading.Lock()
+        self._manifest = self._load_manifest(os.path.basename(filename))
+        self._segment_started = time.time()
+        self._compressor: SegmentCompressor | None = None
+        if compress:
+            self._compressor = SegmentCompressor(on_compressed=self._on_segment_compressed, compression_level=compression_level)
+        super().__init__(
+            filename,
+            mode="a",
+            encoding=encoding,
+            buffer_size=buffer_size,
+            flush_interval=flush_interval,
+            flush_level=flush_level,
+        )
+        self._update_manifest()
+
+    @property
+    def segments(self) -> list[dict]:
+        """Manifest entries for the finished segments, oldest first."""
+        with self._manifest_lock:
+            return [dict(segment) for segment in self._manifest["segments"]]
+
+    def _write_buffer(self) -> None:
+        if self._buffer and self.stream is not None and self._should_rollover():
+            self._rollover()
+        super()._write_buffer()
+
+    def _should_rollover(self) -> bool:
+        size = os.fstat(self.stream.fileno()).st_size
+        if self.rotate_interval and time.time() - self._segment_started >= self.rotate_interval:
+            if size:
+                return True
+            # Nothing to roll over yet; restart the clock for this (empty) segment
+            self._segment_started = time.time()
+        return bool(self.max_bytes) and size >= self.max_bytes
+
+    def _rollover(self) -> None:
+        self.stream.close()
+        self.stream = None
+
+        with self._manifest_lock:
+            segments = self._manifest["segments"]
+            index = segments[-1]["index"] + 1 if segments else 1
+        stem, extension = os.path.splitext(self.baseFilename)
+        segment_path = f"{stem}.{index:03d}{extension}"
+        # A lost or corrupt manifest (or a restart with the same stem) would
+        # otherwise let os.replace overwrite an older segment
+        while os.path.exists(segment_path) or os.path.exists(segment_path + COMPRESSED_SEGMENT_SUFFIX):
+            index += 1
+            segment_path = f"{stem}.{index:03d}{extension}"
+        os.replace(self.baseFilename, segment_path)
+
+        ended = time.time()
+        segment = {
+            "index": index,
+            "file": os.path.basename(segment_path),
+            "started": self._segment_started,
+            "ended": ended,
+            "bytes": os.path.getsize(segment_path),
+            "compressed": False,
+        }
+        self._segment_started = ended
+        self.stream = self._open()
+        self._update_manifest(new_segment=segment)
+
+        if self._compressor is not None:
+            self._compressor.submit(segment_path)
+
+    def _on_segment_compressed(self, segment_path: str, compressed_path: str) -> None:
+        segment_name = os.path.basename(segment_path)
+        with self._manifest_lock:
+            for segment in self._manifest["segments"]:
+                if segment["file"] == segment_name:
+                    segment["file"] = os.path.basename(compressed_path)
+                    segment["compressed"] = True
+                    segment["compressed_bytes"] = os.path.getsize(compressed_path)
+                    break
+            self._write_manifest()
+
+    def _load_manifest(self, active_file: str) -> dict:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {"segments": []}
+        manifest["log_file"] = active_file
+        return manifest
+
+    def _update_manifest(self, new_segment: dict | None = None) -> None:
+        with self._manifest_lock:
+            if new_segment is not None:
+                self._manifest["segments"].append(new_segment)
+            self._manifest["active"] = {"file": self._manifest["log_file"], "started": self._segment_started}
+            self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        # Caller holds _manifest_lock
+        temporary_path = self.manifest_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(temporary_path, self.manifest_path)
+
+    def close(self) -> None:
+        super().close()
+        if self._compressor is not None:
+            # Let queued segments finish, so none is left half-compressed at exit
+            self._compressor.stop()
+            self._compressor = None
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import pickle
+import queue as queue_module
+import struct
+import sys
+import time
+from multiprocessing import Lock, shared_memory
+from typing import Any
+
+DEFAULT_RING_SLOT_COUNT = 2048
+DEFAULT_RING_SLOT_SIZE = 8192  # bytes per slot, including the slot header
+RING_POLL_INTERVAL = 0.005  # seconds between checks in a blocking get()
+
+# Ring header: write sequence (next slot to write), read sequence (next slot to read)
+_RING_HEADER = struct.Struct("<QQ")
+_RING_HEADER_SIZE = 64
+# Slot header: sequence stamp (seq + 1 when complete, 0 = never written), payload length, payload kind
+_SLOT_HEADER = struct.Struct("<QIB")
+_SLOT_WRITING = 2**64 - 1
+_KIND_PICKLE = 0
+_KIND_BYTES = 1
+
+
+class PayloadTooLarge(queue_module.Full):
+    """Raised by put_nowait() for a payload that can't fit in one slot.
+
+    A queue.Full, so callers that already count full-queue drops count it
+    too. `max_size` is the largest payload (in serialized bytes) a slot holds.
+    """
+
+    def __init__(self, size: int, max_size: int):
+        super().__init__(f"{size}-byte payload doesn't fit in a {max_size}-byte ring slot")
+        self.size = size
+        self.max_size = max_size
+
+
+class SharedMemoryLogRing:
+    """Fixed-size ring of serialized records in `multiprocessing.shared_memory`.
+
+    A drop-in alternative to the websocket `multiprocessing.Queue`: it offers
+    the same put_nowait/get/get_nowait/qsize/empty surface, so the
+    WebSocketQueueHandler and the consumer helpers work unchanged.
+
+    Producers serialize the payload and memcpy it into the next slot. There is
+    no feeder thread, no pipe and no syscall: the only synchronization is a
+    producer-side multiprocessing.Lock, which is an uncontended futex in user
+    space on Linux. When the ring is full, the oldest records are overwritten;
+    the consumer notices the gap and counts it in `dropped_count`. Payloads
+    larger than a slot are counted in `oversized_count` and rejected with
+    PayloadTooLarge (a queue.Full), so the WebSocketQueueHandler can shorten
+    the record or count the drop.
+
+    There must be a single consumer. It reads slots seqlock-style: the slot's
+    sequence stamp is checked before and after copying, so a slot that a
+    producer overwrites mid-read is discarded instead of returned torn.
+    `drain()` returns everything available in one call.
+
+    The ring pickles by name, so it can be passed to child processes just
+    like a Queue. The process that created it owns the memory and should
+    call `unlink()` when done.
+    """
+
+    def __init__(self, slot_count: int = DEFAULT_RING_SLOT_COUNT, slot_size: int = DEFAULT_RING_SLOT_SIZE):
+        if slot_size <= _SLOT_HEADER.size:
+            raise ValueError(f"slot_size must be larger than the {_SLOT_HEADER.size}-byte slot header")
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self._shm = shared_memory.SharedMemory(create=True, size=_RING_HEADER_SIZE + slot_count * slot_size)
+        self._shm.buf[:_RING_HEADER_SIZE] = bytes(_RING_HEADER_SIZE)
+        self._write_lock = Lock()
+        self._is_owner = True
+        self._init_local_state()
+
+    def _init_local_state(self) -> None:
+        self._buf = self._shm.buf
+        self._max_payload_size = self.slot_size - _SLOT_HEADER.size
+        self.dropped_count = 0
+        self.oversized_count = 0
+
+    def __getstate__(self) -> dict:
+        return {
+            "name": self._shm.name,
+            "slot_count": self.slot_count,
+            "slot_size": self.slot_size,
+            "write_lock": self._write_lock,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.slot_count = state["slot_count"]
+        self.slot_size = state["slot_size"]
+        self._write_lock = state["write_lock"]
+        self._shm = _attach_shared_memory(state["name"])
+        self._is_owner = False
+        self._init_local_state()
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    # --- producer side -------------------------------------------------
+
+    def put_nowait(self, obj: Any) -> None:
+        if isinstance(obj, bytes):
+            kind, payload = _KIND_BYTES, obj
+        else:
+            kind, payload = _KIND_PICKLE, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(payload)
+        if size > self._max_payload_size:
+            self.oversized_count += 1
+            raise PayloadTooLarge(size, self._max_payload_size)
+
+        buf = self._buf
+        with self._write_lock:
+            write_seq, _ = _RING_HEADER.unpack_from(buf, 0)
+            offset = _RING_HEADER_SIZE + (write_seq % self.slot_count) * self.slot_size
+            _SLOT_HEADER.pack_into(buf, offset, _SLOT_WRITING, size, kind)
+            start = offset + _SLOT_HEADER.size
+            buf[start:start + size] = payload
+            _SLOT_HEADER.pack_into(buf, offset, write_seq + 1, size, kind)
+            struct.pack_into("<Q", buf, 0, write_seq + 1)
+
+    def put(self, obj: Any, block: bool = True, timeout: float | None = None) -> None:
+        # Never blocks: a full ring overwrites its oldest records
+        self.put_nowait(obj)
+
+    # --- consumer side -------------------------------------------------
+
+    def drain(self, max_items: int | None = None) -> list:
+        """Return every record currently in the ring (up to max_items), oldest first."""
+        buf = self._buf
+        write_seq, read_seq = _RING_HEADER.unpack_from(buf, 0)
+        if write_seq - read_seq > self.slot_count:
+            # Producers lapped us: the oldest records were overwritten
+            self.dropped_count += write_seq - self.slot_count - read_seq
+            read_seq = write_seq - self.slot_count
+        end_seq = write_seq if max_items is None else min(write_seq, read_seq + max_items)
+
+        items = []
+        for seq in range(read_seq, end_seq):
+            offset = _RING_HEADER_SIZE + (seq % self.slot_count) * self.slot_size
+            stamp, size, kind = _SLOT_HEADER.unpack_from(buf, offset)
+            if stamp != seq + 1:
+                self.dropped_count += 1
+                continue
+            start = offset + _SLOT_HEADER.size
+            payload = bytes(buf[start:start + size])
+            if _SLOT_HEADER.unpack_from(buf, offset)[0] != stamp:
+                # Overwritten while we were copying it
+                self.dropped_count += 1
+                continue
+            items.append(payload if kind == _KIND_BYTES else pickle.loads(payload))
+
+        struct.pack_into("<Q", buf, 8, end_seq)
+        return items
+
+    def get_nowait(self) -> Any:
+        while True:
+            write_seq, read_seq = _RING_HEADER.unpack_from(self._buf, 0)
+            if write_seq == read_seq:
+                raise queue_module.Empty
+            items = self.drain(max_items=1)
+            if items:
+                return items[0]
+
+    def get(self, block: bool = True, timeout: float | None = None) -> Any:
+        if not block:
+            return self.get_nowait()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.get_nowait()
+            except queue_module.Empty:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+                time.sleep(RING_POLL_INTERVAL)
+
+    def qsize(self) -> int:
+        write_seq, read_seq = _RING_HEADER.unpack_from(self._buf, 0)
+        return min(write_seq - read_seq, self.slot_count)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        # Never full from a producer's point of view
+        return False
+
+    # --- lifetime ------------------------------------------------------
+
+    def close(self) -> None:
+        """Detach this process from the shared memory."""
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Close and free the shared memory. Only the creating process should call this."""
+        self.close()
+        if self._is_owner:
+            self._shm.unlink()
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13, attaching registers the segment with the resource tracker,
+    # which would unlink it when the attaching (child) process exits. Skip the
+    # registration; the creating process owns the segment's lifetime.
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
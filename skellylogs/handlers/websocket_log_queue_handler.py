@@ -1,21 +1,76 @@
+from __future__ import annotations
+
+import atexit
 import json
 import logging
 import multiprocessing
+import operator
+import pickle
 import queue as queue_module
+import sys
+import time
 import traceback as traceback_module
-from dataclasses import dataclass
+from dataclasses import dataclass, fields, replace
 from multiprocessing import Queue
-from typing import Optional
+from typing import Any, Optional
 
+from .periodic_flusher import PeriodicFlusher
+from .priority_log_queue import PRIORITY_LANE_MIN_LEVEL, PriorityLogQueue
+from .shared_memory_log_ring import PayloadTooLarge, SharedMemoryLogRing
+from .websocket_log_queue_options import (
+    DEFAULT_WEBSOCKET_BATCH_INTERVAL,
+    DEFAULT_WEBSOCKET_BATCH_SIZE,
+    MAX_WEBSOCKET_LOG_QUEUE_SIZE,
+    OVERFLOW_POLICIES,
+    OVERFLOW_POLICY_DROP_NEWEST,
+    OVERFLOW_POLICY_DROP_OLDEST,
+    OVERFLOW_POLICY_SAMPLE,
+    PAYLOAD_FORMAT_COMPACT,
+    PAYLOAD_FORMAT_DICT,
+    PAYLOAD_FORMATS,
+    WEBSOCKET_LOG_TRANSPORT_PRIORITY,
+    WEBSOCKET_LOG_TRANSPORT_QUEUE,
+    WEBSOCKET_LOG_TRANSPORT_SHARED_MEMORY,
+)
 from ..log_levels import LogLevels
-from ..filters.delta_time import DeltaTimeFilter
 from ..formatters.custom_formatter import CustomFormatter
 from ..log_format_string import LOG_FORMAT_STRING
 
 MIN_LOG_LEVEL_FOR_WEBSOCKET = LogLevels.TRACE.value
 
-@dataclass
+# Records at or above this level flush the pending batch immediately
+WEBSOCKET_BATCH_FLUSH_LEVEL = LogLevels.ERROR.value
+LOG_RECORD_BATCH_MESSAGE_TYPE = "log_record_batch"
+
+# After a full-queue event, the "sample" policy keeps 1 in DEFAULT_OVERFLOW_SAMPLE_EVERY records for this long
+OVERFLOW_SAMPLING_WINDOW = 1.0  # seconds
+DEFAULT_OVERFLOW_SAMPLE_EVERY = 10
+DEFAULT_DROP_REPORT_INTERVAL = 5.0  # seconds
+DROP_REPORT_LOGGER_NAME = "skellylogs.websocket"
+# Text fields shortened to fit a record into a SharedMemoryLogRing slot. A
+# traceback is in exc_info, exc_text and formatted_message, so all of them.
+TRUNCATABLE_MODEL_FIELDS = ("msg", "message", "formatted_message", "exc_info", "exc_text", "stack_info")
+TRUNCATION_MARKER = "\n... [{} characters truncated] ...\n"
+MIN_TRUNCATED_FIELD_LENGTH = 64
+
+# json.dumps builds a new encoder on every call when given non-default options.
+# ensure_ascii=False: the "└>>" pointer in every formatted_message stays one UTF-8 character
+_COMPACT_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+# slots=True needs 3.10+; on older Pythons the model is a regular dataclass
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class LogRecordModel:
+    """One log record as sent to the frontend.
+
+    Slotted, and serializable either as a dict (model_dump) or as a compact
+    positional encoding (to_tuple/to_bytes) that skips the keys entirely.
+    New fields must be appended with a default, so older payloads (shorter
+    tuples) still decode.
+    """
+
     name: str
     msg: str
     args: list
@@ -42,6 +97,8 @@ class LogRecordModel:
     exc_info: str | None = None
     exc_text: str | None = None
     stack_info: str | None = None
+    # Set by the consumer's LogHistoryStore, never by the producing handler
+    sequence_id: int | None = None
 
     def model_dump(self) -> dict:
         # name: str
@@ -70,6 +127,7 @@ class LogRecordModel:
         # exc_info: str | None = None
         # exc_text: str | None = None
         # stack_info: str | None = None
+        # sequence_id: int | None = None
         return {
             "name": self.name,
             "msg": self.msg,
@@ -97,104 +155,450 @@ class LogRecordModel:
             "exc_info": self.exc_info,
             "exc_text": self.exc_text,
             "stack_info": self.stack_info,
+            "sequence_id": self.sequence_id,
         }
 
-    def model_dump_json(self, indent:int=2) -> str:
+    def model_dump_json(self, indent: int | None = None) -> str:
+        if indent is None:
+            return _COMPACT_JSON_ENCODER.encode(self.model_dump())
         return json.dumps(self.model_dump(), indent=indent)
 
+    def to_tuple(self) -> tuple:
+        """Field values in declaration order (see LOG_RECORD_MODEL_FIELDS)."""
+        return _get_model_fields(self)
+
+    @classmethod
+    def from_tuple(cls, values: tuple | list) -> LogRecordModel:
+        return cls(*values)
+
+    def to_bytes(self) -> bytes:
+        """Compact binary encoding: the pickled positional field tuple, no keys.
+
+        Every field is a str/int/float/None (args is always []), so this is
+        a flat, fast pickle — several times cheaper to encode and decode than
+        the 26-key dict, and smaller on the wire.
+        """
+        return pickle.dumps(_get_model_fields(self), protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> LogRecordModel:
+        return cls(*pickle.loads(data))
+
+    @classmethod
+    def from_payload(cls, payload: dict | bytes) -> LogRecordModel:
+        """Decode a single-record queue payload in either format."""
+        if isinstance(payload, (bytes, bytearray)):
+            return cls.from_bytes(payload)
+        return cls(**payload)
+
+
+LOG_RECORD_MODEL_FIELDS = tuple(field.name for field in fields(LogRecordModel))
+_get_model_fields = operator.attrgetter(*LOG_RECORD_MODEL_FIELDS)
+
+
+def log_record_to_model(record: logging.LogRecord, formatted_message: str) -> LogRecordModel:
+    """Build a LogRecordModel from a record that has already been formatted.
+
+    Extracts fields explicitly rather than splatting record.__dict__, so
+    unpicklable args, unknown fields (taskName on 3.12+) and traceback frame
+    locals never reach the payload.
+    """
+    # Convert exc_info to string safely
+    exc_info_str: str | None = None
+    if record.exc_info:
+        try:
+            exc_info_str = "".join(
+                traceback_module.format_exception(*record.exc_info)
+            )
+        except Exception:
+            exc_info_str = f"{record.exc_info[0].__name__}: {record.exc_info[1]}"
+
+    exc_text_str: str | None = None
+    if record.exc_text:
+        exc_text_str = str(record.exc_text)
+
+    stack_info_str: str | None = None
+    if record.stack_info:
+        stack_info_str = str(record.stack_info)
+
+    return LogRecordModel(
+        name=record.name,
+        msg=str(record.msg) if record.msg is not None else "",
+        args=[],  # Args are already baked into record.message — no need to pickle them
+        levelname=record.levelname,
+        levelno=record.levelno,
+        pathname=record.pathname,
+        filename=record.filename,
+        module=record.module,
+        lineno=record.lineno,
+        funcName=record.funcName,
+        created=record.created,
+        msecs=record.msecs,
+        relativeCreated=record.relativeCreated,
+        thread=record.thread or 0,
+        threadName=record.threadName or "",
+        processName=record.processName or "",
+        process=record.process or 0,
+        delta_t=getattr(record, "delta_t", "0.000ms"),
+        message=record.message,
+        asctime=getattr(record, "asctime", ""),
+        formatted_message=formatted_message,
+        type="LogRecord",
+        exc_info=exc_info_str,
+        exc_text=exc_text_str,
+        stack_info=stack_info_str,
+    )
+
 
 class WebSocketQueueHandler(logging.Handler):
     """Formats logs and puts them in a queue for websocket distribution.
 
-    Uses non-blocking put: if the queue is full, the log message is
-    silently dropped. Blocking the calling thread (which may be a camera
+    Uses non-blocking put: if the queue is full, a record is dropped
+    according to `overflow_policy` ("drop_newest", "drop_oldest", or
+    "sample", which keeps 1 in `sample_every` records for a while after the
+    queue fills up). Blocking the calling thread (which may be a camera
     frame-grab loop) to wait for the websocket relay to drain is never
-    acceptable.
+    acceptable. Every drop is counted per level in `dropped_counts`, and
+    every `drop_report_interval` seconds a synthetic WARNING ("N log records
+    dropped ...") is sent to the frontend. Pair with a PriorityLogQueue so
+    WARNING+ records have their own capacity and are not crowded out by
+    LOOP/TRACE bursts.
+
+    With payload_format="compact", each record goes on the queue as
+    LogRecordModel.to_bytes() instead of a 26-key dict: smaller to pickle
+    (or copied raw into a SharedMemoryLogRing) and never built as a dict on
+    the producer side. Consumers decode either format with
+    unpack_log_payload()/LogRecordModel.from_payload().
 
     Builds the queue payload from explicit field extraction rather than
     splatting record.__dict__, which avoids pickling failures from
     unpicklable args (cv2.VideoCapture, CameraConfig, etc.), unknown
     fields (taskName on 3.12+), and traceback frame locals.
+
+    With batch_size > 1, payloads are coalesced into one
+    {"message_type": "log_record_batch", "records": [...]} queue item, so the
+    queue's pickle/feeder/pipe cost is paid per batch instead of per record.
+    A batch is sent when it reaches batch_size, when it is older than
+    batch_interval seconds, or as soon as an ERROR arrives. Consumers should
+    use unpack_log_payload()/get_log_records() to handle both shapes.
     """
 
-    def __init__(self, queue: multiprocessing.Queue):
+    def __init__(
+        self,
+        queue: multiprocessing.Queue,
+        batch_size: int = DEFAULT_WEBSOCKET_BATCH_SIZE,
+        batch_interval: float = DEFAULT_WEBSOCKET_BATCH_INTERVAL,
+        overflow_policy: str = OVERFLOW_POLICY_DROP_NEWEST,
+        drop_report_interval: float | None = DEFAULT_DROP_REPORT_INTERVAL,
+        sample_every: int = DEFAULT_OVERFLOW_SAMPLE_EVERY,
+        payload_format: str = PAYLOAD_FORMAT_DICT,
+    ):
         super().__init__()
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy!r} (expected one of {OVERFLOW_POLICIES})")
+        if payload_format not in PAYLOAD_FORMATS:
+            raise ValueError(f"Unknown payload format: {payload_format!r} (expected one of {PAYLOAD_FORMATS})")
+        self.payload_format = payload_format
         self.queue = queue
-        self.addFilter(DeltaTimeFilter())
         self.setFormatter(CustomFormatter(LOG_FORMAT_STRING))
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.overflow_policy = overflow_policy
+        self.drop_report_interval = drop_report_interval
+        self.sample_every = sample_every
+        # Exact, cumulative {levelname: count} of records that never made it onto the queue
+        self.dropped_counts: dict[str, int] = {}
+        self._unreported_drops: dict[str, int] = {}
+        self._last_drop_report = time.monotonic()
+        self._sampling_until: dict[int, float] = {}
+        self._sample_counter = 0
+        self._batch: list[LogRecordModel] = []
+        self._batch_started = 0.0
+        self._flusher: PeriodicFlusher | None = None
+        if batch_size > 1:
+            self._flusher = PeriodicFlusher(
+                interval=batch_interval,
+                callback=self._on_flush_timer,
+                name="skellylogs-websocket-batch-flusher",
+            )
+            self._flusher.start()
 
     def emit(self, record: logging.LogRecord) -> None:
         if record.levelno < MIN_LOG_LEVEL_FOR_WEBSOCKET:
             return
         try:
-            # Format first — populates record.message and record.asctime
-            formatted_message = self.format(record)
+            model = self._build_model(record)
 
-            # Convert exc_info to string safely
-            exc_info_str: str | None = None
-            if record.exc_info:
-                try:
-                    exc_info_str = "".join(
-                        traceback_module.format_exception(*record.exc_info)
-                    )
-                except Exception:
-                    exc_info_str = f"{record.exc_info[0].__name__}: {record.exc_info[1]}"
-
-            exc_text_str: str | None = None
-            if record.exc_text:
-                exc_text_str = str(record.exc_text)
-
-            stack_info_str: str | None = None
-            if record.stack_info:
-                stack_info_str = str(record.stack_info)
-
-            payload = LogRecordModel(
-                name=record.name,
-                msg=str(record.msg) if record.msg is not None else "",
-                args=[],  # Args are already baked into record.message — no need to pickle them
-                levelname=record.levelname,
-                levelno=record.levelno,
-                pathname=record.pathname,
-                filename=record.filename,
-                module=record.module,
-                lineno=record.lineno,
-                funcName=record.funcName,
-                created=record.created,
-                msecs=record.msecs,
-                relativeCreated=record.relativeCreated,
-                thread=record.thread or 0,
-                threadName=record.threadName or "",
-                processName=record.processName or "",
-                process=record.process or 0,
-                delta_t=getattr(record, "delta_t", "0.000ms"),
-                message=record.getMessage(),
-                asctime=getattr(record, "asctime", ""),
-                formatted_message=formatted_message,
-                type="LogRecord",
-                exc_info=exc_info_str,
-                exc_text=exc_text_str,
-                stack_info=stack_info_str,
-            ).model_dump()
-
-            self.queue.put_nowait(payload)
-        except queue_module.Full:
-            pass
+            if self.batch_size <= 1:
+                self._enqueue(model)
+            else:
+                if not self._batch:
+                    self._batch_started = time.monotonic()
+                self._batch.append(model)
+                if (
+                    len(self._batch) >= self.batch_size
+                    or record.levelno >= WEBSOCKET_BATCH_FLUSH_LEVEL
+                    or time.monotonic() - self._batch_started >= self.batch_interval
+                ):
+                    self._send_batch()
+
+            if self._unreported_drops:
+                self._report_drops()
         except Exception:
             self.handleError(record)
 
+    def _build_model(self, record: logging.LogRecord) -> LogRecordModel:
+        # Format first — populates record.message, record.asctime and record.delta_t,
+        # reusing the rendering already done by any other handler
+        return log_record_to_model(record, formatted_message=self.format(record))
+
+    def _encode(self, model: LogRecordModel) -> dict | bytes:
+        if self.payload_format == PAYLOAD_FORMAT_COMPACT:
+            return model.to_bytes()
+        return model.model_dump()
+
+    # --- queue lanes and overflow policy -------------------------------
 
-MAX_WEBSOCKET_LOG_QUEUE_SIZE = 1000
-WEBSOCKET_LOG_QUEUE: Optional[Queue] = None
+    def _lane_for(self, levelno: int):
+        if isinstance(self.queue, PriorityLogQueue):
+            return self.queue.lane_for(levelno)
+        return self.queue
 
+    def _enqueue(self, model: LogRecordModel) -> None:
+        self._put(self._lane_for(model.levelno), self._encode(model), [model.levelname])
+
+    def _put(self, lane, payload: dict | bytes, levelnames: list[str]) -> None:
+        """Non-blocking put that applies the overflow policy and counts every drop."""
+        if self.overflow_policy == OVERFLOW_POLICY_SAMPLE and self._is_sampled_out(lane):
+            self._count_drops(levelnames)
+            return
+        try:
+            lane.put_nowait(payload)
+            return
+        except PayloadTooLarge as error:
+            # Not a full queue: evicting or sampling wouldn't help
+            self._put_oversized(lane, payload, error.max_size)
+            return
+        except queue_module.Full:
+            pass
 
-def create_websocket_log_queue() -> Queue:
+        if self.overflow_policy == OVERFLOW_POLICY_DROP_OLDEST:
+            try:
+                evicted = lane.get_nowait()
+            except queue_module.Empty:
+                evicted = None
+            if evicted is not None:
+                self._count_drops(_payload_levelnames(evicted))
+                try:
+                    lane.put_nowait(payload)
+                    return
+                except queue_module.Full:
+                    pass
+        elif self.overflow_policy == OVERFLOW_POLICY_SAMPLE:
+            self._sampling_until[id(lane)] = time.monotonic() + OVERFLOW_SAMPLING_WINDOW
+        self._count_drops(levelnames)
+
+    def _put_oversized(self, lane, payload: dict | bytes, max_size: int) -> None:
+        """Put a payload too large for a ring slot one record at a time, shortening records that still don't fit.
+
+        Long tracebacks are what overflow a slot, and those are the ERROR
+        records that must reach the frontend, so their text fields are
+        trimmed (keeping the start and the end) rather than the record dropped.
+        """
+        for model in unpack_log_payload(payload):
+            record_payload = self._encode(model)
+            field_length = max_size
+            while True:
+                try:
+                    lane.put_nowait(record_payload)
+                    break
+                except PayloadTooLarge:
+                    field_length //= 2
+                    if field_length < MIN_TRUNCATED_FIELD_LENGTH:
+                        self._count_drops([model.levelname])
+                        break
+                    record_payload = self._encode(_truncate_model(model, field_length))
+                except queue_module.Full:
+                    self._count_drops([model.levelname])
+                    break
+
+    def _is_sampled_out(self, lane) -> bool:
+        sampling_until = self._sampling_until.get(id(lane))
+        if sampling_until is None:
+            return False
+        if time.monotonic() >= sampling_until:
+            del self._sampling_until[id(lane)]
+            return False
+        self._sample_counter += 1
+        return self._sample_counter % self.sample_every != 0
+
+    def _count_drops(self, levelnames: list[str]) -> None:
+        for levelname in levelnames:
+            self.dropped_counts[levelname] = self.dropped_counts.get(levelname, 0) + 1
+            self._unreported_drops[levelname] = self._unreported_drops.get(levelname, 0) + 1
+
+    def _report_drops(self, force: bool = False) -> None:
+        """Send a synthetic WARNING record summarizing drops since the last report."""
+        if self.drop_report_interval is None or not self._unreported_drops:
+            return
+        now = time.monotonic()
+        elapsed = now - self._last_drop_report
+        if not force and elapsed < self.drop_report_interval:
+            return
+
+        summary = ", ".join(
+            f"{levelname}: {self._unreported_drops[levelname]}"
+            for levelname in sorted(self._unreported_drops, key=_levelname_sort_key)
+        )
+        report = logging.LogRecord(
+            name=DROP_REPORT_LOGGER_NAME,
+            level=logging.WARNING,
+            pathname=__file__,
+            lineno=0,
+            msg=f"{sum(self._unreported_drops.values())} log records dropped in the last {elapsed:.1f}s ({summary})",
+            args=(),
+            exc_info=None,
+            func="_report_drops",
+        )
+        try:
+            self._lane_for(report.levelno).put_nowait(self._encode(self._build_model(report)))
+        except queue_module.Full:
+            return  # Keep the counts and try again with the next record
+        self._unreported_drops = {}
+        self._last_drop_report = now
+
+    # --- batching ------------------------------------------------------
+
+    def _send_batch(self) -> None:
+        batch, self._batch = self._batch, []
+        if isinstance(self.queue, PriorityLogQueue):
+            # Split so WARNING+ records keep their reserved capacity
+            priority = [model for model in batch if model.levelno >= PRIORITY_LANE_MIN_LEVEL]
+            bulk = [model for model in batch if model.levelno < PRIORITY_LANE_MIN_LEVEL]
+            lanes = ((self.queue.priority_lane, priority), (self.queue.bulk_lane, bulk))
+        else:
+            lanes = ((self.queue, batch),)
+        for lane, models in lanes:
+            if models:
+                self._put(
+                    lane,
+                    {"message_type": LOG_RECORD_BATCH_MESSAGE_TYPE, "records": [self._encode(m) for m in models]},
+                    [model.levelname for model in models],
+                )
+
+    def _on_flush_timer(self) -> None:
+        with self.lock:
+            if self._batch and time.monotonic() - self._batch_started >= self.batch_interval:
+                self._send_batch()
+            self._report_drops()
+
+    def flush(self) -> None:
+        """Send any pending batch, and any pending drop report, right away."""
+        with self.lock:
+            if self._batch:
+                self._send_batch()
+            self._report_drops(force=True)
+
+    def close(self) -> None:
+        if self._flusher is not None:
+            # Don't join: logging.shutdown() closes handlers with the lock
+            # held, and the flusher thread may be waiting on that lock
+            self._flusher.stop(wait=False)
+            self._flusher = None
+        self.flush()
+        super().close()
+
+
+def _levelname_sort_key(levelname: str) -> int:
+    levelno = logging.getLevelName(levelname)
+    return levelno if isinstance(levelno, int) else 0
+
+
+def _truncate_text(text: str | None, max_length: int) -> str | None:
+    if text is None or len(text) <= max_length:
+        return text
+    removed = len(text) - max_length
+    marker = TRUNCATION_MARKER.format(removed)
+    head = max_length // 2
+    return text[:head] + marker + text[len(text) - (max_length - head):]
+
+
+def _truncate_model(model: LogRecordModel, max_length: int) -> LogRecordModel:
+    """A copy of `model` with every long text field cut to about `max_length` characters."""
+    changes = {name: _truncate_text(getattr(model, name), max_length) for name in TRUNCATABLE_MODEL_FIELDS}
+    return replace(model, **changes)
+
+
+def _payload_levelnames(payload: Any) -> list[str]:
+    try:
+        return [model.levelname for model in unpack_log_payload(payload)]
+    except Exception:
+        return ["UNKNOWN"]
+
+
+def unpack_log_payload(payload: dict | bytes) -> list[LogRecordModel]:
+    """Turn one websocket queue item (a single record or a batch, in either payload format) into LogRecordModels."""
+    if isinstance(payload, dict) and payload.get("message_type") == LOG_RECORD_BATCH_MESSAGE_TYPE:
+        return [LogRecordModel.from_payload(record) for record in payload["records"]]
+    return [LogRecordModel.from_payload(payload)]
+
+
+def get_log_records(queue: multiprocessing.Queue, timeout: float | None = None) -> list[LogRecordModel]:
+    """Block for the next queue item, then drain whatever else is already queued.
+
+    Returns every record from every item taken, in order, so a relay does one
+    wakeup per burst rather than one per record. Raises queue.Empty if nothing
+    arrives within `timeout` seconds.
+    """
+    records = unpack_log_payload(queue.get(timeout=timeout))
+    records.extend(drain_log_records(queue))
+    return records
+
+
+def drain_log_records(queue: multiprocessing.Queue) -> list[LogRecordModel]:
+    """Every record already on the queue, in order, without blocking ([] if there are none)."""
+    records: list[LogRecordModel] = []
+    if isinstance(queue, SharedMemoryLogRing):
+        for payload in queue.drain():
+            records.extend(unpack_log_payload(payload))
+        return records
+    while True:
+        try:
+            payload = queue.get_nowait()
+        except queue_module.Empty:
+            return records
+        records.extend(unpack_log_payload(payload))
+
+
+WEBSOCKET_LOG_QUEUE: Optional[Queue | SharedMemoryLogRing | PriorityLogQueue] = None
+
+
+def create_websocket_log_queue(
+    transport: str = WEBSOCKET_LOG_TRANSPORT_QUEUE,
+) -> Queue | SharedMemoryLogRing | PriorityLogQueue:
+    """Create the process-wide websocket log queue, if it doesn't exist yet.
+
+    Args:
+        transport: "queue" for a multiprocessing.Queue, or "shared_memory"
+            for a SharedMemoryLogRing (no pickling feeder thread or pipe
+            write per record, overwrite-oldest when full), or "priority"
+            for a PriorityLogQueue (separate capacity for WARNING+ records).
+    """
     global WEBSOCKET_LOG_QUEUE
     if WEBSOCKET_LOG_QUEUE is None:
-        WEBSOCKET_LOG_QUEUE = Queue(maxsize=MAX_WEBSOCKET_LOG_QUEUE_SIZE)
+        if transport == WEBSOCKET_LOG_TRANSPORT_QUEUE:
+            WEBSOCKET_LOG_QUEUE = Queue(maxsize=MAX_WEBSOCKET_LOG_QUEUE_SIZE)
+        elif transport == WEBSOCKET_LOG_TRANSPORT_SHARED_MEMORY:
+            WEBSOCKET_LOG_QUEUE = SharedMemoryLogRing()
+            atexit.register(WEBSOCKET_LOG_QUEUE.unlink)
+        elif transport == WEBSOCKET_LOG_TRANSPORT_PRIORITY:
+            WEBSOCKET_LOG_QUEUE = PriorityLogQueue()
+        else:
+            raise ValueError(f"Unknown websocket log transport: {transport!r}")
     return WEBSOCKET_LOG_QUEUE
 
 
-def get_websocket_log_queue() -> Queue:
+def get_websocket_log_queue() -> Queue | SharedMemoryLogRing | PriorityLogQueue:
     global WEBSOCKET_LOG_QUEUE
     if WEBSOCKET_LOG_QUEUE is None:
         raise ValueError("Websocket log queue not created yet")
@@ -0,0 +1,27 @@
+"""Websocket log queue options, importable without the handler itself.
+
+configure_logging and LoggerBuilder use these as parameter defaults; keeping
+them out of websocket_log_queue_handler means a process that never builds a
+websocket handler (a child process shipping records to its parent) doesn't
+pay for importing it.
+"""
+
+# Batching is off by default (one queue item per record, as before)
+DEFAULT_WEBSOCKET_BATCH_SIZE = 1
+DEFAULT_WEBSOCKET_BATCH_INTERVAL = 0.05  # seconds
+
+# What to do when the queue (or the record's lane of a PriorityLogQueue) is full
+OVERFLOW_POLICY_DROP_NEWEST = "drop_newest"
+OVERFLOW_POLICY_DROP_OLDEST = "drop_oldest"
+OVERFLOW_POLICY_SAMPLE = "sample"
+OVERFLOW_POLICIES = (OVERFLOW_POLICY_DROP_NEWEST, OVERFLOW_POLICY_DROP_OLDEST, OVERFLOW_POLICY_SAMPLE)
+
+# Payload encodings the handler can put on the queue
+PAYLOAD_FORMAT_DICT = "dict"  # LogRecordModel.model_dump() — what consumers have always received
+PAYLOAD_FORMAT_COMPACT = "compact"  # LogRecordModel.to_bytes() — positional field tuple, no keys
+PAYLOAD_FORMATS = (PAYLOAD_FORMAT_DICT, PAYLOAD_FORMAT_COMPACT)
+
+MAX_WEBSOCKET_LOG_QUEUE_SIZE = 1000
+WEBSOCKET_LOG_TRANSPORT_QUEUE = "queue"
+WEBSOCKET_LOG_TRANSPORT_SHARED_MEMORY = "shared_memory"
+WEBSOCKET_LOG_TRANSPORT_PRIORITY = "priority"
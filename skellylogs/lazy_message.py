@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+
+class LazyMessage:
+    """A log message that is only built if a handler actually formats the record.
+
+    Wrap anything expensive to compute or format:
+
+        logger.loop(LazyMessage("frame {} from camera {}: {!r}", i, camera_id, frame_stats))
+        logger.trace(LazyMessage(lambda: f"frame {i}: {describe(frame_stats)}"))
+
+    An f-string is built before the logging call even when the level is off;
+    the template's args are just references, and the callable's body (here
+    describe()) only runs if the record is formatted.
+
+    With a template string, it is rendered with str.format(*args, **kwargs);
+    with a callable, the message is callable(*args, **kwargs). Rendering
+    happens the first time anything calls str() on it (the shared record
+    renderer, a filter reading getMessage()), and the result is cached, so it
+    runs at most once per record however many handlers there are. When the
+    level is disabled, or every handler rejects the record, it never runs.
+
+    In background listener mode rendering happens on the listener thread, so
+    don't mutate objects the message captures after the logging call.
+    """
+
+    __slots__ = ("_template", "_args", "_kwargs", "_rendered")
+
+    def __init__(self, template: str | Callable[..., Any], *args: Any, **kwargs: Any):
+        self._template = template
+        self._args = args
+        self._kwargs = kwargs
+        self._rendered: str | None = None
+
+    def __str__(self) -> str:
+        if self._rendered is None:
+            if callable(self._template):
+                self._rendered = str(self._template(*self._args, **self._kwargs))
+            else:
+                self._rendered = self._template.format(*self._args, **self._kwargs)
+            # Drop the references: the message may outlive the frame that built it
+            self._template = self._args = self._kwargs = None
+        return self._rendered
+
+    def __repr__(self) -> str:
+        if self._rendered is not None:
+            return f"LazyMessage({self._rendered!r})"
+        return f"LazyMessage({self._template!r}, ...)"
+
+    def __reduce__(self):
+        # Records crossing a process boundary carry the rendered text, never the callable
+        return str, (str(self),)
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Mapping, Optional, Sequence
+
+from skellylogs.filters.sampling import SamplingFilter
+from skellylogs.handlers.handler_stats import get_logging_stats
+from skellylogs.handlers.periodic_flusher import PeriodicFlusher
+from skellylogs.log_levels import LogLevels
+
+LOAD_SHEDDING_LOGGER_NAME = "skellylogs.load_shedding"
+
+# Each step sheds more: sample the low levels, then drop them all
+LOAD_SHEDDING_STAGE_NORMAL = 0
+LOAD_SHEDDING_STAGE_SAMPLING = 1
+LOAD_SHEDDING_STAGE_SHEDDING = 2
+LOAD_SHEDDING_STAGE_NAMES = ("normal", "sampling", "shedding")
+
+
+@dataclass
+class LoadSheddingPolicy:
+    """When and how to shed low-level records while the logging pipeline falls behind.
+
+    Attributes:
+        check_interval: Seconds between pressure checks.
+        high_queue_fill: A handler queue (websocket, background listener,
+            child process) at least this full counts as pressure.
+        low_queue_fill: Pressure has cleared once every queue is below this.
+        max_emit_ns: A handler whose mean emit time over the last interval
+            exceeds this (stdout or the disk blocking) counts as pressure.
+        sample_every: While sampling, keep 1 in this many records below
+            `shed_below`.
+        recovery_checks: Consecutive clear checks before stepping back
+            down one stage.
+        shed_below: Records below this level are sampled, then shed.
+            DEBUG by default, i.e. LOOP and TRACE.
+    """
+
+    check_interval: float = 0.5
+    high_queue_fill: float = 0.75
+    low_queue_fill: float = 0.25
+    max_emit_ns: int = 1_000_000
+    sample_every: int = 10
+    recovery_checks: int = 4
+    shed_below: LogLevels = LogLevels.DEBUG
+
+
+def _queue_fill(queue) -> float | None:
+    """Fraction of `queue`'s capacity in use, or None if it can't be told."""
+    # A PriorityLogQueue's bulk lane is the one LOOP/TRACE records fill
+    queue = getattr(queue, "bulk_lane", queue)
+    capacity = getattr(queue, "slot_count", None) or getattr(queue, "maxsize", None) or getattr(queue, "_maxsize", None)
+    if not capacity:
+        return None
+    try:
+        size = queue.qsize()
+    except (NotImplementedError, OSError):
+        # multiprocessing.Queue.qsize() isn't available on macOS
+        return None
+    return size / capacity
+
+
+class LoadSheddingController:
+    """Watches the logging pipeline and sheds LOOP/TRACE records while it falls behind.
+
+    Every `check_interval` seconds it looks at:
+    - how full each handler's queue is (websocket, background listener, child process);
+    - whether any handler dropped records because its queue was full;
+    - each handler's mean emit time (from the handler stats), which is where
+      a blocked stdout or a slow disk shows up.
+
+    Under pressure it steps up one stage:
+    - "sampling": a SamplingFilter on the root handlers keeps 1 in
+      `sample_every` records below `shed_below`, before any handler formats
+      them.
+    - "shedding": the filter drops every record below `shed_below`.
+    Shedding happens in the handler filters rather than by raising a logger
+    level, so loggers with an explicit level (getLogger(...).setLevel(TRACE))
+    are covered too. Once every signal has been clear for `recovery_checks`
+    checks in a row, it steps back down one stage.
+
+    Every handler's queue counts, the websocket's included: a websocket
+    queue that nothing consumes fills up and keeps the controller at the
+    shedding stage, which drops records below `shed_below` from every sink,
+    the log file included. Only enable load shedding when the frontend
+    drains the websocket queue.
+
+    Each transition is announced by a record from the
+    "skellylogs.load_shedding" logger: WARNING when stepping up, INFO when
+    stepping down.
+    """
+
+    def __init__(
+        self,
+        policy: LoadSheddingPolicy,
+        handlers: Mapping[str, logging.Handler],
+        filtered_handlers: Sequence[logging.Handler],
+    ):
+        self.policy = policy
+        self.handlers = dict(handlers)
+        self.filtered_handlers = list(filtered_handlers)
+        self.stage = LOAD_SHEDDING_STAGE_NORMAL
+        self.transition_count = 0
+        self.sampling_filter = SamplingFilter(below_level=policy.shed_below.value, sample_every=policy.sample_every)
+        self._clear_checks = 0
+        self._previous_stats = get_logging_stats()
+        self._lock = threading.Lock()
+        self._flusher = PeriodicFlusher(
+            interval=policy.check_interval, callback=self.check, name="skellylogs-load-shedding"
+        )
+
+    @property
+    def stage_name(self) -> str:
+        return LOAD_SHEDDING_STAGE_NAMES[self.stage]
+
+    def start(self) -> None:
+        self._flusher.start()
+
+    def stop(self) -> None:
+        """Stop checking and remove the sampling filter."""
+        self._flusher.stop(wait=False)
+        with self._lock:
+            self._apply_stage(LOAD_SHEDDING_STAGE_NORMAL)
+
+    def check(self) -> None:
+        """Measure the pipeline once and step the stage up or down if needed."""
+        with self._lock:
+            pressure, clear = self._measure()
+            if pressure:
+                self._clear_checks = 0
+                if self.stage < LOAD_SHEDDING_STAGE_SHEDDING:
+                    self._transition(self.stage + 1, ", ".join(pressure))
+            elif clear and self.stage > LOAD_SHEDDING_STAGE_NORMAL:
+                self._clear_checks += 1
+                if self._clear_checks >= self.policy.recovery_checks:
+                    self._clear_checks = 0
+                    self._transition(self.stage - 1, "pressure cleared")
+            else:
+                self._clear_checks = 0
+
+    def _measure(self) -> tuple[list[str], bool]:
+        """(descriptions of every pressure signal, whether everything is comfortably clear)."""
+        policy = self.policy
+        pressure = []
+        clear = True
+        for name, handler in self.handlers.items():
+            queue = getattr(handler, "queue", None)
+            fill = _queue_fill(queue) if queue is not None else None
+            if fill is not None:
+                if fill >= policy.high_queue_fill:
+                    pressure.append(f"{name} queue {fill:.0%} full")
+                if fill >= policy.low_queue_fill:
+                    clear = False
+
+        stats = get_logging_stats()
+        for name, current in stats.items():
+            before = self._previous_stats.get(name, {})
+            dropped = current["queue_full"] - before.get("queue_full", 0)
+            if dropped > 0:
+                pressure.append(f"{name} dropped {dropped} records")
+                clear = False
+            records = current["records"] - before.get("records", 0)
+            if records:
+                mean_emit_ns = (current["emit_ns_total"] - before.get("emit_ns_total", 0)) / records
+                if mean_emit_ns > policy.max_emit_ns:
+                    pressure.append(f"{name} emit mean {mean_emit_ns / 1000:.0f}us")
+                    clear = False
+        self._previous_stats = stats
+        return pressure, clear
+
+    def _transition(self, stage: int, reason: str) -> None:
+        previous_stage = self.stage
+        self._apply_stage(stage)
+        self.transition_count += 1
+        levelname = logging.getLevelName(self.policy.shed_below.value)
+        if stage == LOAD_SHEDDING_STAGE_SAMPLING:
+            action = f"keeping 1 in {self.policy.sample_every} records below {levelname}"
+        elif stage == LOAD_SHEDDING_STAGE_SHEDDING:
+            action = f"dropping records below {levelname}"
+        else:
+            action = f"records below {levelname} are logged normally again"
+        logging.getLogger(LOAD_SHEDDING_LOGGER_NAME).log(
+            logging.WARNING if stage > previous_stage else logging.INFO,
+            "Logging load shedding %s -> %s (%s): %s",
+            LOAD_SHEDDING_STAGE_NAMES[previous_stage],
+            LOAD_SHEDDING_STAGE_NAMES[stage],
+            reason,
+            action,
+        )
+
+    def _apply_stage(self, stage: int) -> None:
+        sampling_filter = self.sampling_filter
+        for handler in self.filtered_handlers:
+            installed = sampling_filter in handler.filters
+            # Swap in a new list rather than mutating it: other threads may be
+            # iterating handler.filters in Handler.filter() right now
+            if stage >= LOAD_SHEDDING_STAGE_SAMPLING and not installed:
+                handler.filters = [*handler.filters, sampling_filter]
+            elif stage < LOAD_SHEDDING_STAGE_SAMPLING and installed:
+                handler.filters = [f for f in handler.filters if f is not sampling_filter]
+        sampling_filter.drop_all = stage >= LOAD_SHEDDING_STAGE_SHEDDING
+        self.stage = stage
+
+
+LOAD_SHEDDING_CONTROLLER: Optional[LoadSheddingController] = None
+
+
+def start_load_shedding(
+    policy: LoadSheddingPolicy,
+    handlers: Mapping[str, logging.Handler],
+    filtered_handlers: Sequence[logging.Handler],
+) -> LoadSheddingController:
+    """Start watching `handlers` (by stats name), replacing any previous controller.
+
+    `filtered_handlers` are the handlers on the root logger, where the
+    sampling filter goes. The handlers must be instrumented (see
+    instrument_handler) for emit times and drops to be seen.
+    """
+    global LOAD_SHEDDING_CONTROLLER
+    stop_load_shedding()
+    LOAD_SHEDDING_CONTROLLER = LoadSheddingController(policy, handlers, filtered_handlers)
+    LOAD_SHEDDING_CONTROLLER.start()
+    return LOAD_SHEDDING_CONTROLLER
+
+
+def stop_load_shedding() -> None:
+    """Stop the running controller, if any, removing the sampling filter."""
+    global LOAD_SHEDDING_CONTROLLER
+    if LOAD_SHEDDING_CONTROLLER is not None:
+        LOAD_SHEDDING_CONTROLLER.stop()
+        LOAD_SHEDDING_CONTROLLER = None
+
+
+def get_load_shedding_controller() -> LoadSheddingController:
+    global LOAD_SHEDDING_CONTROLLER
+    if LOAD_SHEDDING_CONTROLLER is None:
+        raise ValueError("Load shedding not started yet")
+    return LOAD_SHEDDING_CONTROLLER
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import functools
+import gzip
+import json
+import logging
+import re
+import time
+from typing import BinaryIO, Iterator
+
+from skellylogs.default_paths import JSONL_LOG_FILE_EXTENSION
+from skellylogs.handlers.rotating_file_handler import COMPRESSED_SEGMENT_SUFFIX
+from skellylogs.handlers.websocket_log_queue_handler import LogRecordModel
+from skellylogs.log_format_string import LOG_POINTER_STRING
+from skellylogs.log_levels import LogLevels
+
+# Every text record starts a line with the pointer; any other line (a
+# multi-line message, a traceback) continues the record before it
+TEXT_RECORD_START = (LOG_POINTER_STRING + " ").encode("utf-8")
+_TEXT_RECORD_SEPARATOR = b"\n" + TEXT_RECORD_START
+
+# The fixed part of LOG_FORMAT_STRING that follows the message
+_TEXT_DETAILS_PATTERN = re.compile(
+    r" \|  (?P<levelname>[^|\n]+?) \|  (?P<delta_t>\S+) \|  (?P<location>[^|\n]+)\(\):(?P<lineno>\d+) \|  "
+    r"(?P<asctime>\S+) \|  PID:(?P<process>\d+):(?P<processName>[^|\n]*) \|  TID:(?P<thread>\d+):(?P<threadName>[^\n]*)"
+)
+_TEXT_DETAILS_BYTES_PATTERN = re.compile(_TEXT_DETAILS_PATTERN.pattern.encode("utf-8"))
+
+
+def is_jsonl_log_file(path: str) -> bool:
+    return path.endswith((JSONL_LOG_FILE_EXTENSION, JSONL_LOG_FILE_EXTENSION + COMPRESSED_SEGMENT_SUFFIX))
+
+
+def open_log_file(path: str) -> BinaryIO:
+    """Open a log file or a gzipped segment for binary reading."""
+    if path.endswith(COMPRESSED_SEGMENT_SUFFIX):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def get_levelno(levelname: str) -> int:
+    """Level number for a level name, including the skellylogs custom levels."""
+    if levelname in LogLevels.__members__:
+        return LogLevels[levelname].value
+    levelno = logging.getLevelName(levelname)
+    if isinstance(levelno, int):
+        return levelno
+    if levelname.startswith("Level "):
+        return int(levelname[len("Level "):])
+    return logging.NOTSET
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_asctime_second(second_string: str) -> float:
+    return time.mktime(time.strptime(second_string, "%Y-%m-%dT%H:%M:%S"))
+
+
+def parse_asctime(asctime: str) -> float:
+    """Inverse of format_asctime: `2025-02-20T14:30:01.123` (local time) -> epoch seconds."""
+    second_string, _, milliseconds = asctime.partition(".")
+    return _parse_asctime_second(second_string) + int(milliseconds or 0) / 1000
+
+
+def parse_text_record(text: str) -> LogRecordModel | None:
+    """Parse one LOG_FORMAT_STRING record (first line plus any continuation lines).
+
+    Fields the text line doesn't carry (pathname, module, msecs, ...) are
+    left empty; `created` is rebuilt from asctime, to the millisecond.
+    Returns None for text that isn't a log record.
+    """
+    match = _TEXT_DETAILS_PATTERN.search(text)
+    if match is None or not text.startswith(LOG_POINTER_STRING):
+        return None
+    message = text[len(LOG_POINTER_STRING) + 1:match.start()]
+    name, _, func_name = match["location"].rpartition(".")
+    levelname = match["levelname"]
+    asctime = match["asctime"]
+    created = parse_asctime(asctime)
+    exception = text[match.end():].strip("\n")
+    return LogRecordModel(
+        name=name,
+        msg=message,
+        args=[],
+        levelname=levelname,
+        levelno=get_levelno(levelname),
+        pathname="",
+        filename="",
+        module="",
+        lineno=int(match["lineno"]),
+        funcName=func_name,
+        created=created,
+        msecs=created % 1 * 1000,
+        relativeCreated=0.0,
+        thread=int(match["thread"]),
+        threadName=match["threadName"],
+        processName=match["processName"],
+        process=int(match["process"]),
+        delta_t=match["delta_t"],
+        message=message,
+        asctime=asctime,
+        formatted_message=text.rstrip("\n"),
+        type="LogRecord",
+        exc_text=exception or None,
+    )
+
+
+def parse_jsonl_record(line: str) -> LogRecordModel | None:
+    try:
+        return LogRecordModel.from_payload(json.loads(line))
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_log_record(data: bytes, jsonl: bool) -> LogRecordModel | None:
+    text = data.decode("utf-8", errors="replace")
+    return parse_jsonl_record(text) if jsonl else parse_text_record(text)
+
+
+def iter_record_spans(buffer, start: int, end: int, jsonl: bool) -> Iterator[tuple[int, int]]:
+    """Yield (start, end) byte offsets of each record in buffer[start:end].
+
+    `buffer` is anything with a bytes-like find() (bytes, mmap). The last
+    span runs to `end`, even if that record is still being written.
+    """
+    separator = b"\n" if jsonl else _TEXT_RECORD_SEPARATOR
+    if not jsonl and buffer[start:start + len(TEXT_RECORD_START)] != TEXT_RECORD_START:
+        # Not at a record boundary (e.g. a header line): skip to the first record
+        first = buffer.find(_TEXT_RECORD_SEPARATOR, start, end)
+        if first == -1:
+            return
+        start = first + 1
+    position = start
+    while position < end:
+        # The separator's leading newline ends this record; the next one starts right after it
+        boundary = buffer.find(separator, position, end)
+        if boundary == -1:
+            yield position, end
+            return
+        yield position, boundary + 1
+        position = boundary + 1
+
+
+def iter_log_file(path: str) -> Iterator[LogRecordModel]:
+    """Stream the records of a text or JSONL log file (or gzipped segment), in file order.
+
+    Memory use is one record at a time, whatever the file size.
+    """
+    jsonl = is_jsonl_log_file(path)
+    with open_log_file(path) as f:
+        if jsonl:
+            for line in f:
+                record = parse_log_record(line, jsonl=True)
+                if record is not None:
+                    yield record
+            return
+
+        pending: list[bytes] = []
+        for line in f:
+            if line.startswith(TEXT_RECORD_START) and pending:
+                record = parse_log_record(b"".join(pending), jsonl=False)
+                if record is not None:
+                    yield record
+                pending.clear()
+            if pending or line.startswith(TEXT_RECORD_START):
+                pending.append(line)
+        if pending:
+            record = parse_log_record(b"".join(pending), jsonl=False)
+            if record is not None:
+                yield record
+
+
+def extract_index_fields(data: bytes, jsonl: bool) -> tuple[float, int, str, int] | None:
+    """(created, levelno, logger name, pid) of a record, without building a LogRecordModel."""
+    if jsonl:
+        try:
+            payload = json.loads(data)
+            return payload["created"], payload["levelno"], payload["name"], payload["process"]
+        except (ValueError, TypeError, KeyError):
+            return None
+    match = _TEXT_DETAILS_BYTES_PATTERN.search(data)
+    if match is None:
+        return None
+    name = match["location"].decode("utf-8", errors="replace").rpartition(".")[0]
+    levelno = get_levelno(match["levelname"].decode("utf-8", errors="replace"))
+    return parse_asctime(match["asctime"].decode("ascii")), levelno, name, int(match["process"])
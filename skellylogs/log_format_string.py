@@ -1,18 +1,24 @@
 LOG_POINTER_STRING = "└>>"
-LOG_FORMAT_STRING_WO_PID_TID = LOG_POINTER_STRING + (
-    " %(message)s | "
+
+# Building blocks, so the shared record renderer can assemble the plain and
+# colored lines from one set of pre-formatted pieces.
+LOG_DETAILS_FORMAT_STRING = (
     " %(levelname)s | "
     " %(delta_t)s | "
     " %(name)s.%(funcName)s():%(lineno)s | "
     " %(asctime)s | "
 )
+LOG_PID_FORMAT_STRING = "PID:%(process)d:%(processName)s"
+LOG_TID_FORMAT_STRING = "TID:%(thread)d:%(threadName)s"
+
+LOG_FORMAT_STRING_WO_PID_TID = LOG_POINTER_STRING + " %(message)s | " + LOG_DETAILS_FORMAT_STRING
 
 LOG_FORMAT_STRING = LOG_FORMAT_STRING_WO_PID_TID + (
-    " PID:%(process)d:%(processName)s | "
-    " TID:%(thread)d:%(threadName)s"
+    " " + LOG_PID_FORMAT_STRING + " | "
+    " " + LOG_TID_FORMAT_STRING
 )
 
 COLOR_LOG_FORMAT_STRING = LOG_FORMAT_STRING_WO_PID_TID + (
-    " %(pid_color)sPID:%(process)d:%(processName)s\033[0m | "
-    " %(tid_color)sTID:%(thread)d:%(threadName)s\033[0m"
+    " %(pid_color)s" + LOG_PID_FORMAT_STRING + "\033[0m | "
+    " %(tid_color)s" + LOG_TID_FORMAT_STRING + "\033[0m"
 )
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+from skellylogs.default_paths import JSONL_LOG_FILE_EXTENSION, LOG_INDEX_SUFFIX, LOG_SESSION_NAME_PATTERN
+from skellylogs.handlers.rotating_file_handler import COMPRESSED_SEGMENT_SUFFIX, MANIFEST_SUFFIX, compress_log_segment
+
+logger = logging.getLogger(__name__)
+
+UNCOMPRESSED_LOG_FILE_SUFFIXES = (".log", JSONL_LOG_FILE_EXTENSION)
+# Everything a session writes next to its stem: the .log/.jsonl files, their
+# rotated (and gzipped) segments, manifests and query indexes
+_SESSION_FILE_SUFFIX_PATTERN = (
+    rf"(?:\.\d{{3,}})?(?:{'|'.join(map(re.escape, UNCOMPRESSED_LOG_FILE_SUFFIXES))})"
+    rf"(?:{re.escape(COMPRESSED_SEGMENT_SUFFIX)}|{re.escape(MANIFEST_SUFFIX)}|{re.escape(LOG_INDEX_SUFFIX)})?"
+    rf"|{re.escape(MANIFEST_SUFFIX)}"
+)
+# Sizes and mtimes of compressed segments (which never change) are remembered between runs
+RETENTION_INDEX_FILE_NAME = ".skellylogs_retention_index.json"
+
+
+@dataclass
+class LogRetentionPolicy:
+    """Limits for a log folder. Each limit is optional; None means unlimited.
+
+    Attributes:
+        max_total_bytes: Total size of all log files in the folder.
+        max_age: Seconds since a session was last written to.
+        max_files: Number of log files in the folder.
+        compress: When over max_total_bytes, gzip the oldest sessions'
+            uncompressed files before deleting anything.
+    """
+
+    max_total_bytes: int | None = None
+    max_age: float | None = None
+    max_files: int | None = None
+    compress: bool = True
+
+
+@dataclass
+class LogRetentionReport:
+    scanned_files: int = 0
+    deleted_sessions: list[str] = field(default_factory=list)
+    deleted_files: int = 0
+    deleted_bytes: int = 0
+    compressed_files: int = 0
+    compression_saved_bytes: int = 0
+
+
+@dataclass
+class _LogSession:
+    name: str
+    files: dict[str, int] = field(default_factory=dict)  # path -> size in bytes
+    last_modified: float = 0.0
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.files.values())
+
+
+def get_log_session_name(file_name: str) -> str:
+    """`log_<timestamp>.002.log.gz` -> `log_<timestamp>`: every file a run writes shares its stem."""
+    return file_name.split(".", 1)[0]
+
+
+def _session_file_pattern(active_session: str | None) -> re.Pattern:
+    """Matches the files of skellylogs sessions (log_<timestamp>), and of the active session.
+
+    Retention only ever considers these, so other files in a shared log
+    folder (build.log, server.jsonl, ...) are never compressed or deleted.
+    """
+    session_pattern = LOG_SESSION_NAME_PATTERN
+    if active_session is not None:
+        session_pattern += "|" + re.escape(active_session)
+    return re.compile(rf"(?P<session>{session_pattern})(?:{_SESSION_FILE_SUFFIX_PATTERN})")
+
+
+def _load_index(index_path: str) -> dict:
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index_path: str, index: dict) -> None:
+    temporary_path = index_path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(temporary_path, index_path)
+
+
+def _scan_log_folder(
+    log_folder: str, report: LogRetentionReport, active_session: str | None = None
+) -> dict[str, _LogSession]:
+    """Group the folder's session files into sessions in one os.scandir pass.
+
+    scandir gets names and file types without a syscall per file. Compressed
+    segments are immutable, so their size and mtime come from the retention
+    index (matched by inode) instead of a fresh stat; only new files and the
+    still-growing .log/manifest files are stat'ed.
+    """
+    index_path = os.path.join(log_folder, RETENTION_INDEX_FILE_NAME)
+    previous_index = _load_index(index_path)
+    index = {}
+    sessions: dict[str, _LogSession] = {}
+    session_file_pattern = _session_file_pattern(active_session)
+    with os.scandir(log_folder) as entries:
+        for entry in entries:
+            name = entry.name
+            match = session_file_pattern.fullmatch(name)
+            if match is None or not entry.is_file(follow_symlinks=False):
+                continue
+            inode = entry.inode()
+            cached = previous_index.get(name)
+            if cached is not None and cached[0] == inode:
+                size, modified = cached[1], cached[2]
+            else:
+                stat = entry.stat(follow_symlinks=False)
+                size, modified = stat.st_size, stat.st_mtime
+            if name.endswith(COMPRESSED_SEGMENT_SUFFIX):
+                index[name] = [inode, size, modified]
+
+            session_name = match.group("session")
+            session = sessions.get(session_name)
+            if session is None:
+                session = sessions[session_name] = _LogSession(name=session_name)
+            session.files[entry.path] = size
+            session.last_modified = max(session.last_modified, modified)
+            report.scanned_files += 1
+
+    if index != previous_index:
+        try:
+            _save_index(index_path, index)
+        except OSError:
+            pass  # The index is only a cache
+    return sessions
+
+
+def _compress_session(session: _LogSession, report: LogRetentionReport) -> int:
+    """Gzip a session's uncompressed .log/.jsonl files; return the bytes saved."""
+    saved = 0
+    for path, size in list(session.files.items()):
+        if not path.endswith(UNCOMPRESSED_LOG_FILE_SUFFIXES):
+            continue
+        try:
+            compressed_path = compress_log_segment(path)
+            compressed_size = os.path.getsize(compressed_path)
+        except OSError:
+            continue
+        del session.files[path]
+        session.files[compressed_path] = compressed_size
+        saved += size - compressed_size
+        report.compressed_files += 1
+    report.compression_saved_bytes += saved
+    return saved
+
+
+def _delete_session(session: _LogSession, report: LogRetentionReport) -> None:
+    for path, size in session.files.items():
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        report.deleted_files += 1
+        report.deleted_bytes += size
+    report.deleted_sessions.append(session.name)
+
+
+def enforce_log_retention(
+    log_folder: str,
+    policy: LogRetentionPolicy,
+    active_log_file: str | None = None,
+) -> LogRetentionReport:
+    """Apply `policy` to `log_folder`, oldest sessions first.
+
+    Sessions past max_age are deleted. Then, while the folder is over
+    max_total_bytes, the oldest sessions are compressed (if policy.compress)
+    and, if that isn't enough, deleted, until every limit is met. The
+    session that `active_log_file` belongs to is never touched.
+    """
+    report = LogRetentionReport()
+    active_session = None if active_log_file is None else get_log_session_name(os.path.basename(active_log_file))
+    sessions = _scan_log_folder(log_folder, report, active_session=active_session)
+    total_bytes = sum(session.total_bytes for session in sessions.values())
+    total_files = report.scanned_files
+    if active_session is not None:
+        # The active session counts towards the limits, but is never removed
+        sessions.pop(active_session, None)
+
+    candidates = sorted(sessions.values(), key=lambda session: session.last_modified)
+    now = time.time()
+
+    def over_quota() -> bool:
+        return (policy.max_total_bytes is not None and total_bytes > policy.max_total_bytes) or (
+            policy.max_files is not None and total_files > policy.max_files
+        )
+
+    remaining = []
+    for session in candidates:
+        if policy.max_age is not None and now - session.last_modified > policy.max_age:
+            total_bytes -= session.total_bytes
+            total_files -= len(session.files)
+            _delete_session(session, report)
+        else:
+            remaining.append(session)
+
+    if policy.compress and policy.max_total_bytes is not None:
+        for session in remaining:
+            if total_bytes <= policy.max_total_bytes:
+                break
+            total_bytes -= _compress_session(session, report)
+
+    for session in remaining:
+        if not over_quota():
+            break
+        total_bytes -= session.total_bytes
+        total_files -= len(session.files)
+        _delete_session(session, report)
+
+    return report
+
+
+def start_log_retention(
+    log_folder: str,
+    policy: LogRetentionPolicy,
+    active_log_file: str | None = None,
+) -> threading.Thread:
+    """Run enforce_log_retention on a daemon thread, so startup never waits on it."""
+
+    def run() -> None:
+        try:
+            report = enforce_log_retention(log_folder, policy, active_log_file=active_log_file)
+        except OSError as error:
+            logger.warning(f"Log retention for {log_folder} failed: {error}")
+            return
+        if report.deleted_sessions or report.compressed_files:
+            logger.debug(
+                f"Log retention: deleted {len(report.deleted_sessions)} sessions "
+                f"({report.deleted_bytes / 1e6:.1f} MB), compressed {report.compressed_files} files "
+                f"(saved {report.compression_saved_bytes / 1e6:.1f} MB)"
+            )
+
+    thread = threading.Thread(target=run, name="skellylogs-log-retention", daemon=True)
+    thread.start()
+    return thread
@@ -1,15 +1,40 @@
 from __future__ import annotations
 
 import logging
+import sys
 from logging.config import dictConfig
-from multiprocessing import Queue
-from skellylogs.filters.delta_time import DeltaTimeFilter
+from typing import TYPE_CHECKING, Mapping
+
+from skellylogs.filters.callsite_rate_limit import CallsiteRateLimitFilter
+from skellylogs.filters.delta_time import DELTA_TIME_MODE_GLOBAL
 from skellylogs.filters.stringify_traceback import StringifyTracebackFilter
-from skellylogs.handlers.colored_console import ColoredConsoleHandler
-from skellylogs.handlers.websocket_log_queue_handler import WebSocketQueueHandler
+from skellylogs.formatters.custom_formatter import CustomFormatter
+from skellylogs.formatters.record_renderer import set_delta_time_mode
+from skellylogs.handlers.background_listener import (
+    MAX_BACKGROUND_LOG_QUEUE_SIZE,
+    start_background_log_listener,
+    stop_background_log_listener,
+)
+from skellylogs.handlers.buffered_file_handler import DEFAULT_FILE_BUFFER_SIZE, BufferedFileHandler
+from skellylogs.handlers.handler_stats import instrument_handler, reset_logging_stats
+from skellylogs.handlers.websocket_log_queue_options import (
+    DEFAULT_WEBSOCKET_BATCH_INTERVAL,
+    DEFAULT_WEBSOCKET_BATCH_SIZE,
+    OVERFLOW_POLICY_DROP_NEWEST,
+    PAYLOAD_FORMAT_DICT,
+)
 from skellylogs.log_format_string import LOG_FORMAT_STRING
 from skellylogs.log_levels import LogLevels
 
+if TYPE_CHECKING:
+    from multiprocessing import Queue
+
+    from skellylogs.load_shedding import LoadSheddingPolicy
+
+# The handler classes are imported by the _build_* methods that use them, so
+# a child process (which only builds a ChildProcessLogHandler) doesn't import
+# the console, rotation, JSON Lines and websocket stacks at startup.
+
 
 class LoggerBuilder:
 
@@ -17,46 +42,208 @@ class LoggerBuilder:
         self,
         level: LogLevels,
         queue: Queue | None,
-        log_file_path: str,
+        log_file_path: str | None,
+        background_listener: bool = False,
+        background_queue_size: int = MAX_BACKGROUND_LOG_QUEUE_SIZE,
+        aggregation_queue: Queue | None = None,
+        ws_batch_size: int = DEFAULT_WEBSOCKET_BATCH_SIZE,
+        ws_batch_interval: float = DEFAULT_WEBSOCKET_BATCH_INTERVAL,
+        ws_overflow_policy: str = OVERFLOW_POLICY_DROP_NEWEST,
+        ws_payload_format: str = PAYLOAD_FORMAT_DICT,
+        rate_limits: Mapping[LogLevels | int, float] | None = None,
+        file_buffer_size: int = DEFAULT_FILE_BUFFER_SIZE,
+        file_max_bytes: int | None = None,
+        file_rotate_interval: float | None = None,
+        jsonl_file_path: str | None = None,
+        collect_stats: bool = False,
+        delta_t_mode: str = DELTA_TIME_MODE_GLOBAL,
+        flight_recorder_size: int | None = None,
+        flight_recorder_seconds: float | None = None,
+        flight_recorder_level: LogLevels = LogLevels.TRACE,
+        load_shedding: LoadSheddingPolicy | None = None,
     ) -> None:
         self.level = level
         self.queue = queue
         self.log_file_path = log_file_path
+        self.aggregation_queue = aggregation_queue
+        self.ws_batch_size = ws_batch_size
+        self.ws_batch_interval = ws_batch_interval
+        self.ws_overflow_policy = ws_overflow_policy
+        self.ws_payload_format = ws_payload_format
+        self.rate_limits = rate_limits
+        self.file_buffer_size = file_buffer_size
+        self.file_max_bytes = file_max_bytes
+        self.file_rotate_interval = file_rotate_interval
+        self.jsonl_file_path = jsonl_file_path
+        self.collect_stats = collect_stats
+        self.delta_t_mode = delta_t_mode
+        self.flight_recorder_size = flight_recorder_size
+        self.flight_recorder_seconds = flight_recorder_seconds
+        self.flight_recorder_level = flight_recorder_level
+        self.load_shedding = load_shedding
+        self.background_listener = background_listener
+        self.background_queue_size = background_queue_size
+        # Drain the previous listener into its handlers before dictConfig closes them
+        stop_background_log_listener()
         dictConfig({"version": 1, "disable_existing_loggers": False})
 
     def _configure_root_logger(self) -> None:
         root = logging.getLogger()
-        root.setLevel(self.level.value)
+        set_delta_time_mode(self.delta_t_mode)
+        root.setLevel(self._root_level())
         # Stringify live traceback objects before any handler sees the record,
         # to avoid pickling errors when sending to the frontend
         root.addFilter(StringifyTracebackFilter())
 
-        # Clear existing handlers
+        # Clear existing handlers (and the listener thread and load shedding
+        # controller that watched them, if any)
+        # Not imported unless a controller was ever started
+        load_shedding = sys.modules.get("skellylogs.load_shedding")
+        if load_shedding is not None:
+            load_shedding.stop_load_shedding()
+        stop_background_log_listener()
         for handler in root.handlers[:]:
             root.removeHandler(handler)
 
-        # Add handlers
-        root.addHandler(self._build_file_handler())
+        named_handlers = self._build_handlers()
+        handlers = list(named_handlers.values())
+        rate_limit_filter = self._build_rate_limit_filter()
+        reset_logging_stats()
+        if self.background_listener:
+            # The calling thread only enqueues; the listener thread runs the real handlers
+            listener = start_background_log_listener(handlers=handlers, max_queue_size=self.background_queue_size)
+            root.addHandler(listener.enqueue_handler)
+            # Suppress on the calling thread, before the record costs a queue slot
+            handlers = [listener.enqueue_handler]
+            named_handlers["enqueue"] = listener.enqueue_handler
+        else:
+            for handler in handlers:
+                root.addHandler(handler)
+
+        if rate_limit_filter is not None:
+            # Root logger filters don't see propagated records, so filter at the
+            # handlers. One shared instance: the verdict is made once per record.
+            for handler in handlers:
+                handler.addFilter(rate_limit_filter)
+
+        if self.collect_stats or self.load_shedding is not None:
+            # Load shedding watches emit times and queue-full drops through the stats
+            for name, handler in named_handlers.items():
+                instrument_handler(handler, name)
+
+        if self.load_shedding is not None:
+            from skellylogs.load_shedding import start_load_shedding
+
+            start_load_shedding(self.load_shedding, handlers=named_handlers, filtered_handlers=handlers)
+
+    @property
+    def flight_recorder_enabled(self) -> bool:
+        # Child processes ship everything at `level` to the parent, whose recorder covers them
+        return self.aggregation_queue is None and (
+            self.flight_recorder_size is not None or self.flight_recorder_seconds is not None
+        )
+
+    def _root_level(self) -> int:
+        # The recorder needs the records below `level` to reach the handlers at all
+        if self.flight_recorder_enabled:
+            return min(self.level.value, self.flight_recorder_level.value)
+        return self.level.value
+
+    def _build_handlers(self) -> dict[str, logging.Handler]:
+        """The handlers to install, by name (the names get_logging_stats() reports)."""
+        if self.aggregation_queue is not None:
+            # Child process: the parent's LogAggregator owns every sink
+            return {"child_process": self._build_child_process_handler()}
+
+        handlers = {"file": self._build_file_handler()}
+
+        if self.jsonl_file_path:
+            handlers["jsonl"] = self._build_jsonl_file_handler()
 
         if self.queue:
-            root.addHandler(self._build_websocket_handler())
+            handlers["websocket"] = self._build_websocket_handler()
+
+        handlers["console"] = self._build_console_handler()
+
+        if self.flight_recorder_enabled:
+            # First, so a dump lands in the sinks before the ERROR that triggered it
+            sinks = [handlers[name] for name in ("file", "jsonl", "websocket") if name in handlers]
+            handlers = {"flight_recorder": self._build_flight_recorder_handler(sinks), **handlers}
+        return handlers
 
-        root.addHandler(self._build_console_handler())
+    def _build_rate_limit_filter(self) -> CallsiteRateLimitFilter | None:
+        if self.rate_limits is None:
+            return None
+        return CallsiteRateLimitFilter(rate_limits=self.rate_limits)
 
     def _build_console_handler(self) -> logging.Handler:
+        from skellylogs.handlers.colored_console import ColoredConsoleHandler
+
         handler = ColoredConsoleHandler()
         handler.setLevel(self.level.value)
         return handler
 
     def _build_file_handler(self) -> logging.Handler:
-        handler = logging.FileHandler(self.log_file_path, encoding="utf-8")
-        handler.setFormatter(logging.Formatter(LOG_FORMAT_STRING))
-        handler.addFilter(DeltaTimeFilter())
-        handler.setLevel(LogLevels.TRACE.value)
+        handler = self._create_file_sink(self.log_file_path)
+        handler.setFormatter(CustomFormatter(LOG_FORMAT_STRING))
+        return handler
+
+    def _build_jsonl_file_handler(self) -> logging.Handler:
+        from skellylogs.formatters.json_lines_formatter import JsonLinesFormatter
+
+        handler = self._create_file_sink(self.jsonl_file_path)
+        handler.setFormatter(JsonLinesFormatter())
+        return handler
+
+    def _create_file_sink(self, path: str) -> BufferedFileHandler:
+        if self.file_max_bytes or self.file_rotate_interval:
+            from skellylogs.handlers.rotating_file_handler import RotatingLogFileHandler
+
+            handler = RotatingLogFileHandler(
+                path,
+                max_bytes=self.file_max_bytes,
+                rotate_interval=self.file_rotate_interval,
+                encoding="utf-8",
+                buffer_size=self.file_buffer_size,
+            )
+        else:
+            handler = BufferedFileHandler(path, encoding="utf-8", buffer_size=self.file_buffer_size)
+        file_level = LogLevels.TRACE.value
+        if self.flight_recorder_enabled:
+            # The root logger now passes records below `level` (the root level
+            # used to filter them); the file only gets those in a dump
+            file_level = max(self.level.value, file_level)
+        handler.setLevel(file_level)
         return handler
 
     def _build_websocket_handler(self) -> logging.Handler:
-        handler = WebSocketQueueHandler(self.queue)
+        from skellylogs.handlers.websocket_log_queue_handler import WebSocketQueueHandler
+
+        handler = WebSocketQueueHandler(
+            self.queue,
+            batch_size=self.ws_batch_size,
+            batch_interval=self.ws_batch_interval,
+            overflow_policy=self.ws_overflow_policy,
+            payload_format=self.ws_payload_format,
+        )
+        handler.setLevel(self.level.value)
+        return handler
+
+    def _build_flight_recorder_handler(self, targets: list[logging.Handler]) -> logging.Handler:
+        from skellylogs.handlers.flight_recorder import DEFAULT_FLIGHT_RECORDER_CAPACITY, FlightRecorderHandler
+
+        handler = FlightRecorderHandler(
+            targets,
+            capacity=self.flight_recorder_size or DEFAULT_FLIGHT_RECORDER_CAPACITY,
+            max_age=self.flight_recorder_seconds,
+        )
+        handler.setLevel(self.flight_recorder_level.value)
+        return handler
+
+    def _build_child_process_handler(self) -> logging.Handler:
+        from skellylogs.handlers.process_log_aggregator import ChildProcessLogHandler
+
+        handler = ChildProcessLogHandler(self.aggregation_queue)
         handler.setLevel(self.level.value)
         return handler
 
@@ -1,3 +1,6 @@
+import functools
+
+
 def ensure_min_brightness(value: int, threshold=100):
     """Ensure the RGB value is above a certain threshold."""
     return max(value, threshold)
@@ -27,8 +30,13 @@ def ensure_not_red(r: int, g: int, b: int, threshold_diff: int = 100):
     return r, g, b
 
 
+@functools.lru_cache(maxsize=1024)
 def get_hashed_color(value: int):
-    """Generate a consistent random color for the given value."""
+    """Generate a consistent random color for the given value.
+
+    Memoized: PIDs and TIDs repeat on every record, and the result only
+    depends on the value.
+    """
     # Use modulo to ensure it's within the range of normal terminal colors.
     hashed = hash(value) % 0xFFFFFF  # Keep within RGB 24-bit color
     red = ensure_min_brightness(hashed >> 16 & 255)
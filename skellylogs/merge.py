@@ -0,0 +1,109 @@
+"""Merge several log files into one time-ordered stream.
+
+    python -m skellylogs.merge ~/skellylogs_data/logs/log_a*.log ~/skellylogs_data/logs/log_b*.log -o merged.log
+
+Each input (a per-process log, a rotated segment, a gzipped segment, text or
+JSON Lines) is streamed record by record, and a heap picks the earliest
+pending record across inputs, so memory use is one record per input
+whatever the file sizes.
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import sys
+import time
+from typing import Iterable, Iterator, TextIO
+
+from skellylogs.handlers.websocket_log_queue_handler import (
+    PAYLOAD_FORMAT_COMPACT,
+    PAYLOAD_FORMAT_DICT,
+    PAYLOAD_FORMATS,
+    LogRecordModel,
+)
+from skellylogs.log_file_reader import iter_log_file
+
+MERGE_OUTPUT_FORMATS = ("text", "jsonl")
+
+
+def _created(record: LogRecordModel) -> float:
+    return record.created
+
+
+def merge_log_records(streams: Iterable[Iterable[LogRecordModel]]) -> Iterator[LogRecordModel]:
+    """k-way merge of record streams on `created`.
+
+    Each stream must already be in time order, as a log file is. Records
+    with the same `created` keep the order of their streams.
+    """
+    return heapq.merge(*streams, key=_created)
+
+
+def merge_log_files(log_file_paths: Iterable[str]) -> Iterator[LogRecordModel]:
+    """Stream the records of several text/JSONL log files (or gzipped segments) in time order."""
+    return merge_log_records(iter_log_file(path) for path in log_file_paths)
+
+
+def write_log_records(records: Iterable[LogRecordModel], stream: TextIO, output_format: str = "text") -> int:
+    """Write records as text log lines or JSON Lines; return the number written."""
+    if output_format not in MERGE_OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format!r} (expected one of {MERGE_OUTPUT_FORMATS})")
+    count = 0
+    for record in records:
+        stream.write((record.model_dump_json() if output_format == "jsonl" else record.formatted_message) + "\n")
+        count += 1
+    return count
+
+
+def replay_log_records(
+    records: Iterable[LogRecordModel],
+    queue,
+    payload_format: str = PAYLOAD_FORMAT_DICT,
+    speed: float | None = None,
+) -> int:
+    """Put records on a websocket log queue, as WebSocketQueueHandler would have.
+
+    Consumers of get_websocket_log_queue() see the replay exactly like live
+    logs. Unlike the live handler, replay blocks when the queue is full
+    instead of dropping. `speed` paces the replay against the records'
+    timestamps (1.0 = real time, 10.0 = ten times faster); None sends as
+    fast as the queue accepts. Returns the number of records sent.
+    """
+    if payload_format not in PAYLOAD_FORMATS:
+        raise ValueError(f"Unknown payload format: {payload_format!r} (expected one of {PAYLOAD_FORMATS})")
+    count = 0
+    first_created = None
+    replay_started = time.monotonic()
+    for record in records:
+        if speed is not None:
+            if first_created is None:
+                first_created = record.created
+            delay = (record.created - first_created) / speed - (time.monotonic() - replay_started)
+            if delay > 0:
+                time.sleep(delay)
+        queue.put(record.to_bytes() if payload_format == PAYLOAD_FORMAT_COMPACT else record.model_dump())
+        count += 1
+    return count
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m skellylogs.merge",
+        description="Merge skellylogs text (.log) or JSON Lines (.jsonl) files into one time-ordered stream.",
+    )
+    parser.add_argument("log_files", nargs="+", help="log files or gzipped segments, in any order")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=MERGE_OUTPUT_FORMATS, default="text", help="output format")
+    args = parser.parse_args(argv)
+
+    records = merge_log_files(args.log_files)
+    if args.output is None:
+        write_log_records(records, sys.stdout, output_format=args.format)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            write_log_records(records, f, output_format=args.format)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import logging
 
 DEFAULT_NOISY_PACKAGES: dict[str, int] = {
@@ -0,0 +1,298 @@
+"""Query skellylogs log files through a sidecar index.
+
+    python -m skellylogs.query ~/skellylogs_data/logs/log_<timestamp>.log --level ERROR --pid 12345 \\
+        --since 2025-02-20T14:30:00 --until 2025-02-20T14:35:00
+
+The first query on a file builds `<file>.idx.json` next to it; later queries
+only index what was appended since.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+from datetime import datetime
+from typing import Iterable, Iterator, Sequence
+
+from skellylogs.default_paths import LOG_INDEX_SUFFIX
+from skellylogs.handlers.rotating_file_handler import COMPRESSED_SEGMENT_SUFFIX
+from skellylogs.handlers.websocket_log_queue_handler import LogRecordModel
+from skellylogs.log_file_reader import (
+    extract_index_fields,
+    get_levelno,
+    is_jsonl_log_file,
+    iter_log_file,
+    iter_record_spans,
+    parse_log_record,
+)
+
+LOG_INDEX_VERSION = 1
+DEFAULT_INDEX_BLOCK_SIZE = 64 * 1024  # bytes of records summarized by one index block
+_INDEX_HEAD_SIZE = 4096  # bytes hashed to recognize a file that was replaced or truncated
+
+# Positions in an index block
+_START, _END, _MIN_CREATED, _MAX_CREATED, _LEVELNOS, _NAME_IDS, _PIDS = range(7)
+
+
+class LogQuery:
+    """Which records to return. Every criterion is optional.
+
+    Logger names match themselves and their children ("myapp" matches
+    "myapp.camera"). Times are epoch seconds.
+    """
+
+    def __init__(
+        self,
+        min_level: int | None = None,
+        loggers: Sequence[str] | None = None,
+        pids: Sequence[int] | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ):
+        self.min_level = min_level
+        self.loggers = tuple(loggers) if loggers else None
+        self.pids = frozenset(pids) if pids else None
+        self.since = since
+        self.until = until
+
+    def matches_logger(self, name: str) -> bool:
+        return self.loggers is None or any(name == logger or name.startswith(logger + ".") for logger in self.loggers)
+
+    def matches(self, created: float, levelno: int, name: str, pid: int) -> bool:
+        return (
+            (self.min_level is None or levelno >= self.min_level)
+            and (self.since is None or created >= self.since)
+            and (self.until is None or created <= self.until)
+            and (self.pids is None or pid in self.pids)
+            and self.matches_logger(name)
+        )
+
+
+class LogFileIndex:
+    """Block-range index over one text or JSONL log file.
+
+    The file is split into blocks of about `block_size` bytes of whole
+    records. For each block, the index keeps its byte range, its time range
+    (min/max `created`), and the levels, logger names and PIDs that occur in
+    it. A query mmaps the file and parses only the blocks whose summary can
+    match, so "ERRORs from PID X between t1 and t2" touches a few blocks of
+    a multi-GB file instead of all of it.
+
+    The index is saved as `<file>.idx.json`. update() resumes from the last
+    (possibly partial) block, so a growing file only costs the new bytes.
+    The last record is never indexed (a traceback may still be appended to
+    it); queries scan the unindexed tail directly. If the start of the file
+    changes (rotated or replaced), the index is rebuilt.
+    """
+
+    def __init__(self, log_file_path: str, block_size: int = DEFAULT_INDEX_BLOCK_SIZE):
+        self.log_file_path = log_file_path
+        self.index_path = log_file_path + LOG_INDEX_SUFFIX
+        self.jsonl = is_jsonl_log_file(log_file_path)
+        self.block_size = block_size
+        self._reset()
+
+    def _reset(self) -> None:
+        self.indexed_until = 0
+        self.head_size = 0
+        self.head_digest = ""
+        self.names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+        self.blocks: list[list] = []
+
+    @classmethod
+    def open(cls, log_file_path: str, block_size: int = DEFAULT_INDEX_BLOCK_SIZE) -> LogFileIndex:
+        """Load the sidecar index (if any), bring it up to date and save it."""
+        index = cls(log_file_path, block_size=block_size)
+        index.load()
+        if index.update():
+            index.save()
+        return index
+
+    def load(self) -> None:
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != LOG_INDEX_VERSION or data.get("block_size") != self.block_size:
+            return
+        self.indexed_until = data["indexed_until"]
+        self.head_size = data["head_size"]
+        self.head_digest = data["head_digest"]
+        self.names = data["names"]
+        self._name_ids = {name: i for i, name in enumerate(self.names)}
+        self.blocks = data["blocks"]
+
+    def save(self) -> None:
+        data = {
+            "version": LOG_INDEX_VERSION,
+            "block_size": self.block_size,
+            "indexed_until": self.indexed_until,
+            "head_size": self.head_size,
+            "head_digest": self.head_digest,
+            "names": self.names,
+            "blocks": self.blocks,
+        }
+        temporary_path = self.index_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temporary_path, self.index_path)
+
+    def update(self) -> int:
+        """Index whatever was appended since the last update; return the number of records added."""
+        with open(self.log_file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                self._reset()
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if size < self.indexed_until or self._digest(buffer, self.head_size) != self.head_digest:
+                    self._reset()
+                if self.blocks:
+                    # The last block may have been partial; re-index it along with the new bytes
+                    resume_from = self.blocks.pop()[_START]
+                else:
+                    resume_from = 0
+                added = self._index_range(buffer, resume_from, size)
+                self.head_size = min(size, _INDEX_HEAD_SIZE)
+                self.head_digest = self._digest(buffer, self.head_size)
+        return added
+
+    @staticmethod
+    def _digest(buffer, head_size: int) -> str:
+        return hashlib.sha1(buffer[:head_size]).hexdigest()
+
+    def _index_range(self, buffer, start: int, end: int) -> int:
+        added = 0
+        block = None
+        previous_span = None
+        spans = iter_record_spans(buffer, start, end, jsonl=self.jsonl)
+        for span in spans:
+            if previous_span is not None:
+                block = self._add_record(block, buffer, previous_span)
+                added += 1
+            previous_span = span
+        if block is not None:
+            self.blocks.append(block)
+        # Leave the last record out: it may still be growing
+        self.indexed_until = previous_span[0] if previous_span is not None else start
+        return added
+
+    def _add_record(self, block: list | None, buffer, span: tuple[int, int]) -> list:
+        record_start, record_end = span
+        if block is None:
+            block = [record_start, record_start, None, None, [], [], []]
+        block[_END] = record_end
+        fields = extract_index_fields(buffer[record_start:record_end], jsonl=self.jsonl)
+        if fields is not None:
+            created, levelno, name, pid = fields
+            if block[_MIN_CREATED] is None or created < block[_MIN_CREATED]:
+                block[_MIN_CREATED] = created
+            if block[_MAX_CREATED] is None or created > block[_MAX_CREATED]:
+                block[_MAX_CREATED] = created
+            name_id = self._name_ids.get(name)
+            if name_id is None:
+                name_id = self._name_ids[name] = len(self.names)
+                self.names.append(name)
+            for position, value in ((_LEVELNOS, levelno), (_NAME_IDS, name_id), (_PIDS, pid)):
+                if value not in block[position]:
+                    block[position].append(value)
+        if record_end - block[_START] >= self.block_size:
+            self.blocks.append(block)
+            return None
+        return block
+
+    def _block_may_match(self, block: list, query: LogQuery) -> bool:
+        if block[_MIN_CREATED] is None:
+            return True  # Only unparseable records; let the scan decide
+        if query.since is not None and block[_MAX_CREATED] < query.since:
+            return False
+        if query.until is not None and block[_MIN_CREATED] > query.until:
+            return False
+        if query.min_level is not None and max(block[_LEVELNOS]) < query.min_level:
+            return False
+        if query.pids is not None and query.pids.isdisjoint(block[_PIDS]):
+            return False
+        if query.loggers is not None and not any(query.matches_logger(self.names[i]) for i in block[_NAME_IDS]):
+            return False
+        return True
+
+    def query(self, query: LogQuery) -> Iterator[LogRecordModel]:
+        """Yield matching records in file order."""
+        with open(self.log_file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for block in self.blocks:
+                    if self._block_may_match(block, query):
+                        yield from self._scan(buffer, block[_START], block[_END], query)
+                yield from self._scan(buffer, self.indexed_until, size, query)
+
+    def _scan(self, buffer, start: int, end: int, query: LogQuery) -> Iterator[LogRecordModel]:
+        for record_start, record_end in iter_record_spans(buffer, start, end, jsonl=self.jsonl):
+            data = buffer[record_start:record_end]
+            fields = extract_index_fields(data, jsonl=self.jsonl)
+            if fields is None or not query.matches(*fields):
+                continue
+            record = parse_log_record(data, jsonl=self.jsonl)
+            if record is not None:
+                yield record
+
+
+def query_log_file(log_file_path: str, query: LogQuery) -> Iterator[LogRecordModel]:
+    """Query one log file, through its index; gzipped segments are streamed instead."""
+    if log_file_path.endswith(COMPRESSED_SEGMENT_SUFFIX):
+        for record in iter_log_file(log_file_path):
+            if query.matches(record.created, record.levelno, record.name, record.process):
+                yield record
+        return
+    yield from LogFileIndex.open(log_file_path).query(query)
+
+
+def _parse_time(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _parse_level(value: str) -> int:
+    return int(value) if value.isdigit() else get_levelno(value.upper())
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m skellylogs.query",
+        description="Query skellylogs text (.log) or JSON Lines (.jsonl) files through a sidecar index.",
+    )
+    parser.add_argument("log_files", nargs="+", help="log files or gzipped segments, queried in the given order")
+    parser.add_argument("--level", type=_parse_level, help="minimum level, by name (ERROR, TRACE, ...) or number")
+    parser.add_argument("--logger", action="append", help="logger name, including its children (repeatable)")
+    parser.add_argument("--pid", type=int, action="append", help="process id (repeatable)")
+    parser.add_argument("--since", type=_parse_time, help="ISO-8601 local time or epoch seconds")
+    parser.add_argument("--until", type=_parse_time, help="ISO-8601 local time or epoch seconds")
+    parser.add_argument("--format", choices=("text", "jsonl"), default="text", help="output format")
+    parser.add_argument("--count", action="store_true", help="print the number of matching records only")
+    args = parser.parse_args(argv)
+
+    query = LogQuery(min_level=args.level, loggers=args.logger, pids=args.pid, since=args.since, until=args.until)
+    count = 0
+    for log_file_path in args.log_files:
+        for record in query_log_file(log_file_path, query):
+            count += 1
+            if not args.count:
+                sys.stdout.write(
+                    (record.model_dump_json() if args.format == "jsonl" else record.formatted_message) + "\n"
+                )
+    if args.count:
+        print(count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
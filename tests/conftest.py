@@ -6,7 +6,11 @@ import tempfile
 
 import pytest
 
+import skellylogs.handlers.background_listener as listener_mod
+import skellylogs.handlers.handler_stats as stats_mod
+import skellylogs.handlers.process_log_aggregator as aggregator_mod
 import skellylogs.handlers.websocket_log_queue_handler as ws_mod
+import skellylogs.load_shedding as load_shedding_mod
 
 
 @pytest.fixture(autouse=True)
@@ -15,8 +19,16 @@ def _reset_logging_state() -> None:
 
     This prevents state leakage between tests — configure_logging
     modifies global state (root logger handlers/filters, the module-level
-    WEBSOCKET_LOG_QUEUE singleton) that must be cleaned up.
+    WEBSOCKET_LOG_QUEUE singleton, the background listener, log
+    aggregator, stats reporter and load shedding threads) that must be
+    cleaned up.
     """
+    load_shedding_mod.stop_load_shedding()
+    listener_mod.stop_background_log_listener()
+    aggregator_mod.stop_log_aggregator()
+    stats_mod.stop_logging_stats_reporter()
+    stats_mod.reset_logging_stats()
+
     root = logging.getLogger()
     for handler in root.handlers[:]:
         root.removeHandler(handler)
@@ -0,0 +1,116 @@
+"""Tests for the benchmark suite (tiny record counts: structure, not speed)."""
+
+import json
+import logging
+import os
+import tempfile
+
+import pytest
+
+from skellylogs.benchmark import (
+    BENCHMARK_HANDLERS,
+    BenchmarkCase,
+    _build_logger,
+    _close_logger,
+    _log_records,
+    compare_benchmark_results,
+    default_benchmark_cases,
+    main,
+    run_benchmark_case,
+    run_benchmarks,
+)
+
+RESULT_KEYS = {
+    "case", "handler", "level", "enabled", "threads", "processes", "records", "ns_per_record",
+    "records_per_sec", "p50_ns", "p99_ns", "allocated_blocks_per_record", "peak_traced_kib",
+}
+
+
+def test_default_cases_cover_every_handler_enabled_and_disabled() -> None:
+    cases = default_benchmark_cases(threads=4, processes=2)
+
+    assert {case.handler for case in cases} == set(BENCHMARK_HANDLERS)
+    assert {(case.enabled, case.level) for case in cases if case.handler == "file"} >= {
+        (True, "trace"), (True, "info"), (False, "trace"),
+    }
+    assert any(case.threads == 4 for case in cases)
+    assert any(case.processes == 2 for case in cases)
+    assert len({case.name for case in cases}) == len(cases)
+
+
+def test_rejects_unknown_handler() -> None:
+    with pytest.raises(ValueError):
+        BenchmarkCase("carrier_pigeon", "trace")
+
+
+@pytest.mark.parametrize("handler", sorted(BENCHMARK_HANDLERS))
+def test_runs_every_handler(handler: str) -> None:
+    result = run_benchmark_case(BenchmarkCase(handler, "trace"), records=50)
+
+    assert set(result) == RESULT_KEYS
+    assert result["records"] == 50
+    assert result["ns_per_record"] > 0 and result["records_per_sec"] > 0
+    assert result["p50_ns"] <= result["p99_ns"]
+
+
+def test_logs_through_the_level_method(tmp_path) -> None:
+    records: list[logging.LogRecord] = []
+    logger, handlers = _build_logger(BenchmarkCase("file", "trace"), str(tmp_path))
+    collector = logging.Handler()
+    collector.emit = records.append
+    logger.addHandler(collector)
+    try:
+        _log_records(logger, "trace", 3)
+    finally:
+        logger.removeHandler(collector)
+        _close_logger(logger, handlers)
+
+    assert [record.levelname for record in records] == ["TRACE"] * 3
+    assert {record.funcName for record in records} == {"_log_records"}
+
+
+def test_runs_across_threads_and_processes() -> None:
+    threaded = run_benchmark_case(BenchmarkCase("file", "trace", threads=3), records=50)
+    assert threaded["records"] == 150
+
+    multiprocess = run_benchmark_case(BenchmarkCase("websocket", "trace", processes=2), records=50)
+    assert multiprocess["records"] == 100
+
+
+def test_compares_against_baseline() -> None:
+    baseline = {"results": [{"case": "a", "ns_per_record": 100.0}, {"case": "b", "ns_per_record": 100.0}]}
+    current = {"results": [{"case": "a", "ns_per_record": 150.0}, {"case": "b", "ns_per_record": 95.0},
+                           {"case": "new", "ns_per_record": 1.0}]}
+
+    comparisons = compare_benchmark_results(baseline, current, threshold=0.10)
+
+    assert [(c["case"], c["regression"]) for c in comparisons] == [("a", True), ("b", False)]
+    assert comparisons[0]["change"] == pytest.approx(0.5)
+
+
+def test_cli_writes_results_and_flags_regressions(capsys: pytest.CaptureFixture) -> None:
+    folder = tempfile.mkdtemp()
+    output = os.path.join(folder, "bench.json")
+    arguments = ["--records", "20", "--handler", "null", "--threads", "1", "--processes", "1"]
+
+    assert main([*arguments, "-o", output]) == 0
+    with open(output, encoding="utf-8") as f:
+        results = json.load(f)
+    assert [r["case"] for r in results["results"]] == ["null/trace/enabled", "null/info/enabled", "null/trace/disabled"]
+
+    # A baseline 1000x faster than anything real: every case regresses
+    for result in results["results"]:
+        result["ns_per_record"] /= 1000
+    baseline = os.path.join(folder, "baseline.json")
+    with open(baseline, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+    assert main([*arguments, "--baseline", baseline]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_run_benchmarks_reports_progress() -> None:
+    seen = []
+    results = run_benchmarks([BenchmarkCase("null", "info", enabled=False)], records=10, progress=seen.append)
+
+    assert results["results"] == seen
+    assert results["records"] == 10
@@ -1,18 +1,31 @@
 """Tests for configure_logging and the full handler pipeline."""
 
+import io
 import logging
+import multiprocessing
 import os
 import tempfile
+import threading
+import time
 import queue as queue_module
 
 import pytest
 
-from skellylogs import configure_logging, LogLevels
+from skellylogs import configure_logging, LogLevels, get_background_log_listener, get_logging_stats
+from skellylogs.handlers.background_listener import EnqueueHandler
 from skellylogs.handlers.websocket_log_queue_handler import (
     get_websocket_log_queue,
     WebSocketQueueHandler,
 )
+from skellylogs.handlers.buffered_file_handler import BufferedFileHandler
 from skellylogs.handlers.colored_console import ColoredConsoleHandler
+from skellylogs.lazy_message import LazyMessage
+
+
+def _flush_root_handlers() -> None:
+    """Write out anything the buffered file handler is still holding."""
+    for handler in logging.getLogger().handlers:
+        handler.flush()
 
 
 def test_configure_logging_creates_handlers(log_file_path: str) -> None:
@@ -21,7 +34,7 @@ def test_configure_logging_creates_handlers(log_file_path: str) -> None:
 
     handler_types = {type(h) for h in root.handlers}
     assert ColoredConsoleHandler in handler_types
-    assert logging.FileHandler in handler_types
+    assert BufferedFileHandler in handler_types
     assert WebSocketQueueHandler in handler_types
 
 
@@ -35,6 +48,7 @@ def test_configure_logging_writes_to_file(log_file_path: str) -> None:
     configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path)
     logger = logging.getLogger("test_file_write")
     logger.info("hello file")
+    _flush_root_handlers()
 
     assert os.path.exists(log_file_path)
     with open(log_file_path) as f:
@@ -50,6 +64,7 @@ def test_configure_logging_writes_all_custom_levels_to_file(log_file_path: str)
     logger.trace("trace msg")
     logger.success("success msg")
     logger.api("api msg")
+    _flush_root_handlers()
 
     with open(log_file_path) as f:
         content = f.read()
@@ -74,6 +89,56 @@ def test_custom_log_methods_registered_on_logger(log_file_path: str) -> None:
     assert callable(logger.api)
 
 
+def test_custom_log_methods_follow_level_changes(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path)
+    logger = logging.getLogger("test_level_cache")
+    logger.setLevel(logging.INFO)
+    logger.trace("dropped while INFO")
+
+    logger.setLevel(LogLevels.TRACE.value)
+    logger.trace("kept after setLevel")
+    logging.disable(LogLevels.TRACE.value)
+    try:
+        logger.trace("dropped while disabled")
+    finally:
+        logging.disable(logging.NOTSET)
+    _flush_root_handlers()
+
+    with open(log_file_path) as f:
+        content = f.read()
+    assert "kept after setLevel" in content
+    assert "dropped" not in content
+
+
+def test_custom_log_methods_report_the_caller(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.TRACE, log_file_path=log_file_path)
+    logging.getLogger("test_caller").trace("where am I")
+    _flush_root_handlers()
+
+    with open(log_file_path) as f:
+        assert "test_custom_log_methods_report_the_caller()" in f.read()
+
+
+def test_lazy_message_is_rendered_only_when_enabled(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path)
+    logger = logging.getLogger("test_lazy")
+    logger.setLevel(logging.INFO)
+    calls = []
+
+    def describe() -> str:
+        calls.append(1)
+        return "expensive description"
+
+    logger.loop(LazyMessage(describe))
+    assert calls == []
+
+    logger.warning(LazyMessage(describe))
+    _flush_root_handlers()
+    assert calls == [1]  # once, although the file, websocket and console handlers all used it
+    with open(log_file_path) as f:
+        assert "expensive description" in f.read()
+
+
 def test_custom_level_names_registered() -> None:
     configure_logging(level=LogLevels.DEBUG, log_file_path=os.path.join(tempfile.mkdtemp(), "t.log"))
 
@@ -90,7 +155,8 @@ def test_websocket_queue_receives_log_records(log_file_path: str) -> None:
     logger = logging.getLogger("test_ws_queue")
     logger.info("ws test message")
 
-    record = queue.get_nowait()
+    # The multiprocessing.Queue feeder thread writes to the pipe asynchronously
+    record = queue.get(timeout=2)
     assert isinstance(record, dict)
     assert record["levelname"] == "INFO"
     assert record["message"] == "ws test message"
@@ -135,7 +201,7 @@ def test_configure_logging_with_explicit_queue(log_file_path: str) -> None:
     logger = logging.getLogger("test_explicit_queue")
     logger.info("explicit queue msg")
 
-    record = q.get_nowait()
+    record = q.get(timeout=2)
     assert record["message"] == "explicit queue msg"
 
 
@@ -146,3 +212,322 @@ def test_file_handler_level_is_trace(log_file_path: str) -> None:
     file_handlers = [h for h in root.handlers if isinstance(h, logging.FileHandler)]
     assert len(file_handlers) == 1
     assert file_handlers[0].level == LogLevels.TRACE.value
+
+
+def test_background_listener_mode_only_enqueues_on_root(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, background_listener=True)
+    root = logging.getLogger()
+
+    assert [type(h) for h in root.handlers] == [EnqueueHandler]
+    assert get_background_log_listener().is_running
+
+
+def test_background_listener_mode_writes_to_file_after_stop(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, background_listener=True)
+    logger = logging.getLogger("test_background_file")
+    logger.info("hello from the background")
+
+    get_background_log_listener().stop()
+
+    with open(log_file_path) as f:
+        assert "hello from the background" in f.read()
+
+
+def test_reconfigure_stops_previous_background_listener(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, background_listener=True)
+    first_listener = get_background_log_listener()
+
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path)
+
+    assert not first_listener.is_running
+    with pytest.raises(ValueError, match="not started yet"):
+        get_background_log_listener()
+
+
+def test_reconfigure_writes_every_queued_background_record(log_file_path: str) -> None:
+    # A thread queue: nothing reads the websocket queue here, and a full
+    # multiprocessing.Queue would hold interpreter exit on its feeder thread
+    ws_queue = queue_module.Queue()
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, ws_queue=ws_queue, background_listener=True)
+    logger = logging.getLogger("test_background_reconfigure")
+    for i in range(5000):
+        logger.debug("queued line %d", i)
+
+    # dictConfig closes the old handlers; the listener must drain into them first
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, ws_queue=ws_queue, background_listener=True)
+    get_background_log_listener().stop()
+
+    with open(log_file_path) as f:
+        assert sum("queued line" in line for line in f) == 5000
+
+
+def _aggregated_child_worker(aggregation_queue) -> None:
+    configure_logging(level=LogLevels.DEBUG, aggregation_queue=aggregation_queue)
+    logging.getLogger("test_aggregated_child").info("hello from the child process")
+
+
+def test_child_process_logs_reach_parent_file(log_file_path: str) -> None:
+    import multiprocessing
+    from skellylogs import get_log_aggregation_queue
+    from skellylogs.handlers.process_log_aggregator import stop_log_aggregator
+
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, aggregate_child_processes=True)
+
+    process = multiprocessing.Process(target=_aggregated_child_worker, args=(get_log_aggregation_queue(),))
+    process.start()
+    process.join(timeout=30)
+    stop_log_aggregator()
+    _flush_root_handlers()
+
+    with open(log_file_path) as f:
+        content = f.read()
+    assert "hello from the child process" in content
+    assert f"PID:{process.pid}:" in content
+
+
+def _file_logging_child_worker(ws_queue, log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, ws_queue=ws_queue, log_file_path=log_file_path)
+    for i in range(20):
+        logging.getLogger("test_child_file").info("child line %d", i)
+
+
+def _inherited_logging_child_worker() -> None:
+    for i in range(20):
+        logging.getLogger("test_child_file").info("child line %d", i)
+
+
+@pytest.mark.parametrize("start_method", [m for m in ("fork", "spawn") if m in multiprocessing.get_all_start_methods()])
+def test_child_process_file_log_is_flushed_at_exit(log_file_path: str, start_method: str) -> None:
+    # multiprocessing children exit with os._exit, which skips atexit
+    context = multiprocessing.get_context(start_method)
+    ws_queue = context.Queue()
+    process = context.Process(target=_file_logging_child_worker, args=(ws_queue, log_file_path))
+    process.start()
+    process.join(timeout=30)
+
+    assert process.exitcode == 0
+    with open(log_file_path) as f:
+        assert sum("child line" in line for line in f) == 20
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_forked_child_writes_through_inherited_file_handler(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, ws_queue=queue_module.Queue())
+    logging.getLogger("test_parent_file").info("parent line")
+
+    process = multiprocessing.get_context("fork").Process(target=_inherited_logging_child_worker)
+    process.start()
+    process.join(timeout=30)
+    _flush_root_handlers()
+
+    with open(log_file_path) as f:
+        content = f.read()
+    assert content.count("child line") == 20
+    # The parent's buffered line is written once, by the parent
+    assert content.count("parent line") == 1
+
+
+def test_child_configuration_installs_only_aggregation_handler() -> None:
+    import multiprocessing
+    from skellylogs.handlers.process_log_aggregator import ChildProcessLogHandler
+
+    configure_logging(level=LogLevels.DEBUG, aggregation_queue=multiprocessing.Queue(maxsize=10))
+
+    assert [type(h) for h in logging.getLogger().handlers] == [ChildProcessLogHandler]
+
+
+def test_file_and_websocket_share_one_rendering(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path)
+    queue = get_websocket_log_queue()
+
+    logging.getLogger("test_shared_rendering").info("rendered once")
+
+    record = queue.get(timeout=2)
+    _flush_root_handlers()
+    with open(log_file_path, encoding="utf-8") as f:
+        file_line = f.read().strip()
+    assert file_line == record["formatted_message"]
+
+
+def test_shared_memory_transport_is_selectable(log_file_path: str) -> None:
+    from skellylogs.handlers.shared_memory_log_ring import SharedMemoryLogRing
+    from skellylogs.handlers.websocket_log_queue_handler import get_log_records
+
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, ws_transport="shared_memory")
+    ring = get_websocket_log_queue()
+    assert isinstance(ring, SharedMemoryLogRing)
+
+    logging.getLogger("test_shm_transport").info("via shared memory")
+
+    records = get_log_records(ring, timeout=2)
+    assert [r.message for r in records] == ["via shared memory"]
+
+
+def test_unknown_transport_raises(log_file_path: str) -> None:
+    with pytest.raises(ValueError, match="Unknown websocket log transport"):
+        configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, ws_transport="carrier_pigeon")
+
+
+def test_rate_limits_collapse_loop_records(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.TRACE, log_file_path=log_file_path, rate_limits={LogLevels.TRACE: 2})
+    logger = logging.getLogger("test_rate_limits")
+    for i in range(50):
+        logger.trace(f"frame {i}")
+    logger.info("not rate limited")
+    _flush_root_handlers()
+
+    with open(log_file_path, encoding="utf-8") as f:
+        content = f.read()
+    assert content.count("frame ") == 2
+    assert "not rate limited" in content
+    ws_records = []
+    queue = get_websocket_log_queue()
+    while len(ws_records) < 3:
+        ws_records.append(queue.get(timeout=2))
+    assert [r["message"] for r in ws_records] == ["frame 0", "frame 1", "not rate limited"]
+
+
+def test_file_buffer_size_is_configurable(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, file_buffer_size=0)
+    [file_handler] = [h for h in logging.getLogger().handlers if isinstance(h, BufferedFileHandler)]
+    assert file_handler.buffer_size == 0
+
+    logging.getLogger("test_file_buffer_size").info("written straight away")
+    with open(log_file_path, encoding="utf-8") as f:
+        assert "written straight away" in f.read()
+
+
+def test_file_rotation_is_configurable(log_file_path: str) -> None:
+    from skellylogs.handlers.rotating_file_handler import RotatingLogFileHandler
+
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, file_max_bytes=1024 * 1024)
+    [file_handler] = [h for h in logging.getLogger().handlers if isinstance(h, BufferedFileHandler)]
+    assert isinstance(file_handler, RotatingLogFileHandler)
+    assert file_handler.max_bytes == 1024 * 1024
+    file_handler.close()
+
+
+def test_log_retention_cleans_the_log_folder(log_file_path: str) -> None:
+    import threading
+    from skellylogs import LogRetentionPolicy
+
+    old_log = os.path.join(os.path.dirname(log_file_path), "log_2025-01-01T00_00_00ms000_gmt+0.log")
+    with open(old_log, "w") as f:
+        f.write("old session")
+    os.utime(old_log, (0, 0))
+
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, log_retention=LogRetentionPolicy(max_age=60))
+    for thread in threading.enumerate():
+        if thread.name == "skellylogs-log-retention":
+            thread.join(timeout=5)
+
+    assert not os.path.exists(old_log)
+    assert os.path.exists(log_file_path)
+
+
+def test_jsonl_log_writes_structured_records(log_file_path: str) -> None:
+    import json
+
+    configure_logging(level=LogLevels.TRACE, log_file_path=log_file_path, jsonl_log=True)
+    logger = logging.getLogger("test_jsonl")
+    logger.trace("structured trace")
+    logger.info("structured info")
+    _flush_root_handlers()
+
+    with open(log_file_path[:-len(".log")] + ".jsonl", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [(r["levelname"], r["message"]) for r in records] == [("TRACE", "structured trace"), ("INFO", "structured info")]
+    assert all(r["name"] == "test_jsonl" for r in records)
+
+
+def test_collect_stats_instruments_every_handler(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, collect_stats=True)
+    logging.getLogger("test_stats").info("counted")
+
+    stats = get_logging_stats()
+    assert set(stats) == {"file", "websocket", "console"}
+    assert all(handler_stats["records_by_level"] == {"INFO": 1} for handler_stats in stats.values())
+
+
+def test_stats_are_off_by_default(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path)
+    logging.getLogger("test_stats").info("not counted")
+    assert get_logging_stats() == {}
+
+
+def test_stats_interval_logs_periodic_summaries(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, background_listener=True, stats_interval=0.05)
+    logging.getLogger("test_stats").info("counted")
+    time.sleep(0.3)
+    get_background_log_listener().stop()
+
+    assert "enqueue" in get_logging_stats()
+    with open(log_file_path, encoding="utf-8") as f:
+        assert "Logging stats for the last" in f.read()
+
+
+def test_delta_t_mode_is_configurable(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, delta_t_mode="thread")
+    logger = logging.getLogger("test_delta_mode")
+    worker = threading.Thread(target=logger.info, args=("first from worker",))
+    logger.info("main")
+    time.sleep(0.05)
+    worker.start()
+    worker.join()
+    _flush_root_handlers()
+
+    with open(log_file_path) as f:
+        worker_line = next(line for line in f if "first from worker" in line)
+    # Measured from the worker's own (nonexistent) previous record, not from "main" 50ms ago
+    assert "|  0.000ms |" in worker_line
+
+
+def test_background_listener_measures_delta_t_from_the_call(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.DEBUG, log_file_path=log_file_path, background_listener=True)
+    logger = logging.getLogger("test_delta_background")
+    logger.info("first")
+    time.sleep(0.05)
+    logger.info("second")
+    get_background_log_listener().stop()
+
+    with open(log_file_path) as f:
+        second_line = next(line for line in f if "second" in line)
+    delta_ms = float(second_line.split("|")[2].strip()[:-len("ms")])
+    assert delta_ms >= 40.0
+
+
+def test_flight_recorder_dumps_trace_context_before_the_error(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.INFO, log_file_path=log_file_path, flight_recorder_size=100)
+    logger = logging.getLogger("test_flight_recorder")
+    logger.trace("context before the failure")
+    logger.info("regular info")
+    _flush_root_handlers()
+    with open(log_file_path) as f:
+        assert "context before the failure" not in f.read()
+
+    logger.error("the failure")
+    _flush_root_handlers()
+    with open(log_file_path) as f:
+        content = f.read()
+    assert content.index("regular info") < content.index("Flight recorder: 1 records")
+    assert content.index("Flight recorder: 1 records") < content.index("context before the failure")
+    assert content.index("context before the failure") < content.index("the failure |")
+
+    ws_queue = get_websocket_log_queue()
+    messages = [ws_queue.get(timeout=2)["message"] for _ in range(4)]
+    assert messages[0] == "regular info"
+    assert messages[1].startswith("Flight recorder: 1 records")
+    assert messages[2:] == ["context before the failure", "the failure"]
+
+
+def test_flight_recorder_keeps_console_quiet(log_file_path: str) -> None:
+    configure_logging(level=LogLevels.INFO, log_file_path=log_file_path, flight_recorder_seconds=30)
+    console = next(h for h in logging.getLogger().handlers if isinstance(h, ColoredConsoleHandler))
+    console.setStream(io.StringIO())
+    logger = logging.getLogger("test_flight_recorder")
+    logger.trace("trace only for the recorder")
+    logger.error("the failure")
+    out = console.stream.getvalue()
+    assert "trace only for the recorder" not in out
+    assert "the failure" in out
+    assert logging.getLogger().level == LogLevels.TRACE.value
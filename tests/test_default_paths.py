@@ -4,7 +4,7 @@ import os
 import re
 from pathlib import Path
 
-from skellylogs.default_paths import get_log_file_path
+from skellylogs.default_paths import get_jsonl_file_path, get_log_file_path
 
 
 def test_get_log_file_path_returns_string() -> None:
@@ -48,3 +48,9 @@ def test_get_log_file_path_is_filename_friendly() -> None:
     # Remove the .log extension for checking
     stem = filename[:-4]
     assert ":" not in stem
+
+
+def test_get_jsonl_file_path_sits_next_to_the_log_file() -> None:
+    path = get_log_file_path()
+    jsonl_path = get_jsonl_file_path(path)
+    assert jsonl_path == path[:-len(".log")] + ".jsonl"
@@ -4,7 +4,11 @@ import logging
 import time
 import traceback
 
-from skellylogs.filters.delta_time import DeltaTimeFilter
+import pytest
+
+from skellylogs.filters.callsite_rate_limit import CallsiteRateLimitFilter
+from skellylogs.filters.delta_time import DELTA_TIME_MODE_LOGGER, DELTA_TIME_MODE_THREAD, DeltaTimeFilter
+from skellylogs.filters.sampling import SamplingFilter
 from skellylogs.filters.stringify_traceback import StringifyTracebackFilter
 
 
@@ -49,6 +53,42 @@ class TestDeltaTimeFilter:
             )
             assert filt.filter(record) is True
 
+    def test_uses_the_callers_timestamp_when_stamped(self) -> None:
+        filt = DeltaTimeFilter()
+        record = _make_delta_record()
+        record.perf_counter_ns = filt.prev_time_ns + 2_500_000
+        filt.filter(record)
+        assert record.delta_t == "2.500ms"
+
+    def test_thread_mode_measures_each_thread_separately(self) -> None:
+        filt = DeltaTimeFilter(mode=DELTA_TIME_MODE_THREAD)
+        records = []
+        for thread, offset_ms in ((1, 0), (2, 1), (1, 10), (2, 15)):
+            record = _make_delta_record()
+            record.thread = thread
+            record.perf_counter_ns = 1_000_000_000 + offset_ms * 1_000_000
+            filt.filter(record)
+            records.append(record.delta_t)
+        assert records == ["0.000ms", "0.000ms", "10.000ms", "14.000ms"]
+
+    def test_logger_mode_measures_each_logger_separately(self) -> None:
+        filt = DeltaTimeFilter(mode=DELTA_TIME_MODE_LOGGER)
+        records = []
+        for name, offset_ms in (("cam0", 0), ("cam1", 3), ("cam0", 5)):
+            record = _make_delta_record(name=name)
+            record.perf_counter_ns = 1_000_000_000 + offset_ms * 1_000_000
+            filt.filter(record)
+            records.append(record.delta_t)
+        assert records == ["0.000ms", "0.000ms", "5.000ms"]
+
+    def test_rejects_unknown_mode(self) -> None:
+        with pytest.raises(ValueError):
+            DeltaTimeFilter(mode="per-camera")
+
+
+def _make_delta_record(name: str = "test") -> logging.LogRecord:
+    return logging.LogRecord(name=name, level=logging.INFO, pathname="", lineno=0, msg="m", args=(), exc_info=None)
+
 
 class TestStringifyTracebackFilter:
     def test_converts_exc_info_to_exc_text(self) -> None:
@@ -99,3 +139,98 @@ class TestStringifyTracebackFilter:
         result = filt.filter(record)
         assert result is True
         assert record.exc_text is None
+
+
+def _make_loop_record(msg: str, created: float, lineno: int = 10, level: int = 3) -> logging.LogRecord:
+    record = logging.LogRecord(
+        name="test", level=level, pathname="camera.py", lineno=lineno,
+        msg=msg, args=(), exc_info=None,
+    )
+    record.created = created
+    return record
+
+
+class TestCallsiteRateLimitFilter:
+    def test_levels_without_budget_always_pass(self) -> None:
+        filt = CallsiteRateLimitFilter(rate_limits={3: 1})
+        for i in range(100):
+            assert filt.filter(_make_loop_record(f"info {i}", created=1000.0, level=logging.INFO))
+        assert filt.suppressed_count == 0
+
+    def test_suppresses_beyond_budget(self) -> None:
+        filt = CallsiteRateLimitFilter(rate_limits={3: 5})
+        passed = [filt.filter(_make_loop_record(f"frame {i}", created=1000.0 + i * 0.001)) for i in range(100)]
+        assert sum(passed) == 5
+        assert filt.suppressed_count == 95
+
+    def test_budget_is_per_callsite(self) -> None:
+        filt = CallsiteRateLimitFilter(rate_limits={3: 1})
+        assert filt.filter(_make_loop_record("a", created=1000.0, lineno=1))
+        assert filt.filter(_make_loop_record("b", created=1000.0, lineno=2))
+        assert not filt.filter(_make_loop_record("c", created=1000.0, lineno=1))
+
+    def test_next_passed_record_carries_repeat_summary(self) -> None:
+        filt = CallsiteRateLimitFilter(rate_limits={3: 1})
+        filt.filter(_make_loop_record("frame 0", created=1000.0))
+        for i in range(1, 11):
+            filt.filter(_make_loop_record(f"frame {i}", created=1000.0 + i * 0.05))
+
+        record = _make_loop_record("frame 99", created=1002.0)
+        assert filt.filter(record)
+        assert record.repeat_count == 10
+        assert record.repeat_span == pytest.approx(0.45)
+        assert record.getMessage() == "frame 99 (+10 suppressed over 0.450s)"
+
+    def test_collapses_duplicate_messages_within_budget(self) -> None:
+        filt = CallsiteRateLimitFilter(rate_limits={3: 1000}, dedup_window=1.0)
+        passed = [filt.filter(_make_loop_record("same", created=1000.0 + i * 0.01)) for i in range(50)]
+        assert sum(passed) == 1
+
+        record = _make_loop_record("same", created=1001.5)
+        assert filt.filter(record)
+        assert record.repeat_count == 49
+
+    def test_verdict_is_made_once_per_record(self) -> None:
+        filt = CallsiteRateLimitFilter(rate_limits={3: 1})
+        record = _make_loop_record("frame", created=1000.0)
+        assert filt.filter(record)
+        # A second handler sharing the filter sees the same verdict, without spending budget
+        assert filt.filter(record)
+        assert filt.filter(_make_loop_record("other", created=1001.0))
+
+
+class TestSamplingFilter:
+    def test_keeps_one_in_sample_every_below_level(self) -> None:
+        filt = SamplingFilter(below_level=logging.DEBUG, sample_every=10)
+        passed = [filt.filter(_make_loop_record(f"frame {i}", created=1000.0)) for i in range(100)]
+        assert sum(passed) == 10
+        assert passed[0] and not any(passed[1:10])
+        assert filt.dropped_count == 90
+
+    def test_records_at_or_above_level_always_pass(self) -> None:
+        filt = SamplingFilter(below_level=logging.DEBUG, sample_every=10)
+        for i in range(20):
+            assert filt.filter(_make_loop_record(f"debug {i}", created=1000.0, level=logging.DEBUG))
+        assert filt.dropped_count == 0
+
+    def test_verdict_is_made_once_per_record(self) -> None:
+        filt = SamplingFilter(below_level=logging.DEBUG, sample_every=2)
+        kept = _make_loop_record("kept", created=1000.0)
+        dropped = _make_loop_record("dropped", created=1000.0)
+        assert filt.filter(kept)
+        assert not filt.filter(dropped)
+        # A second handler sharing the filter sees the same verdicts
+        assert filt.filter(kept)
+        assert not filt.filter(dropped)
+        assert filt.dropped_count == 1
+
+    def test_drop_all_drops_everything_below_level(self) -> None:
+        filt = SamplingFilter(below_level=logging.DEBUG, sample_every=10)
+        filt.drop_all = True
+        assert not any(filt.filter(_make_loop_record(f"frame {i}", created=1000.0)) for i in range(20))
+        assert filt.filter(_make_loop_record("debug", created=1000.0, level=logging.DEBUG))
+        assert filt.dropped_count == 20
+
+    def test_rejects_sample_every_below_one(self) -> None:
+        with pytest.raises(ValueError):
+            SamplingFilter(below_level=logging.DEBUG, sample_every=0)
@@ -1,10 +1,19 @@
 """Tests for logging formatters."""
 
 import logging
+import time
 
 from skellylogs.formatters.custom_formatter import CustomFormatter
-from skellylogs.formatters.color_formatter import ColorFormatter, LOG_COLOR_CODES
-from skellylogs.log_format_string import LOG_FORMAT_STRING, COLOR_LOG_FORMAT_STRING
+from skellylogs.formatters.color_formatter import (
+    ColorFormatter,
+    LEVEL_PREFIX_TEMPLATES,
+    LOG_COLOR_CODES,
+    _colored_id_fragment,
+)
+from skellylogs.formatters.json_lines_formatter import JsonLinesFormatter
+from skellylogs.formatters.record_renderer import render_record
+from skellylogs.log_format_string import LOG_FORMAT_STRING, COLOR_LOG_FORMAT_STRING, LOG_POINTER_STRING
+from skellylogs.logging_color_helpers import get_hashed_color
 
 
 def _make_record(msg: str = "test message", level: int = logging.INFO) -> logging.LogRecord:
@@ -74,3 +83,133 @@ class TestColorFormatter:
         output = fmt.format(record)
         assert "ValueError" in output
         assert "test exception" in output
+
+
+class TestRecordRenderer:
+    def test_matches_plain_log_format_string(self) -> None:
+        fmt = CustomFormatter(format_string=LOG_FORMAT_STRING)
+        record = _make_record("hello %s", level=logging.WARNING)
+        record.args = ("world",)
+        expected = logging.Formatter.format(fmt, _make_record_copy(record))
+
+        assert render_record(record) == expected
+
+    def test_includes_exception_text(self) -> None:
+        try:
+            raise ValueError("rendered exception")
+        except ValueError:
+            import sys
+            exc_info = sys.exc_info()
+
+        record = _make_record("error occurred", level=logging.ERROR)
+        record.exc_info = exc_info
+        output = render_record(record)
+
+        assert output.startswith("└>> error occurred | ")
+        assert "\nTraceback" in output
+        assert "ValueError: rendered exception" in output
+
+    def test_renders_once_and_caches_on_record(self) -> None:
+        record = _make_record()
+        first = render_record(record)
+        record.msg = "changed after rendering"
+        assert render_record(record) is first
+
+    def test_computes_delta_t_when_missing(self) -> None:
+        record = logging.LogRecord(
+            name="test_logger", level=logging.INFO, pathname="test.py", lineno=42,
+            msg="no delta yet", args=(), exc_info=None,
+        )
+        render_record(record)
+        assert record.delta_t.endswith("ms")
+
+    def test_plain_and_color_formatters_share_rendering(self) -> None:
+        record = _make_record("shared")
+        plain = CustomFormatter(format_string=LOG_FORMAT_STRING).format(record)
+        colored = ColorFormatter(format_string=COLOR_LOG_FORMAT_STRING).format(record)
+
+        assert record.formatted_message is plain
+        assert record.formatted_details in colored
+        assert record.asctime in colored
+
+    def test_color_formatter_matches_generic_path(self) -> None:
+        fmt = ColorFormatter(format_string=COLOR_LOG_FORMAT_STRING)
+        record = _make_record("same output either way")
+        expected = fmt._format_custom_string(_make_record_copy(record))
+
+        assert fmt.format(record) == expected
+
+
+def _make_record_copy(record: logging.LogRecord) -> logging.LogRecord:
+    return logging.makeLogRecord(dict(record.__dict__))
+
+
+class TestColorFormatterFastPath:
+    def test_every_level_has_precompiled_template(self) -> None:
+        assert set(LEVEL_PREFIX_TEMPLATES) == set(LOG_COLOR_CODES)
+
+    def test_unknown_level_is_uncolored(self) -> None:
+        fmt = ColorFormatter(format_string=COLOR_LOG_FORMAT_STRING)
+        record = _make_record("custom level", level=17)
+        output = fmt.format(record)
+        assert output.startswith(f"{LOG_POINTER_STRING}\033[0m custom level")
+
+    def test_pid_and_tid_fragments_are_memoized(self) -> None:
+        fmt = ColorFormatter(format_string=COLOR_LOG_FORMAT_STRING)
+        first = _make_record("first")
+        second = _make_record("second")
+        fmt.format(first)
+        fmt.format(second)
+
+        fragment = _colored_id_fragment(first.process, first.formatted_pid)
+        assert fragment is _colored_id_fragment(second.process, second.formatted_pid)
+        assert fragment == f"{get_hashed_color(first.process)}{first.formatted_pid}\033[0m"
+
+    def test_costs_about_the_same_as_plain_logging_formatter(self) -> None:
+        """Micro-benchmark: colored console formatting vs. a stock logging.Formatter.
+
+        The bound is generous so it holds on noisy CI runners; the fast path
+        measures at roughly 1x, the old copy-and-replace path at ~2-3x.
+        """
+        plain = logging.Formatter(LOG_FORMAT_STRING)
+        colored = ColorFormatter(format_string=COLOR_LOG_FORMAT_STRING)
+        count = 2000
+
+        def best_of(formatter: logging.Formatter, rounds: int = 5) -> float:
+            timings = []
+            for _ in range(rounds):
+                records = [_make_record("frame %d grabbed") for _ in range(count)]
+                for i, record in enumerate(records):
+                    record.args = (i,)
+                start = time.perf_counter()
+                for record in records:
+                    formatter.format(record)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        assert best_of(colored) < 2.0 * best_of(plain)
+
+
+class TestJsonLinesFormatter:
+    def test_formats_one_compact_json_line_with_model_fields(self) -> None:
+        import json
+        from skellylogs.handlers.websocket_log_queue_handler import LOG_RECORD_MODEL_FIELDS
+
+        line = JsonLinesFormatter().format(_make_record("multi\nline message"))
+
+        assert "\n" not in line
+        assert ", " not in line and ": " not in line.replace("multi\\nline", "")
+        data = json.loads(line)
+        assert tuple(data) == LOG_RECORD_MODEL_FIELDS
+        assert data["message"] == "multi\nline message"
+        assert data["levelname"] == "INFO"
+        assert data["delta_t"].endswith("ms")
+
+    def test_shares_rendering_with_text_formatter(self) -> None:
+        import json
+
+        record = _make_record("shared")
+        text_line = CustomFormatter(LOG_FORMAT_STRING).format(record)
+        data = json.loads(JsonLinesFormatter().format(record))
+
+        assert data["formatted_message"] == text_line
@@ -2,21 +2,47 @@
 
 from __future__ import annotations
 
+import asyncio
 import io
 import json
 import logging
 import multiprocessing
 import queue as queue_module
+import socket
+import sys
+import time
 
 import pytest
 
 from skellylogs.handlers.websocket_log_queue_handler import (
     WebSocketQueueHandler,
     LogRecordModel,
+    LOG_RECORD_BATCH_MESSAGE_TYPE,
+    LOG_RECORD_MODEL_FIELDS,
+    get_log_records,
+    unpack_log_payload,
     MAX_WEBSOCKET_LOG_QUEUE_SIZE,
     MIN_LOG_LEVEL_FOR_WEBSOCKET,
 )
+from skellylogs.handlers.background_listener import BackgroundLogListener, EnqueueHandler
+from skellylogs.handlers.buffered_file_handler import BufferedFileHandler
 from skellylogs.handlers.colored_console import ColoredConsoleHandler
+from skellylogs.handlers.async_log_stream import stream_log_records
+from skellylogs.handlers.log_fan_out_server import LogFanOutClient, LogFanOutServer, LogSubscription
+from skellylogs.handlers.log_history import LogHistoryStore
+from skellylogs.handlers.flight_recorder import FLIGHT_RECORDER_LOGGER_NAME, FlightRecorderHandler
+from skellylogs.handlers.handler_stats import (
+    LoggingStatsReporter,
+    estimate_histogram_percentile,
+    get_logging_stats,
+    instrument_handler,
+)
+from skellylogs.handlers.process_log_aggregator import ChildProcessLogHandler, LogAggregator
+from skellylogs.handlers.rotating_file_handler import RotatingLogFileHandler, get_manifest_path
+from skellylogs.handlers.priority_log_queue import PriorityLogQueue
+from skellylogs.handlers.shared_memory_log_ring import PayloadTooLarge, SharedMemoryLogRing
+from skellylogs.configure_logging import _register_custom_levels
+from skellylogs.filters.delta_time import DeltaTimeFilter
 from skellylogs.log_levels import LogLevels
 
 # multiprocessing.Queue on Windows uses pipes that may not flush instantly,
@@ -181,3 +207,975 @@ class TestColoredConsoleHandler:
         output = stream.getvalue()
         assert "console test" in output
         assert "\033[" in output  # ANSI codes present
+
+
+class TestBackgroundLogListener:
+    def test_listener_dispatches_to_handlers(self) -> None:
+        stream = io.StringIO()
+        listener = BackgroundLogListener(handlers=[ColoredConsoleHandler(stream=stream)])
+        listener.start()
+        listener.enqueue_handler.handle(_make_record("from the listener thread"))
+        listener.stop()
+
+        assert "from the listener thread" in stream.getvalue()
+
+    def test_listener_respects_handler_level(self) -> None:
+        stream = io.StringIO()
+        console = ColoredConsoleHandler(stream=stream)
+        console.setLevel(logging.WARNING)
+        listener = BackgroundLogListener(handlers=[console])
+        listener.start()
+        listener.enqueue_handler.handle(_make_record("too quiet", level=logging.INFO))
+        listener.enqueue_handler.handle(_make_record("loud enough", level=logging.WARNING))
+        listener.stop()
+
+        output = stream.getvalue()
+        assert "too quiet" not in output
+        assert "loud enough" in output
+
+    def test_stop_drains_backlog(self) -> None:
+        stream = io.StringIO()
+        listener = BackgroundLogListener(handlers=[ColoredConsoleHandler(stream=stream)])
+        # Enqueue before starting so everything is still in the backlog
+        for i in range(50):
+            listener.enqueue_handler.handle(_make_record(f"queued {i}"))
+        assert listener.backlog == 50
+
+        listener.start()
+        listener.stop()
+
+        assert listener.backlog == 0
+        assert "queued 49" in stream.getvalue()
+
+    def test_full_queue_drops_and_counts(self) -> None:
+        listener = BackgroundLogListener(handlers=[], max_queue_size=2)
+        for i in range(5):
+            listener.enqueue_handler.handle(_make_record(f"msg {i}"))
+
+        assert listener.backlog == 2
+        assert listener.dropped_count == 3
+
+
+class TestProcessLogAggregation:
+    def test_child_handler_ships_picklable_payload(self) -> None:
+        q = multiprocessing.Queue(maxsize=10)
+        handler = ChildProcessLogHandler(queue=q)
+
+        record = _make_record("value is %s")
+        record.args = (object(),)  # Unpicklable args must not reach the queue
+        handler.handle(record)
+
+        payload = q.get(timeout=QUEUE_TIMEOUT)
+        assert payload["msg"].startswith("value is <object object")
+        assert payload["name"] == "test_handler"
+        assert "args" not in payload
+
+    def test_child_handler_stringifies_exceptions(self) -> None:
+        q = multiprocessing.Queue(maxsize=10)
+        handler = ChildProcessLogHandler(queue=q)
+        try:
+            raise RuntimeError("child boom")
+        except RuntimeError:
+            import sys
+            exc_info = sys.exc_info()
+
+        handler.handle(_make_record("error", level=logging.ERROR, exc_info=exc_info))
+
+        payload = q.get(timeout=QUEUE_TIMEOUT)
+        assert "RuntimeError: child boom" in payload["exc_text"]
+
+    def test_delta_time_is_measured_from_the_child_call(self) -> None:
+        q = queue_module.Queue()
+        child_handler = ChildProcessLogHandler(queue=q)
+        child_handler.handle(_make_record("first"))
+        time.sleep(0.05)
+        child_handler.handle(_make_record("second"))
+
+        # Replayed back to back, as LogAggregator does after a backlog
+        records = [logging.makeLogRecord(q.get_nowait()) for _ in range(2)]
+        stamps = [record.perf_counter_ns for record in records]
+        EnqueueHandler(queue_module.Queue()).handle(records[1])
+        assert [record.perf_counter_ns for record in records] == stamps
+
+        delta_time_filter = DeltaTimeFilter()
+        for record in records:
+            delta_time_filter.filter(record)
+        assert float(records[1].delta_t.rstrip("ms")) >= 50
+
+    def test_aggregator_replays_records_through_root_handlers_in_order(self) -> None:
+        stream = io.StringIO()
+        root = logging.getLogger()
+        root.setLevel(logging.DEBUG)
+        root.addHandler(ColoredConsoleHandler(stream=stream))
+
+        aggregator = LogAggregator()
+        aggregator.start()
+        child_handler = ChildProcessLogHandler(queue=aggregator.queue)
+        for i in range(20):
+            child_handler.handle(_make_record(f"child record {i:02d}"))
+        aggregator.stop()
+
+        output = stream.getvalue()
+        positions = [output.index(f"child record {i:02d}") for i in range(20)]
+        assert positions == sorted(positions)
+
+
+class TestWebSocketBatching:
+    def test_batches_by_count(self) -> None:
+        q = multiprocessing.Queue(maxsize=100)
+        handler = WebSocketQueueHandler(queue=q, batch_size=3, batch_interval=60)
+        for i in range(3):
+            handler.handle(_make_record(f"batched {i}"))
+
+        payload = q.get(timeout=QUEUE_TIMEOUT)
+        assert payload["message_type"] == LOG_RECORD_BATCH_MESSAGE_TYPE
+        assert [r["message"] for r in payload["records"]] == ["batched 0", "batched 1", "batched 2"]
+        handler.close()
+
+    def test_error_flushes_pending_batch(self) -> None:
+        q = multiprocessing.Queue(maxsize=100)
+        handler = WebSocketQueueHandler(queue=q, batch_size=100, batch_interval=60)
+        handler.handle(_make_record("before the error"))
+        handler.handle(_make_record("the error", level=logging.ERROR))
+
+        payload = q.get(timeout=QUEUE_TIMEOUT)
+        assert [r["message"] for r in payload["records"]] == ["before the error", "the error"]
+        handler.close()
+
+    def test_time_window_flushes_idle_batch(self) -> None:
+        q = multiprocessing.Queue(maxsize=100)
+        handler = WebSocketQueueHandler(queue=q, batch_size=100, batch_interval=0.01)
+        handler.handle(_make_record("lonely record"))
+
+        # No further records arrive; the periodic flusher must send it
+        payload = q.get(timeout=QUEUE_TIMEOUT)
+        assert payload["records"][0]["message"] == "lonely record"
+        handler.close()
+
+    def test_close_flushes_pending_batch(self) -> None:
+        q = multiprocessing.Queue(maxsize=100)
+        handler = WebSocketQueueHandler(queue=q, batch_size=100, batch_interval=60)
+        handler.handle(_make_record("pending at close"))
+        handler.close()
+
+        payload = q.get(timeout=QUEUE_TIMEOUT)
+        assert payload["records"][0]["message"] == "pending at close"
+
+    def test_get_log_records_unpacks_batches_and_single_records(self) -> None:
+        q = multiprocessing.Queue(maxsize=100)
+        single = WebSocketQueueHandler(queue=q)
+        batched = WebSocketQueueHandler(queue=q, batch_size=2, batch_interval=60)
+        single.handle(_make_record("single"))
+        batched.handle(_make_record("batch a"))
+        batched.handle(_make_record("batch b"))
+
+        records: list[LogRecordModel] = []
+        while len(records) < 3:
+            records.extend(get_log_records(q, timeout=QUEUE_TIMEOUT))
+        assert all(isinstance(r, LogRecordModel) for r in records)
+        assert [r.message for r in records] == ["single", "batch a", "batch b"]
+        batched.close()
+
+    def test_get_log_records_raises_empty_on_timeout(self) -> None:
+        with pytest.raises(queue_module.Empty):
+            get_log_records(multiprocessing.Queue(maxsize=1), timeout=0.01)
+
+
+def _put_from_child_process(ring: SharedMemoryLogRing) -> None:
+    for i in range(10):
+        ring.put_nowait({"message": f"child {i}"})
+
+
+class TestSharedMemoryLogRing:
+    @pytest.fixture()
+    def ring(self):
+        ring = SharedMemoryLogRing(slot_count=8, slot_size=512)
+        yield ring
+        ring.unlink()
+
+    def test_round_trips_payloads_in_order(self, ring: SharedMemoryLogRing) -> None:
+        for i in range(5):
+            ring.put_nowait({"message": f"msg {i}"})
+
+        assert ring.qsize() == 5
+        assert [p["message"] for p in ring.drain()] == [f"msg {i}" for i in range(5)]
+        assert ring.empty()
+
+    def test_get_nowait_raises_empty(self, ring: SharedMemoryLogRing) -> None:
+        with pytest.raises(queue_module.Empty):
+            ring.get_nowait()
+
+    def test_get_times_out(self, ring: SharedMemoryLogRing) -> None:
+        with pytest.raises(queue_module.Empty):
+            ring.get(timeout=0.01)
+
+    def test_overwrites_oldest_when_full(self, ring: SharedMemoryLogRing) -> None:
+        for i in range(12):
+            ring.put_nowait({"message": f"msg {i}"})
+
+        assert [p["message"] for p in ring.drain()] == [f"msg {i}" for i in range(4, 12)]
+        assert ring.dropped_count == 4
+
+    def test_rejects_oversized_payloads(self, ring: SharedMemoryLogRing) -> None:
+        with pytest.raises(PayloadTooLarge) as raised:
+            ring.put_nowait({"message": "x" * 1000})
+        assert isinstance(raised.value, queue_module.Full)
+        assert raised.value.max_size < 512
+        assert ring.oversized_count == 1
+        assert ring.empty()
+
+    def test_raw_bytes_skip_pickling(self, ring: SharedMemoryLogRing) -> None:
+        ring.put_nowait(b"already serialized")
+        assert ring.get_nowait() == b"already serialized"
+
+    def test_works_with_websocket_handler_and_get_log_records(self) -> None:
+        ring = SharedMemoryLogRing()
+        handler = WebSocketQueueHandler(queue=ring)
+        for i in range(3):
+            handler.handle(_make_record(f"through the ring {i}"))
+
+        records = get_log_records(ring, timeout=QUEUE_TIMEOUT)
+        assert [r.message for r in records] == [f"through the ring {i}" for i in range(3)]
+        ring.unlink()
+
+    def test_oversized_error_record_arrives_truncated(self) -> None:
+        ring = SharedMemoryLogRing(slot_count=8)
+        handler = WebSocketQueueHandler(queue=ring)
+
+        def fail(step: int) -> None:
+            # Chained exceptions: a long traceback that repeats nothing
+            try:
+                if step == 0:
+                    raise ValueError("root cause")
+                fail(step - 1)
+            except Exception as error:
+                raise RuntimeError(f"deep failure at step {step}") from error
+
+        try:
+            fail(40)
+        except RuntimeError:
+            record = _make_record("camera crashed", level=logging.ERROR, exc_info=sys.exc_info())
+        handler.handle(record)
+
+        records = get_log_records(ring, timeout=QUEUE_TIMEOUT)
+        ring.unlink()
+        assert [r.levelname for r in records] == ["ERROR"]
+        assert "characters truncated" in records[0].exc_info
+        assert records[0].exc_info.rstrip().endswith("RuntimeError: deep failure at step 40")
+        assert records[0].message.startswith("camera crashed")
+        assert handler.dropped_counts == {}
+
+    def test_record_that_cannot_fit_is_counted_as_dropped(self) -> None:
+        ring = SharedMemoryLogRing(slot_count=8, slot_size=64)
+        handler = WebSocketQueueHandler(queue=ring)
+        handler.handle(_make_record("too big for any slot", level=logging.ERROR))
+        ring.unlink()
+        assert handler.dropped_counts == {"ERROR": 1}
+
+    def test_child_process_can_produce(self, ring: SharedMemoryLogRing) -> None:
+        process = multiprocessing.Process(target=_put_from_child_process, args=(ring,))
+        process.start()
+        process.join(timeout=30)
+
+        assert [p["message"] for p in ring.drain()] == [f"child {i}" for i in range(2, 10)]
+
+
+class TestPriorityLanesAndDropAccounting:
+    @pytest.fixture(autouse=True)
+    def _custom_level_names(self) -> None:
+        # dropped_counts is keyed by levelname; without this, TRACE is only
+        # "TRACE" if an earlier test happened to call configure_logging
+        _register_custom_levels()
+
+    def test_priority_queue_routes_by_level_and_prefers_priority_lane(self) -> None:
+        q = PriorityLogQueue(priority_lane_size=5, bulk_lane_size=5)
+        handler = WebSocketQueueHandler(queue=q)
+        handler.handle(_make_record("bulk", level=LogLevels.TRACE.value))
+        handler.handle(_make_record("priority", level=logging.ERROR))
+        time.sleep(0.1)  # Let both lanes' feeder threads flush into their pipes
+
+        first = q.get(timeout=QUEUE_TIMEOUT)
+        second = q.get(timeout=QUEUE_TIMEOUT)
+        assert [first["message"], second["message"]] == ["priority", "bulk"]
+
+    def test_error_survives_trace_flood(self) -> None:
+        q = PriorityLogQueue(priority_lane_size=2, bulk_lane_size=3)
+        handler = WebSocketQueueHandler(queue=q, drop_report_interval=None)
+        for i in range(20):
+            handler.handle(_make_record(f"trace {i}", level=LogLevels.TRACE.value))
+        handler.handle(_make_record("the crash", level=logging.ERROR))
+        time.sleep(0.1)  # Let both lanes' feeder threads flush into their pipes
+
+        assert q.get(timeout=QUEUE_TIMEOUT)["message"] == "the crash"
+        assert handler.dropped_counts == {"TRACE": 17}
+
+    def test_drop_newest_counts_exactly_per_level(self) -> None:
+        q = multiprocessing.Queue(maxsize=1)
+        handler = WebSocketQueueHandler(queue=q, drop_report_interval=None)
+        handler.handle(_make_record("kept"))
+        handler.handle(_make_record("dropped info"))
+        handler.handle(_make_record("dropped warning", level=logging.WARNING))
+        handler.handle(_make_record("dropped info again"))
+
+        assert handler.dropped_counts == {"INFO": 2, "WARNING": 1}
+        assert q.get(timeout=QUEUE_TIMEOUT)["message"] == "kept"
+
+    def test_drop_oldest_keeps_newest_record(self) -> None:
+        q = multiprocessing.Queue(maxsize=2)
+        handler = WebSocketQueueHandler(queue=q, overflow_policy="drop_oldest", drop_report_interval=None)
+        handler.handle(_make_record("oldest"))
+        handler.handle(_make_record("middle"))
+        time.sleep(0.1)  # Let the queue's feeder thread push both into the pipe
+        handler.handle(_make_record("newest"))
+
+        messages = [q.get(timeout=QUEUE_TIMEOUT)["message"] for _ in range(2)]
+        assert messages == ["middle", "newest"]
+        assert handler.dropped_counts == {"INFO": 1}
+
+    def test_sample_policy_keeps_one_in_n_after_overflow(self) -> None:
+        q = multiprocessing.Queue(maxsize=1)
+        handler = WebSocketQueueHandler(queue=q, overflow_policy="sample", sample_every=5, drop_report_interval=None)
+        handler.handle(_make_record("fills the queue"))
+        handler.handle(_make_record("overflows"))  # Starts the sampling window
+        q.get(timeout=QUEUE_TIMEOUT)  # Make room
+
+        for i in range(10):
+            handler.handle(_make_record(f"sampled {i}"))
+
+        assert q.get(timeout=QUEUE_TIMEOUT)["message"] == "sampled 4"
+        assert handler.dropped_counts == {"INFO": 10}
+
+    def test_unknown_overflow_policy_raises(self) -> None:
+        with pytest.raises(ValueError, match="Unknown overflow policy"):
+            WebSocketQueueHandler(queue=multiprocessing.Queue(), overflow_policy="panic")
+
+    def test_drop_report_is_sent_to_frontend(self) -> None:
+        q = PriorityLogQueue(priority_lane_size=5, bulk_lane_size=1)
+        handler = WebSocketQueueHandler(queue=q, drop_report_interval=60)
+        for i in range(4):
+            handler.handle(_make_record(f"debug {i}", level=logging.DEBUG))
+        handler.handle(_make_record("info", level=logging.INFO))
+        handler.flush()
+
+        report = q.get(timeout=QUEUE_TIMEOUT)
+        assert report["levelname"] == "WARNING"
+        assert report["message"].startswith("4 log records dropped")
+        assert "DEBUG: 3, INFO: 1" in report["message"]
+
+
+class TestCompactLogRecordModel:
+    @pytest.fixture()
+    def sample_model(self) -> LogRecordModel:
+        return LogRecordModel(
+            name="test", msg="hello", args=[], levelname="INFO", levelno=20,
+            pathname="test.py", filename="test.py", module="test", lineno=1,
+            funcName="test_func", created=1000.0, msecs=0.0,
+            relativeCreated=100.0, thread=1, threadName="MainThread",
+            processName="MainProcess", process=1, delta_t="1.000ms",
+            message="hello", asctime="2025-01-01T00:00:00.000",
+            formatted_message="└>> hello | INFO", type="LogRecord",
+            exc_text="Traceback ...",
+        )
+
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+")
+    def test_model_is_slotted(self, sample_model: LogRecordModel) -> None:
+        assert not hasattr(sample_model, "__dict__")
+
+    def test_tuple_round_trip(self, sample_model: LogRecordModel) -> None:
+        values = sample_model.to_tuple()
+        assert len(values) == len(LOG_RECORD_MODEL_FIELDS)
+        assert LogRecordModel.from_tuple(values) == sample_model
+
+    def test_bytes_round_trip(self, sample_model: LogRecordModel) -> None:
+        assert LogRecordModel.from_bytes(sample_model.to_bytes()) == sample_model
+
+    def test_bytes_are_smaller_than_pickled_dict(self, sample_model: LogRecordModel) -> None:
+        import pickle
+        assert len(sample_model.to_bytes()) < len(pickle.dumps(sample_model.model_dump()))
+
+    def test_from_payload_accepts_both_formats(self, sample_model: LogRecordModel) -> None:
+        assert LogRecordModel.from_payload(sample_model.model_dump()) == sample_model
+        assert LogRecordModel.from_payload(sample_model.to_bytes()) == sample_model
+
+    def test_shorter_tuples_decode_with_defaults(self, sample_model: LogRecordModel) -> None:
+        """Payloads from an older producer (fewer trailing fields) still decode."""
+        model = LogRecordModel.from_tuple(sample_model.to_tuple()[:-3])
+        assert model.exc_text is None
+
+    def test_model_dump_json_is_compact_by_default(self, sample_model: LogRecordModel) -> None:
+        dumped = sample_model.model_dump_json()
+        assert "\n" not in dumped
+        assert json.loads(dumped) == sample_model.model_dump()
+
+    def test_handler_compact_payloads_decode(self) -> None:
+        q = multiprocessing.Queue(maxsize=10)
+        handler = WebSocketQueueHandler(queue=q, payload_format="compact")
+        handler.handle(_make_record("compact record"))
+
+        payload = q.get(timeout=QUEUE_TIMEOUT)
+        assert isinstance(payload, bytes)
+        [model] = unpack_log_payload(payload)
+        assert model.message == "compact record"
+
+    def test_handler_compact_batches_decode(self) -> None:
+        q = multiprocessing.Queue(maxsize=10)
+        handler = WebSocketQueueHandler(queue=q, payload_format="compact", batch_size=2, batch_interval=60)
+        handler.handle(_make_record("first"))
+        handler.handle(_make_record("second"))
+
+        records = get_log_records(q, timeout=QUEUE_TIMEOUT)
+        assert [r.message for r in records] == ["first", "second"]
+        handler.close()
+
+    def test_unknown_payload_format_raises(self) -> None:
+        with pytest.raises(ValueError, match="Unknown payload format"):
+            WebSocketQueueHandler(queue=multiprocessing.Queue(), payload_format="xml")
+
+
+class TestBufferedFileHandler:
+    @pytest.fixture()
+    def handler_factory(self, log_file_path: str):
+        handlers = []
+
+        def make(**kwargs) -> BufferedFileHandler:
+            handler = BufferedFileHandler(log_file_path, **kwargs)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            handlers.append(handler)
+            return handler
+
+        yield make
+        for handler in handlers:
+            handler.close()
+
+    @staticmethod
+    def _read(path: str) -> str:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_buffers_until_flush(self, handler_factory, log_file_path: str) -> None:
+        handler = handler_factory(flush_interval=60)
+        handler.handle(_make_record("buffered"))
+
+        assert self._read(log_file_path) == ""
+        assert handler.buffered_size == len("buffered\n")
+
+        handler.flush()
+        assert self._read(log_file_path) == "buffered\n"
+        assert handler.buffered_size == 0
+
+    def test_writes_when_buffer_is_full(self, handler_factory, log_file_path: str) -> None:
+        handler = handler_factory(buffer_size=20, flush_interval=60)
+        handler.handle(_make_record("0123456789"))
+        assert self._read(log_file_path) == ""
+
+        handler.handle(_make_record("0123456789"))
+        assert self._read(log_file_path) == "0123456789\n0123456789\n"
+
+    def test_warning_writes_buffered_lines_immediately(self, handler_factory, log_file_path: str) -> None:
+        handler = handler_factory(flush_interval=60)
+        handler.handle(_make_record("leading up", level=LogLevels.TRACE.value))
+        handler.handle(_make_record("problem", level=logging.WARNING))
+
+        assert self._read(log_file_path) == "leading up\nproblem\n"
+
+    def test_flushes_on_interval(self, handler_factory, log_file_path: str) -> None:
+        handler = handler_factory(flush_interval=0.05)
+        handler.handle(_make_record("eventually"))
+
+        deadline = time.monotonic() + QUEUE_TIMEOUT
+        while not self._read(log_file_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert self._read(log_file_path) == "eventually\n"
+
+    def test_zero_buffer_size_writes_every_record(self, handler_factory, log_file_path: str) -> None:
+        handler = handler_factory(buffer_size=0)
+        handler.handle(_make_record("unbuffered"))
+        assert self._read(log_file_path) == "unbuffered\n"
+
+    def test_close_writes_remaining_buffer(self, handler_factory, log_file_path: str) -> None:
+        handler = handler_factory(flush_interval=60)
+        handler.handle(_make_record("last words"))
+        handler.close()
+        assert self._read(log_file_path) == "last words\n"
+
+    def test_records_after_close_reopen_the_file(self, handler_factory, log_file_path: str) -> None:
+        handler = handler_factory(flush_interval=60)
+        handler.close()
+        handler.handle(_make_record("straggler"))
+        # Nothing would flush a buffer after close(), so the line is written right away
+        assert self._read(log_file_path) == "straggler\n"
+
+
+class TestRotatingLogFileHandler:
+    @pytest.fixture()
+    def handler_factory(self, log_file_path: str):
+        handlers = []
+
+        def make(**kwargs) -> RotatingLogFileHandler:
+            handler = RotatingLogFileHandler(log_file_path, flush_interval=60, **kwargs)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            handlers.append(handler)
+            return handler
+
+        yield make
+        for handler in handlers:
+            handler.close()
+
+    @staticmethod
+    def _read_manifest(log_file_path: str) -> dict:
+        with open(get_manifest_path(log_file_path), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_requires_a_limit(self, log_file_path: str) -> None:
+        with pytest.raises(ValueError, match="max_bytes and/or rotate_interval"):
+            RotatingLogFileHandler(log_file_path)
+
+    def test_rolls_over_by_size_and_compresses(self, handler_factory, log_file_path: str) -> None:
+        import gzip
+        import os
+
+        handler = handler_factory(max_bytes=100, buffer_size=0)
+        for i in range(30):
+            handler.handle(_make_record(f"line {i:02d} " + "x" * 20))
+        handler.close()
+
+        manifest = self._read_manifest(log_file_path)
+        segments = manifest["segments"]
+        assert [s["index"] for s in segments] == list(range(1, len(segments) + 1))
+        assert len(segments) >= 5
+        assert all(s["compressed"] and s["file"].endswith(".log.gz") for s in segments)
+        assert manifest["active"]["file"] == os.path.basename(log_file_path)
+
+        # Segments, oldest first, followed by the active file hold every line in order
+        lines = []
+        for segment in segments:
+            with gzip.open(os.path.join(os.path.dirname(log_file_path), segment["file"]), "rt", encoding="utf-8") as f:
+                lines.extend(f.read().splitlines())
+        with open(log_file_path, encoding="utf-8") as f:
+            lines.extend(f.read().splitlines())
+        assert lines == [f"line {i:02d} " + "x" * 20 for i in range(30)]
+
+    def test_rolls_over_by_time(self, handler_factory, log_file_path: str) -> None:
+        handler = handler_factory(rotate_interval=0.05, buffer_size=0, compress=False)
+        handler.handle(_make_record("first segment"))
+        time.sleep(0.1)
+        handler.handle(_make_record("second segment"))
+
+        [segment] = handler.segments
+        assert segment["file"].endswith(".001.log")
+        assert not segment["compressed"]
+        with open(log_file_path, encoding="utf-8") as f:
+            assert f.read() == "second segment\n"
+
+    def test_resumes_existing_manifest(self, handler_factory, log_file_path: str) -> None:
+        first = handler_factory(max_bytes=10, buffer_size=0, compress=False)
+        first.handle(_make_record("0123456789"))
+        first.handle(_make_record("0123456789"))
+        first.close()
+
+        second = handler_factory(max_bytes=10, buffer_size=0, compress=False)
+        second.handle(_make_record("0123456789"))
+        assert [s["index"] for s in second.segments] == [1, 2]
+
+    def test_never_overwrites_segments_when_the_manifest_is_lost(self, handler_factory, log_file_path: str) -> None:
+        import gzip
+        import os
+
+        first = handler_factory(max_bytes=10, buffer_size=0)
+        first.handle(_make_record("segment 1 "))
+        first.handle(_make_record("segment 2 "))
+        first.close()
+        os.remove(get_manifest_path(log_file_path))
+
+        second = handler_factory(max_bytes=10, buffer_size=0, compress=False)
+        second.handle(_make_record("segment 3 "))
+        second.close()
+
+        [segment] = second.segments
+        assert segment["file"].endswith(".002.log")
+        folder = os.path.dirname(log_file_path)
+        with gzip.open(os.path.join(folder, first.segments[0]["file"]), "rt", encoding="utf-8") as f:
+            assert f.read() == "segment 1 \n"
+        with open(os.path.join(folder, segment["file"]), encoding="utf-8") as f:
+            assert f.read() == "segment 2 \n"
+
+    def test_other_extensions_keep_their_own_manifest(self, handler_factory, log_file_path: str) -> None:
+        jsonl_path = log_file_path[:-len(".log")] + ".jsonl"
+        handler = RotatingLogFileHandler(jsonl_path, max_bytes=10, buffer_size=0, compress=False)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.handle(_make_record("0123456789"))
+        handler.handle(_make_record("0123456789"))
+        handler.close()
+
+        assert get_manifest_path(jsonl_path) == jsonl_path + ".manifest.json"
+        assert handler.segments[0]["file"].endswith(".001.jsonl")
+
+
+class TestHandlerStats:
+    def test_counts_records_bytes_and_latency_per_level(self) -> None:
+        handler = WebSocketQueueHandler(queue_module.Queue())
+        stats = instrument_handler(handler, "websocket")
+
+        handler.handle(_make_record("one", level=logging.INFO))
+        handler.handle(_make_record("two", level=logging.INFO))
+        handler.handle(_make_record("three", level=logging.ERROR))
+        snapshot = get_logging_stats()["websocket"]
+
+        assert snapshot["records"] == 3
+        assert snapshot["records_by_level"] == {"INFO": 2, "ERROR": 1}
+        assert snapshot["bytes_by_level"]["ERROR"] > len("three")
+        assert 0 < snapshot["emit_ns_p50"] <= snapshot["emit_ns_p99"]
+        assert snapshot["emit_ns_max"] <= snapshot["emit_ns_total"]
+        assert sum(snapshot["emit_histogram"].values()) == 3
+        assert stats.handler is handler
+        handler.close()
+
+    def test_counts_queue_full_and_errors(self) -> None:
+        handler = WebSocketQueueHandler(queue_module.Queue(maxsize=1), drop_report_interval=None)
+        instrument_handler(handler, "websocket")
+        handler.handle(_make_record("fits"))
+        handler.handle(_make_record("dropped"))
+
+        closed_stream = io.StringIO()
+        closed_stream.close()
+        broken = logging.StreamHandler(closed_stream)
+        instrument_handler(broken, "console")
+        logging.raiseExceptions, raise_exceptions = False, logging.raiseExceptions
+        try:
+            broken.handle(_make_record("nowhere to go"))
+        finally:
+            logging.raiseExceptions = raise_exceptions
+
+        stats = get_logging_stats()
+        assert stats["websocket"]["queue_full"] == 1
+        assert stats["console"]["errors"] == 1
+        handler.close()
+
+    def test_histogram_percentiles_are_bucket_upper_bounds(self) -> None:
+        histogram = [0] * 48
+        histogram[10] = 98  # 512-1023 ns
+        histogram[20] = 2  # ~0.5-1 ms
+        assert estimate_histogram_percentile(histogram, 0.5) == 1024
+        assert estimate_histogram_percentile(histogram, 0.99) == 2 ** 20
+        assert estimate_histogram_percentile([0] * 48, 0.99) == 0
+
+    def test_reporter_logs_a_summary_of_the_interval(self) -> None:
+        handler = WebSocketQueueHandler(queue_module.Queue())
+        instrument_handler(handler, "websocket")
+        reporter = LoggingStatsReporter(interval=60)
+        for _ in range(5):
+            handler.handle(_make_record())
+
+        summaries = []
+        stats_logger = logging.getLogger("skellylogs.stats")
+        capture = logging.Handler()
+        capture.emit = lambda record: summaries.append(record.getMessage())
+        stats_logger.addHandler(capture)
+        stats_logger.setLevel(logging.INFO)
+        try:
+            reporter.report()
+            reporter.report()
+        finally:
+            stats_logger.removeHandler(capture)
+
+        assert "websocket: 5 records" in summaries[0]
+        assert "websocket: 0 records" in summaries[1]
+        handler.close()
+
+
+class _CollectingHandler(logging.Handler):
+    def __init__(self, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+class TestFlightRecorderHandler:
+    def test_keeps_only_records_the_targets_rejected(self) -> None:
+        target = _CollectingHandler(level=logging.INFO)
+        recorder = FlightRecorderHandler([target], capacity=10)
+        recorder.handle(_make_record("trace", level=LogLevels.TRACE.value))
+        recorder.handle(_make_record("info", level=logging.INFO))
+        assert recorder.buffered_count == 1
+        assert target.records == []
+
+    def test_error_dumps_buffer_oldest_first_behind_a_header(self) -> None:
+        target = _CollectingHandler(level=logging.INFO)
+        recorder = FlightRecorderHandler([target], capacity=10)
+        for i in range(3):
+            recorder.handle(_make_record(f"trace {i}", level=LogLevels.TRACE.value))
+        recorder.handle(_make_record("boom", level=logging.ERROR))
+
+        header, *dumped = target.records
+        assert header.name == FLIGHT_RECORDER_LOGGER_NAME
+        assert "3 records" in header.getMessage()
+        assert [record.getMessage() for record in dumped] == ["trace 0", "trace 1", "trace 2"]
+        assert dumped[0].delta_t == "0.000ms"
+        assert recorder.buffered_count == 0
+        assert recorder.dump_count == 1
+
+    def test_ring_keeps_the_newest_records(self) -> None:
+        target = _CollectingHandler(level=logging.INFO)
+        recorder = FlightRecorderHandler([target], capacity=3)
+        for i in range(5):
+            recorder.handle(_make_record(f"trace {i}", level=LogLevels.TRACE.value))
+        recorder.dump(_make_record("boom", level=logging.ERROR))
+        assert [record.getMessage() for record in target.records[1:]] == ["trace 2", "trace 3", "trace 4"]
+
+    def test_max_age_drops_older_records(self) -> None:
+        target = _CollectingHandler(level=logging.INFO)
+        recorder = FlightRecorderHandler([target], capacity=10, max_age=1.0)
+        old = _make_record("old", level=LogLevels.TRACE.value)
+        old.created -= 5
+        recorder.handle(old)
+        recorder.handle(_make_record("recent", level=LogLevels.TRACE.value))
+        recorder.handle(_make_record("boom", level=logging.ERROR))
+        assert [record.getMessage() for record in target.records[1:]] == ["recent"]
+
+    def test_each_target_gets_only_what_it_missed(self) -> None:
+        file_target = _CollectingHandler(level=LogLevels.TRACE.value)
+        websocket_target = _CollectingHandler(level=logging.INFO)
+        recorder = FlightRecorderHandler([file_target, websocket_target], capacity=10)
+        recorder.handle(_make_record("trace", level=LogLevels.TRACE.value))
+        recorder.handle(_make_record("debug", level=logging.DEBUG))
+        recorder.handle(_make_record("boom", level=logging.ERROR))
+        assert file_target.records == []  # it already had both
+        assert [record.getMessage() for record in websocket_target.records[1:]] == ["trace", "debug"]
+
+    def test_empty_buffer_dumps_nothing(self) -> None:
+        target = _CollectingHandler(level=logging.INFO)
+        recorder = FlightRecorderHandler([target], capacity=10)
+        recorder.handle(_make_record("boom", level=logging.ERROR))
+        assert target.records == []
+        assert recorder.dump_count == 0
+
+
+def _history_model(message: str, created: float) -> LogRecordModel:
+    return LogRecordModel(
+        name="test", msg=message, args=[], levelname="INFO", levelno=20,
+        pathname="test.py", filename="test.py", module="test", lineno=1,
+        funcName="test_func", created=created, msecs=0.0,
+        relativeCreated=0.0, thread=1, threadName="MainThread",
+        processName="MainProcess", process=1, delta_t="0.000ms",
+        message=message, asctime="", formatted_message=message, type="LogRecord",
+    )
+
+
+class TestLogHistoryStore:
+    def test_assigns_increasing_sequence_ids(self) -> None:
+        store = LogHistoryStore(capacity=10)
+        added = store.add([_history_model("a", 1.0), _history_model("b", 2.0)])
+        added += store.add([_history_model("c", 3.0)])
+        assert [model.sequence_id for model in added] == [1, 2, 3]
+        assert store.next_sequence_id == 4
+
+    def test_last_and_since_sequence(self) -> None:
+        store = LogHistoryStore(capacity=10)
+        store.add(_history_model(str(i), float(i)) for i in range(5))
+        assert [model.message for model in store.last(2)] == ["3", "4"]
+        assert [model.message for model in store.last(100)] == ["0", "1", "2", "3", "4"]
+        assert [model.sequence_id for model in store.since_sequence(3)] == [4, 5]
+        assert store.since_sequence(5) == []
+
+    def test_evicts_oldest_beyond_capacity(self) -> None:
+        store = LogHistoryStore(capacity=3)
+        store.add(_history_model(str(i), float(i)) for i in range(7))
+        assert len(store) == 3
+        assert store.oldest_sequence_id == 5
+        # A client that last saw 1 has missed 2-4; it gets what is left, and can tell from the ids
+        assert [model.sequence_id for model in store.since_sequence(1)] == [5, 6, 7]
+        assert [model.message for model in store.last(3)] == ["4", "5", "6"]
+
+    def test_since_time_handles_slightly_out_of_order_records(self) -> None:
+        store = LogHistoryStore(capacity=4)
+        store.add(_history_model(name, created) for name, created in [
+            ("evicted", 0.5), ("a", 1.0), ("b", 3.0), ("c", 2.0), ("d", 4.0),
+        ])
+        assert [model.message for model in store.since_time(2.0)] == ["b", "c", "d"]
+        assert [model.message for model in store.since_time(3.5)] == ["d"]
+        assert store.since_time(10.0) == []
+
+    def test_pull_reads_the_websocket_queue(self) -> None:
+        queue = queue_module.Queue()
+        handler = WebSocketQueueHandler(queue, batch_size=2)
+        for i in range(2):
+            handler.handle(_make_record(f"record {i}"))
+        store = LogHistoryStore()
+        pulled = store.pull(queue, timeout=QUEUE_TIMEOUT)
+        assert [(model.sequence_id, model.message) for model in pulled] == [(1, "record 0"), (2, "record 1")]
+        assert store.last(2) == pulled
+        assert pulled[0].model_dump()["sequence_id"] == 1
+        handler.close()
+
+
+async def _first_batch(queue, **kwargs) -> list[LogRecordModel]:
+    stream = stream_log_records(queue, **kwargs)
+    try:
+        return await asyncio.wait_for(stream.__anext__(), timeout=QUEUE_TIMEOUT)
+    finally:
+        await stream.aclose()
+
+
+class TestStreamLogRecords:
+    def test_wakes_on_pipe_readiness_not_polling(self) -> None:
+        queue = multiprocessing.Queue()
+        handler = WebSocketQueueHandler(queue)
+
+        async def produce_later() -> list[LogRecordModel]:
+            asyncio.get_running_loop().call_later(0.05, handler.handle, _make_record("late record"))
+            started = time.monotonic()
+            # A poll interval far beyond the timeout: only pipe readiness can wake it in time
+            records = await _first_batch(queue, poll_interval=60)
+            assert time.monotonic() - started < QUEUE_TIMEOUT
+            return records
+
+        records = asyncio.run(produce_later())
+        assert [record.message for record in records] == ["late record"]
+        handler.close()
+
+    def test_drains_everything_queued_in_one_batch(self) -> None:
+        queue = multiprocessing.Queue()
+        handler = WebSocketQueueHandler(queue)
+        for i in range(5):
+            handler.handle(_make_record(f"record {i}"))
+        time.sleep(0.1)  # let the feeder thread write them all to the pipe
+
+        records = asyncio.run(_first_batch(queue))
+        assert [record.message for record in records] == [f"record {i}" for i in range(5)]
+        handler.close()
+
+    def test_priority_queue_lanes_are_both_watched(self) -> None:
+        queue = PriorityLogQueue()
+        handler = WebSocketQueueHandler(queue)
+
+        async def produce_later() -> list[LogRecordModel]:
+            asyncio.get_running_loop().call_later(0.05, handler.handle, _make_record("urgent", level=logging.ERROR))
+            return await _first_batch(queue, poll_interval=60)
+
+        assert [record.message for record in asyncio.run(produce_later())] == ["urgent"]
+        handler.close()
+
+    def test_polls_queues_without_a_pipe_and_fills_history(self) -> None:
+        queue = queue_module.Queue()
+        handler = WebSocketQueueHandler(queue)
+        history = LogHistoryStore()
+
+        async def produce_later() -> list[LogRecordModel]:
+            asyncio.get_running_loop().call_later(0.05, handler.handle, _make_record("polled"))
+            return await _first_batch(queue, history=history, poll_interval=0.01)
+
+        records = asyncio.run(produce_later())
+        assert [(record.sequence_id, record.message) for record in records] == [(1, "polled")]
+        assert history.last(1) == records
+        handler.close()
+
+
+def _wait_until(condition, timeout: float = QUEUE_TIMEOUT) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def _fan_out_record(msg: str, name: str = "test_handler", level: int = logging.INFO, process: int = 1) -> logging.LogRecord:
+    record = _make_record(msg, level=level)
+    record.name = name
+    record.process = process
+    return record
+
+
+class TestLogFanOutServer:
+    @pytest.fixture()
+    def queue(self) -> multiprocessing.Queue:
+        return multiprocessing.Queue()
+
+    @pytest.fixture()
+    def server(self, queue: multiprocessing.Queue):
+        server = LogFanOutServer(queue, port=0, subscriber_buffer_size=10)
+        server.start()
+        yield server
+        server.stop()
+
+    def _connect(self, server: LogFanOutServer, subscription: LogSubscription) -> LogFanOutClient:
+        host, port = server.address
+        return LogFanOutClient(subscription, host=host, port=port, timeout=QUEUE_TIMEOUT)
+
+    def test_subscription_round_trips_and_accepts_level_names(self) -> None:
+        subscription = LogSubscription(min_level="warning", logger_prefixes=["a.b"], process_ids=["12"])
+        assert subscription == LogSubscription.from_json(subscription.to_json())
+        assert subscription.min_level == LogLevels.WARNING.value
+        assert LogSubscription.from_json("") == LogSubscription()
+        with pytest.raises(ValueError):
+            LogSubscription.from_json('{"min_levle": 20}')
+
+    def test_subscription_matches_logger_hierarchy(self) -> None:
+        subscription = LogSubscription(logger_prefixes=("freemocap.cameras",))
+        model = LogRecordModel.from_payload(_history_model("x", 1.0).model_dump())
+        for name, expected in [("freemocap.cameras", True), ("freemocap.cameras.grab", True), ("freemocap.camerasx", False)]:
+            model.name = name
+            assert subscription.matches(model) is expected
+
+    def test_each_client_gets_only_its_records(self, server: LogFanOutServer, queue: multiprocessing.Queue) -> None:
+        warnings_client = self._connect(server, LogSubscription(min_level=logging.WARNING))
+        cameras_client = self._connect(server, LogSubscription(logger_prefixes=("cameras",), process_ids=(7,)))
+        _wait_until(lambda: server.subscriber_count == 2)
+
+        handler = WebSocketQueueHandler(queue)
+        handler.handle(_fan_out_record("camera info", name="cameras.grab", process=7))
+        handler.handle(_fan_out_record("other process", name="cameras.grab", process=8))
+        handler.handle(_fan_out_record("ui warning", name="ui", level=logging.WARNING))
+        handler.handle(_fan_out_record("camera warning", name="cameras", level=logging.WARNING, process=7))
+
+        warnings = iter(warnings_client)
+        assert [next(warnings).message for _ in range(2)] == ["ui warning", "camera warning"]
+        cameras = iter(cameras_client)
+        received = [next(cameras) for _ in range(2)]
+        assert [record.message for record in received] == ["camera info", "camera warning"]
+        assert [record.sequence_id for record in received] == [1, 4]
+        warnings_client.close()
+        cameras_client.close()
+        handler.close()
+
+    def test_backfills_from_history_without_duplicates(self, server: LogFanOutServer, queue: multiprocessing.Queue) -> None:
+        handler = WebSocketQueueHandler(queue)
+        for i in range(3):
+            handler.handle(_fan_out_record(f"early {i}"))
+        _wait_until(lambda: server.history.next_sequence_id == 4)
+
+        client = self._connect(server, LogSubscription(since_sequence=1))
+        _wait_until(lambda: server.subscriber_count == 1)
+        handler.handle(_fan_out_record("live"))
+
+        records = iter(client)
+        assert [next(records).message for _ in range(3)] == ["early 1", "early 2", "live"]
+        client.close()
+        handler.close()
+
+    def test_slow_client_does_not_stall_the_others(self, server: LogFanOutServer, queue: multiprocessing.Queue) -> None:
+        host, port = server.address
+        stalled = socket.create_connection((host, port))
+        stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        stalled.sendall(b"{}\n")  # subscribes to everything, then never reads
+        fast_client = self._connect(server, LogSubscription(min_level=logging.ERROR))
+        _wait_until(lambda: server.subscriber_count == 2)
+
+        handler = WebSocketQueueHandler(queue)
+        bulky = "x" * 20_000
+        for i in range(300):
+            handler.handle(_fan_out_record(f"{bulky} {i}"))
+        handler.handle(_fan_out_record("still flowing", level=logging.ERROR))
+
+        assert next(iter(fast_client)).message == "still flowing"
+        _wait_until(lambda: any(subscriber.dropped_count for subscriber in server._subscribers))
+        stalled.close()
+        fast_client.close()
+        handler.close()
+
+    def test_rejects_malformed_subscription(self, server: LogFanOutServer) -> None:
+        host, port = server.address
+        with socket.create_connection((host, port), timeout=QUEUE_TIMEOUT) as connection:
+            connection.sendall(b"not json\n")
+            reply = connection.makefile("rb").readline()
+        assert b"error" in reply
@@ -0,0 +1,98 @@
+"""Import cost of the package, measured with python -X importtime in a fresh interpreter.
+
+Every freemocap/skellycam worker process imports skellylogs to configure
+logging, so what that import pulls in is paid once per process.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+# Wall-clock budgets are flaky on shared CI runners, so the timing check is
+# opt-in: SKELLYLOGS_IMPORT_BUDGET_US=150000 python -m pytest tests/test_import_time.py
+IMPORT_BUDGET_ENVIRONMENT_VARIABLE = "SKELLYLOGS_IMPORT_BUDGET_US"
+
+WORKER_IMPORT = "import logging, multiprocessing; from skellylogs import configure_logging"
+
+# Only needed once a feature that uses them is switched on
+NOT_IMPORTED_BY_WORKERS = (
+    "skellylogs.handlers.websocket_log_queue_handler",
+    "skellylogs.handlers.shared_memory_log_ring",
+    "skellylogs.handlers.rotating_file_handler",
+    "skellylogs.formatters.json_lines_formatter",
+    "skellylogs.log_retention",
+    "skellylogs.load_shedding",
+    "skellylogs.query",
+    "multiprocessing.shared_memory",
+)
+
+
+def _import_times(statement: str) -> dict[str, tuple[int, int]]:
+    """{module: (cumulative import time in us, nesting depth)} for the modules `statement` imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=PACKAGE_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = (int(cumulative), (len(name) - len(name.lstrip()) - 1) // 2)
+    return times
+
+
+def test_bare_package_import_skips_optional_features() -> None:
+    times = _import_times("import skellylogs")
+    assert "skellylogs.configure_logging" in times
+    loaded = [name for name in NOT_IMPORTED_BY_WORKERS if name in times]
+    assert loaded == []
+
+
+def test_configure_logging_submodule_does_not_shadow_the_function() -> None:
+    # In a fresh interpreter, so the submodule import is the package's first
+    statement = (
+        "from skellylogs.configure_logging import configure_logging\n"
+        "import skellylogs\n"
+        "assert skellylogs.configure_logging is configure_logging, skellylogs.configure_logging"
+    )
+    subprocess.run([sys.executable, "-c", statement], cwd=PACKAGE_ROOT, check=True)
+
+
+def test_worker_import_skips_optional_features() -> None:
+    times = _import_times(WORKER_IMPORT)
+    loaded = [name for name in NOT_IMPORTED_BY_WORKERS if name in times]
+    assert loaded == []
+
+
+@pytest.mark.skipif(
+    IMPORT_BUDGET_ENVIRONMENT_VARIABLE not in os.environ, reason=f"set {IMPORT_BUDGET_ENVIRONMENT_VARIABLE} to check"
+)
+def test_worker_import_is_within_budget() -> None:
+    budget_us = int(os.environ[IMPORT_BUDGET_ENVIRONMENT_VARIABLE])
+    times = _import_times(WORKER_IMPORT)
+    # Modules imported at depth 0 were first imported by the skellylogs import itself
+    skellylogs_us = sum(
+        cumulative
+        for name, (cumulative, depth) in times.items()
+        if depth == 0 and (name == "skellylogs" or name.startswith("skellylogs."))
+    )
+    assert skellylogs_us < budget_us, f"skellylogs worker import took {skellylogs_us}us"
+
+
+def test_lazy_attributes_resolve_and_are_listed() -> None:
+    import skellylogs
+
+    for name in skellylogs.__all__:
+        assert getattr(skellylogs, name) is not None
+        assert name in dir(skellylogs)
@@ -0,0 +1,34 @@
+"""Tests for LazyMessage."""
+
+import logging
+import pickle
+
+from skellylogs.lazy_message import LazyMessage
+
+
+def test_renders_template_with_str_format() -> None:
+    assert str(LazyMessage("frame {} of {camera}", 3, camera="cam0")) == "frame 3 of cam0"
+
+
+def test_renders_callable_once() -> None:
+    calls = []
+    message = LazyMessage(lambda n: calls.append(n) or f"n={n}", 7)
+
+    assert str(message) == "n=7"
+    assert str(message) == "n=7"
+    assert calls == [7]
+
+
+def test_works_as_a_log_record_message_with_percent_args() -> None:
+    record = logging.LogRecord("lazy", logging.INFO, "x.py", 1, LazyMessage("{} %s", "a"), ("b",), None)
+    assert record.getMessage() == "a b"
+
+
+def test_pickles_as_rendered_text() -> None:
+    message = LazyMessage(lambda: "rendered before crossing a process boundary")
+    assert pickle.loads(pickle.dumps(message)) == "rendered before crossing a process boundary"
+
+
+def test_repr_does_not_render() -> None:
+    message = LazyMessage(lambda: 1 / 0)
+    assert repr(message).startswith("LazyMessage(")
@@ -0,0 +1,189 @@
+"""Tests for adaptive load shedding of LOOP/TRACE records."""
+
+from __future__ import annotations
+
+import logging
+import logging.handlers
+import queue
+import time
+
+import pytest
+
+from skellylogs import LogLevels, configure_logging
+from skellylogs.handlers.handler_stats import instrument_handler
+from skellylogs.load_shedding import (
+    LOAD_SHEDDING_LOGGER_NAME,
+    LOAD_SHEDDING_STAGE_NORMAL,
+    LOAD_SHEDDING_STAGE_SAMPLING,
+    LOAD_SHEDDING_STAGE_SHEDDING,
+    LoadSheddingController,
+    LoadSheddingPolicy,
+    get_load_shedding_controller,
+)
+
+# Checks are driven by hand; the controller's own thread never gets a turn
+MANUAL_POLICY = LoadSheddingPolicy(check_interval=3600, recovery_checks=2)
+
+
+class _SlowHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord) -> None:
+        time.sleep(0.002)
+
+
+@pytest.fixture()
+def full_queue_handler() -> logging.handlers.QueueHandler:
+    log_queue = queue.Queue(maxsize=10)
+    for i in range(9):
+        log_queue.put(i)
+    return logging.handlers.QueueHandler(log_queue)
+
+
+class _CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def _record(levelno: int) -> logging.LogRecord:
+    return logging.makeLogRecord({"msg": "frame", "levelno": levelno})
+
+
+def _announcements(caplog: pytest.LogCaptureFixture) -> list[logging.LogRecord]:
+    return [record for record in caplog.records if record.name == LOAD_SHEDDING_LOGGER_NAME]
+
+
+def test_full_queue_samples_then_sheds(full_queue_handler, caplog) -> None:
+    logging.getLogger().setLevel(LogLevels.LOOP.value)
+    controller = LoadSheddingController(
+        MANUAL_POLICY, handlers={"websocket": full_queue_handler}, filtered_handlers=[full_queue_handler]
+    )
+
+    controller.check()
+    assert controller.stage == LOAD_SHEDDING_STAGE_SAMPLING
+    assert controller.sampling_filter in full_queue_handler.filters
+    assert logging.getLogger().level == LogLevels.LOOP.value
+
+    controller.check()
+    assert controller.stage == LOAD_SHEDDING_STAGE_SHEDDING
+    assert logging.getLogger().level == LogLevels.LOOP.value
+    assert not full_queue_handler.filter(_record(LogLevels.TRACE.value))
+    assert full_queue_handler.filter(_record(logging.DEBUG))
+
+    # Already at the last stage
+    controller.check()
+    assert controller.stage == LOAD_SHEDDING_STAGE_SHEDDING
+
+    announcements = _announcements(caplog)
+    assert [record.levelno for record in announcements] == [logging.WARNING, logging.WARNING]
+    assert announcements[0].getMessage().startswith("Logging load shedding normal -> sampling (websocket queue 90% full)")
+    assert announcements[1].getMessage().startswith("Logging load shedding sampling -> shedding")
+
+
+def test_shedding_covers_loggers_with_an_explicit_level(full_queue_handler) -> None:
+    cameras = _CollectingHandler()
+    logger = logging.getLogger("test_load_shedding.cameras")
+    logger.setLevel(LogLevels.TRACE.value)
+    logger.addHandler(cameras)
+    logger.propagate = False
+    try:
+        controller = LoadSheddingController(
+            MANUAL_POLICY, handlers={"websocket": full_queue_handler}, filtered_handlers=[cameras, full_queue_handler]
+        )
+        controller.check()
+        controller.check()
+        assert controller.stage == LOAD_SHEDDING_STAGE_SHEDDING
+
+        logger.log(LogLevels.TRACE.value, "shed")
+        logger.debug("kept")
+        assert cameras.messages == ["kept"]
+    finally:
+        logger.removeHandler(cameras)
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+
+
+def test_recovers_one_stage_after_consecutive_clear_checks(full_queue_handler, caplog) -> None:
+    logging.getLogger().setLevel(LogLevels.LOOP.value)
+    controller = LoadSheddingController(
+        MANUAL_POLICY, handlers={"websocket": full_queue_handler}, filtered_handlers=[full_queue_handler]
+    )
+    controller.check()
+    controller.check()
+    while not full_queue_handler.queue.empty():
+        full_queue_handler.queue.get_nowait()
+
+    controller.check()
+    assert controller.stage == LOAD_SHEDDING_STAGE_SHEDDING
+    controller.check()
+    assert controller.stage == LOAD_SHEDDING_STAGE_SAMPLING
+    assert logging.getLogger().level == LogLevels.LOOP.value
+    assert controller.sampling_filter in full_queue_handler.filters
+
+    controller.check()
+    controller.check()
+    assert controller.stage == LOAD_SHEDDING_STAGE_NORMAL
+    assert controller.sampling_filter not in full_queue_handler.filters
+
+    stepping_down = [record for record in _announcements(caplog) if record.levelno == logging.INFO]
+    assert [record.getMessage().split(" (")[0] for record in stepping_down] == [
+        "Logging load shedding shedding -> sampling",
+        "Logging load shedding sampling -> normal",
+    ]
+
+
+def test_half_full_queue_holds_the_stage(full_queue_handler) -> None:
+    controller = LoadSheddingController(
+        MANUAL_POLICY, handlers={"websocket": full_queue_handler}, filtered_handlers=[full_queue_handler]
+    )
+    controller.check()
+    for _ in range(4):
+        full_queue_handler.queue.get_nowait()
+
+    # 50% full: no longer pressure, but not clear either
+    for _ in range(5):
+        controller.check()
+    assert controller.stage == LOAD_SHEDDING_STAGE_SAMPLING
+
+
+def test_slow_emits_count_as_pressure() -> None:
+    handler = _SlowHandler()
+    instrument_handler(handler, "console")
+    controller = LoadSheddingController(MANUAL_POLICY, handlers={"console": handler}, filtered_handlers=[handler])
+
+    controller.check()
+    assert controller.stage == LOAD_SHEDDING_STAGE_NORMAL
+
+    handler.handle(logging.makeLogRecord({"msg": "blocked", "levelno": logging.INFO}))
+    controller.check()
+    assert controller.stage == LOAD_SHEDDING_STAGE_SAMPLING
+
+
+def test_stop_restores_level_and_filters(full_queue_handler) -> None:
+    logging.getLogger().setLevel(LogLevels.LOOP.value)
+    controller = LoadSheddingController(
+        MANUAL_POLICY, handlers={"websocket": full_queue_handler}, filtered_handlers=[full_queue_handler]
+    )
+    controller.check()
+    controller.check()
+
+    controller.stop()
+    assert controller.stage == LOAD_SHEDDING_STAGE_NORMAL
+    assert logging.getLogger().level == LogLevels.LOOP.value
+    assert controller.sampling_filter not in full_queue_handler.filters
+
+
+def test_configure_logging_starts_and_replaces_the_controller(log_file_path: str) -> None:
+    configure_logging(
+        level=LogLevels.LOOP, log_file_path=log_file_path, ws_queue=queue.Queue(), load_shedding=MANUAL_POLICY
+    )
+    controller = get_load_shedding_controller()
+    assert set(controller.handlers) >= {"console", "file", "websocket"}
+
+    controller._apply_stage(LOAD_SHEDDING_STAGE_SHEDDING)
+    configure_logging(level=LogLevels.LOOP, log_file_path=log_file_path, ws_queue=queue.Queue())
+    assert logging.getLogger().level == LogLevels.LOOP.value
+    with pytest.raises(ValueError):
+        get_load_shedding_controller()
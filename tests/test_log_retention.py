@@ -0,0 +1,173 @@
+"""Tests for log folder retention."""
+
+import gzip
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+from skellylogs.log_retention import (
+    RETENTION_INDEX_FILE_NAME,
+    LogRetentionPolicy,
+    enforce_log_retention,
+    get_log_session_name,
+    start_log_retention,
+)
+
+
+def _stem(second: int) -> str:
+    """A session stem as default_paths names them."""
+    return f"log_2025-01-01T00_00_{second:02d}ms000_gmt+0"
+
+
+OLD = _stem(0)
+NEW = _stem(59)
+
+
+def _write_session(folder: str, name: str, age: float, size: int = 1000, files: tuple = (".log",)) -> None:
+    modified = time.time() - age
+    for suffix in files:
+        path = os.path.join(folder, name + suffix)
+        if suffix.endswith(".gz"):
+            with gzip.open(path, "wb") as f:
+                f.write(b"x" * size)
+        else:
+            with open(path, "w") as f:
+                f.write("log line " * (size // 9))
+        os.utime(path, (modified, modified))
+
+
+@pytest.fixture()
+def log_folder() -> str:
+    return tempfile.mkdtemp()
+
+
+def test_session_name_groups_segments_and_manifest() -> None:
+    assert get_log_session_name("log_2025-01-01T00_00_00ms000_gmt+0.log") == "log_2025-01-01T00_00_00ms000_gmt+0"
+    assert get_log_session_name("log_a.002.log.gz") == "log_a"
+    assert get_log_session_name("log_a.manifest.json") == "log_a"
+
+
+def test_deletes_sessions_past_max_age(log_folder: str) -> None:
+    _write_session(log_folder, OLD, age=3600, files=(".log", ".001.log.gz", ".manifest.json"))
+    _write_session(log_folder, NEW, age=10)
+
+    report = enforce_log_retention(log_folder, LogRetentionPolicy(max_age=600))
+
+    assert report.deleted_sessions == [OLD]
+    assert report.deleted_files == 3
+    assert sorted(f for f in os.listdir(log_folder) if not f.startswith(".")) == [NEW + ".log"]
+
+
+def test_deletes_oldest_sessions_over_file_count(log_folder: str) -> None:
+    for i in range(5):
+        _write_session(log_folder, _stem(i), age=100 - i)
+
+    report = enforce_log_retention(log_folder, LogRetentionPolicy(max_files=2))
+
+    assert report.deleted_sessions == [_stem(0), _stem(1), _stem(2)]
+
+
+def test_compresses_before_deleting_over_byte_quota(log_folder: str) -> None:
+    _write_session(log_folder, _stem(0), age=300, size=100_000)
+    _write_session(log_folder, _stem(1), age=200, size=100_000)
+
+    report = enforce_log_retention(log_folder, LogRetentionPolicy(max_total_bytes=150_000))
+
+    assert report.deleted_sessions == []
+    assert report.compressed_files == 1
+    assert os.path.exists(os.path.join(log_folder, _stem(0) + ".log.gz"))
+    assert os.path.exists(os.path.join(log_folder, _stem(1) + ".log"))
+
+
+def test_deletes_over_byte_quota_without_compression(log_folder: str) -> None:
+    _write_session(log_folder, _stem(0), age=300, size=100_000)
+    _write_session(log_folder, _stem(1), age=200, size=100_000)
+
+    report = enforce_log_retention(log_folder, LogRetentionPolicy(max_total_bytes=150_000, compress=False))
+
+    assert report.deleted_sessions == [_stem(0)]
+
+
+def test_never_touches_active_session(log_folder: str) -> None:
+    _write_session(log_folder, "log_active", age=3600)
+
+    report = enforce_log_retention(
+        log_folder,
+        LogRetentionPolicy(max_age=1, max_files=0),
+        active_log_file=os.path.join(log_folder, "log_active.log"),
+    )
+
+    assert report.deleted_sessions == []
+    assert os.path.exists(os.path.join(log_folder, "log_active.log"))
+
+
+def test_segments_past_999_belong_to_their_session(log_folder: str) -> None:
+    _write_session(log_folder, OLD, age=3600, files=(".999.log.gz", ".1000.log.gz", ".1000.jsonl"))
+
+    report = enforce_log_retention(log_folder, LogRetentionPolicy(max_age=600))
+
+    assert report.deleted_files == 3
+
+
+def test_jsonl_files_belong_to_their_session(log_folder: str) -> None:
+    _write_session(log_folder, OLD, age=3600, files=(".log", ".jsonl", ".001.jsonl.gz", ".jsonl.manifest.json"))
+
+    report = enforce_log_retention(log_folder, LogRetentionPolicy(max_age=600))
+
+    assert report.deleted_sessions == [OLD]
+    assert report.deleted_files == 4
+
+
+def test_ignores_files_that_are_not_logs(log_folder: str) -> None:
+    with open(os.path.join(log_folder, "notes.txt"), "w") as f:
+        f.write("keep me")
+
+    enforce_log_retention(log_folder, LogRetentionPolicy(max_files=0))
+
+    assert os.path.exists(os.path.join(log_folder, "notes.txt"))
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [
+        LogRetentionPolicy(max_age=1),
+        LogRetentionPolicy(max_files=0),
+        LogRetentionPolicy(max_total_bytes=0),
+        LogRetentionPolicy(max_total_bytes=0, compress=False),
+    ],
+)
+def test_foreign_files_survive_every_policy(log_folder: str, policy: LogRetentionPolicy) -> None:
+    foreign = ("build.log", "server.jsonl", "tsconfig.manifest.json", "cache.idx.json", "log_parser.log", "old.001.log.gz")
+    for name in foreign:
+        _write_session(log_folder, name.split(".", 1)[0], age=3600, files=("." + name.split(".", 1)[1],))
+    _write_session(log_folder, OLD, age=3600)
+
+    report = enforce_log_retention(log_folder, policy, active_log_file=os.path.join(log_folder, NEW + ".log"))
+
+    assert report.deleted_sessions == [OLD] or report.compressed_files == 1
+    assert sorted(f for f in os.listdir(log_folder) if not f.startswith(".") and not f.startswith(OLD)) == sorted(
+        foreign
+    )
+
+
+def test_remembers_compressed_segments_between_runs(log_folder: str) -> None:
+    _write_session(log_folder, _stem(0), age=100, files=(".001.log.gz", ".002.log.gz"))
+
+    enforce_log_retention(log_folder, LogRetentionPolicy(max_files=10))
+
+    with open(os.path.join(log_folder, RETENTION_INDEX_FILE_NAME)) as f:
+        index = json.load(f)
+    assert sorted(index) == [_stem(0) + ".001.log.gz", _stem(0) + ".002.log.gz"]
+
+
+def test_start_log_retention_runs_in_background(log_folder: str) -> None:
+    _write_session(log_folder, OLD, age=3600)
+
+    thread = start_log_retention(log_folder, LogRetentionPolicy(max_age=600))
+    thread.join(timeout=5)
+
+    assert thread.daemon
+    assert not os.path.exists(os.path.join(log_folder, OLD + ".log"))
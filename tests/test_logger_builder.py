@@ -6,6 +6,7 @@ import multiprocessing
 from skellylogs.logger_builder import LoggerBuilder
 from skellylogs.log_levels import LogLevels
 from skellylogs.handlers.websocket_log_queue_handler import WebSocketQueueHandler
+from skellylogs.handlers.buffered_file_handler import BufferedFileHandler
 from skellylogs.handlers.colored_console import ColoredConsoleHandler
 from skellylogs.filters.stringify_traceback import StringifyTracebackFilter
 
@@ -18,7 +19,7 @@ def test_configure_adds_three_handlers_with_queue(log_file_path: str) -> None:
     root = logging.getLogger()
     handler_types = {type(h) for h in root.handlers}
     assert ColoredConsoleHandler in handler_types
-    assert logging.FileHandler in handler_types
+    assert BufferedFileHandler in handler_types
     assert WebSocketQueueHandler in handler_types
 
 
@@ -29,7 +30,7 @@ def test_configure_adds_two_handlers_without_queue(log_file_path: str) -> None:
     root = logging.getLogger()
     handler_types = {type(h) for h in root.handlers}
     assert ColoredConsoleHandler in handler_types
-    assert logging.FileHandler in handler_types
+    assert BufferedFileHandler in handler_types
     assert WebSocketQueueHandler not in handler_types
 
 
@@ -64,10 +65,10 @@ def test_configure_clears_previous_handlers(log_file_path: str) -> None:
     builder.configure()
 
     # After configure, none of the old handlers should remain —
-    # only our ColoredConsoleHandler and FileHandler
+    # only our ColoredConsoleHandler and BufferedFileHandler
     handler_types = {type(h) for h in root.handlers}
     assert ColoredConsoleHandler in handler_types
-    assert logging.FileHandler in handler_types
+    assert BufferedFileHandler in handler_types
 
 
 def test_file_handler_uses_provided_path(log_file_path: str) -> None:
@@ -77,6 +78,8 @@ def test_file_handler_uses_provided_path(log_file_path: str) -> None:
 
     logger = logging.getLogger("test_file_path")
     logger.info("path test")
+    for handler in logging.getLogger().handlers:
+        handler.flush()
 
     assert os.path.exists(log_file_path)
     with open(log_file_path) as f:
@@ -0,0 +1,112 @@
+"""Tests for merging log files into one time-ordered stream."""
+
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import shutil
+import tempfile
+
+import pytest
+
+from skellylogs.formatters.json_lines_formatter import JsonLinesFormatter
+from skellylogs.formatters.record_renderer import render_record
+from skellylogs.handlers.websocket_log_queue_handler import PAYLOAD_FORMAT_COMPACT, LogRecordModel
+from skellylogs.merge import main, merge_log_files, merge_log_records, replay_log_records, write_log_records
+
+BASE_TIME = 1_700_000_000.0
+
+
+def _make_record(t: float, pid: int) -> logging.LogRecord:
+    record = logging.LogRecord(
+        name="app", level=logging.INFO, pathname="app.py", lineno=1,
+        msg="pid %d at %s", args=(pid, t), exc_info=None, func="run",
+    )
+    record.created = BASE_TIME + t
+    record.msecs = 0.0
+    record.process = pid
+    return record
+
+
+def _write_records(path: str, records: list, jsonl: bool = False) -> None:
+    formatter = JsonLinesFormatter()
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write((formatter.format(record) if jsonl else render_record(record)) + "\n")
+
+
+@pytest.fixture()
+def log_files() -> list[str]:
+    folder = tempfile.mkdtemp()
+    paths = [os.path.join(folder, "log_a.log"), os.path.join(folder, "log_b.jsonl")]
+    _write_records(paths[0], [_make_record(t, pid=1) for t in (0, 2, 4, 6)])
+    _write_records(paths[1], [_make_record(t, pid=2) for t in (1, 2, 3, 7)], jsonl=True)
+    return paths
+
+
+def test_merges_text_and_jsonl_files_in_time_order(log_files: list[str]) -> None:
+    records = list(merge_log_files(log_files))
+
+    assert [r.created - BASE_TIME for r in records] == [0, 1, 2, 2, 3, 4, 6, 7]
+    # Ties keep the order of the inputs
+    assert [r.process for r in records if r.created == BASE_TIME + 2] == [1, 2]
+
+
+def test_merges_gzipped_segments(log_files: list[str]) -> None:
+    with open(log_files[0], "rb") as source, gzip.open(log_files[0] + ".gz", "wb") as target:
+        shutil.copyfileobj(source, target)
+
+    records = list(merge_log_files([log_files[0] + ".gz", log_files[1]]))
+    assert len(records) == 8
+
+
+def test_merge_is_lazy() -> None:
+    template = LogRecordModel.from_payload(json.loads(JsonLinesFormatter().format(_make_record(0, pid=1))))
+
+    def endless(start: float):
+        t = start
+        while True:
+            yield dataclasses.replace(template, created=t)
+            t += 1
+
+    merged = merge_log_records([endless(0.0), endless(0.5)])
+    assert [next(merged).created for _ in range(4)] == [0.0, 0.5, 1.0, 1.5]
+
+
+def test_writes_text_and_jsonl(log_files: list[str]) -> None:
+    text = io.StringIO()
+    assert write_log_records(merge_log_files(log_files), text) == 8
+    assert all(line.startswith("└>> pid ") for line in text.getvalue().splitlines())
+
+    jsonl = io.StringIO()
+    write_log_records(merge_log_files(log_files), jsonl, output_format="jsonl")
+    assert [json.loads(line)["process"] for line in jsonl.getvalue().splitlines()] == [1, 2, 1, 2, 2, 1, 1, 2]
+
+    with pytest.raises(ValueError):
+        write_log_records([], text, output_format="xml")
+
+
+def test_replays_onto_websocket_queue(log_files: list[str]) -> None:
+    replay_queue = queue.Queue()
+    assert replay_log_records(merge_log_files(log_files), replay_queue) == 8
+    first = replay_queue.get_nowait()
+    assert first["process"] == 1 and first["created"] == BASE_TIME
+
+    replay_log_records(merge_log_files(log_files), replay_queue, payload_format=PAYLOAD_FORMAT_COMPACT)
+    payloads = [replay_queue.get_nowait() for _ in range(15)]
+    assert isinstance(payloads[-1], bytes)
+    assert LogRecordModel.from_payload(payloads[-1]).created == BASE_TIME + 7
+
+
+def test_cli_writes_merged_file(log_files: list[str]) -> None:
+    output = os.path.join(os.path.dirname(log_files[0]), "merged.jsonl")
+
+    assert main([*log_files, "-o", output, "--format", "jsonl"]) == 0
+
+    with open(output, encoding="utf-8") as f:
+        assert len(f.readlines()) == 8
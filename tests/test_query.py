@@ -0,0 +1,155 @@
+"""Tests for the log file reader and the indexed query CLI."""
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from skellylogs.formatters.json_lines_formatter import JsonLinesFormatter
+from skellylogs.formatters.record_renderer import render_record
+from skellylogs.log_file_reader import iter_log_file, parse_text_record
+from skellylogs.log_levels import LogLevels
+from skellylogs.query import LOG_INDEX_SUFFIX, LogFileIndex, LogQuery, main, query_log_file
+
+BASE_TIME = 1_700_000_000.0
+
+
+def _make_record(i: int, level: int = logging.INFO, name: str = "app.camera", pid: int = 100) -> logging.LogRecord:
+    record = logging.LogRecord(
+        name=name, level=level, pathname="camera.py", lineno=42,
+        msg="frame %d", args=(i,), exc_info=None, func="grab",
+    )
+    record.created = BASE_TIME + i
+    record.msecs = 0.0
+    record.process = pid
+    record.processName = f"Process-{pid}"
+    return record
+
+
+def _write_records(path: str, records: list, jsonl: bool = False) -> None:
+    formatter = JsonLinesFormatter()
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write((formatter.format(record) if jsonl else render_record(record)) + "\n")
+
+
+@pytest.fixture()
+def log_folder() -> str:
+    return tempfile.mkdtemp()
+
+
+class TestLogFileReader:
+    def test_parses_text_record_with_traceback(self) -> None:
+        record = _make_record(1, level=logging.ERROR)
+        record.exc_text = "Traceback (most recent call last):\nValueError: bad"
+        parsed = parse_text_record(render_record(record))
+
+        assert parsed.message == "frame 1"
+        assert parsed.levelname == "ERROR"
+        assert parsed.levelno == logging.ERROR
+        assert parsed.name == "app.camera"
+        assert parsed.funcName == "grab"
+        assert parsed.lineno == 42
+        assert parsed.process == 100
+        assert parsed.processName == "Process-100"
+        assert parsed.created == pytest.approx(BASE_TIME + 1)
+        assert parsed.exc_text == "Traceback (most recent call last):\nValueError: bad"
+
+    def test_iterates_multiline_text_records(self, log_folder: str) -> None:
+        path = os.path.join(log_folder, "log_a.log")
+        multiline = _make_record(1)
+        multiline.msg, multiline.args = "line one\nline two", None
+        _write_records(path, [_make_record(0), multiline, _make_record(2)])
+
+        assert [r.message for r in iter_log_file(path)] == ["frame 0", "line one\nline two", "frame 2"]
+
+    def test_iterates_jsonl_and_gzipped_files(self, log_folder: str) -> None:
+        path = os.path.join(log_folder, "log_a.jsonl")
+        _write_records(path, [_make_record(i) for i in range(3)], jsonl=True)
+        with open(path, "rb") as source, gzip.open(path + ".gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+
+        assert [r.message for r in iter_log_file(path)] == ["frame 0", "frame 1", "frame 2"]
+        assert [r.message for r in iter_log_file(path + ".gz")] == ["frame 0", "frame 1", "frame 2"]
+
+
+class TestLogFileIndex:
+    @pytest.fixture()
+    def log_file(self, log_folder: str) -> str:
+        path = os.path.join(log_folder, "log_a.log")
+        records = []
+        for i in range(2000):
+            level = logging.ERROR if i % 500 == 0 else LogLevels.TRACE.value
+            records.append(_make_record(i, level=level, pid=100 + i // 1000, name="app.camera" if i % 2 else "app.ui"))
+        _write_records(path, records)
+        return path
+
+    def test_queries_by_level(self, log_file: str) -> None:
+        index = LogFileIndex.open(log_file, block_size=4096)
+        results = list(index.query(LogQuery(min_level=logging.ERROR)))
+        assert [r.message for r in results] == ["frame 0", "frame 500", "frame 1000", "frame 1500"]
+
+    def test_queries_by_pid_logger_and_time(self, log_file: str) -> None:
+        index = LogFileIndex.open(log_file, block_size=4096)
+        query = LogQuery(pids=[101], loggers=["app.camera"], since=BASE_TIME + 1500, until=BASE_TIME + 1510)
+        results = list(index.query(query))
+        assert [r.message for r in results] == [f"frame {i}" for i in range(1501, 1510, 2)]
+
+    def test_skips_blocks_that_cannot_match(self, log_file: str) -> None:
+        index = LogFileIndex.open(log_file, block_size=4096)
+        query = LogQuery(min_level=logging.ERROR)
+        assert len(index.blocks) > 20
+        assert sum(index._block_may_match(block, query) for block in index.blocks) == 4
+
+    def test_saves_and_updates_incrementally(self, log_file: str) -> None:
+        index = LogFileIndex.open(log_file, block_size=4096)
+        assert os.path.exists(log_file + LOG_INDEX_SUFFIX)
+        complete_blocks = index.blocks[:-1]
+        partial_block_records = index.update()  # nothing new: re-indexes only the partial last block
+        assert 0 < partial_block_records < 100
+
+        _write_records(log_file, [_make_record(2000, level=logging.ERROR)])
+        reopened = LogFileIndex(log_file, block_size=4096)
+        reopened.load()
+        # The partial block again, plus the previous last record now that another follows it
+        assert reopened.update() == partial_block_records + 1
+        assert reopened.blocks[:len(complete_blocks)] == complete_blocks
+
+        results = list(reopened.query(LogQuery(min_level=logging.ERROR, since=BASE_TIME + 1900)))
+        assert [r.message for r in results] == ["frame 2000"]
+
+    def test_rebuilds_when_file_is_replaced(self, log_file: str) -> None:
+        LogFileIndex.open(log_file, block_size=4096)
+        os.remove(log_file)
+        _write_records(log_file, [_make_record(7, level=logging.ERROR, pid=999)])
+
+        index = LogFileIndex.open(log_file, block_size=4096)
+        assert [r.process for r in index.query(LogQuery())] == [999]
+
+    def test_indexes_jsonl_files(self, log_folder: str) -> None:
+        path = os.path.join(log_folder, "log_a.jsonl")
+        _write_records(path, [_make_record(i, pid=100 + i % 3) for i in range(300)], jsonl=True)
+
+        results = list(query_log_file(path, LogQuery(pids=[102])))
+        assert len(results) == 100
+        assert all(r.process == 102 for r in results)
+
+
+def test_cli_prints_matching_records(log_folder: str, capsys: pytest.CaptureFixture) -> None:
+    path = os.path.join(log_folder, "log_a.log")
+    _write_records(path, [_make_record(0), _make_record(1, level=logging.ERROR), _make_record(2)])
+
+    assert main([path, "--level", "error"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1 and lines[0].startswith("└>> frame 1 |  ERROR")
+
+    main([path, "--format", "jsonl", "--since", str(BASE_TIME + 1)])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["message"] for r in records] == ["frame 1", "frame 2"]
+
+    main([path, "--count"])
+    assert capsys.readouterr().out.strip() == "3"